@@ -0,0 +1,191 @@
+"""
+Admission control for the async lautech_assistant entrypoint
+
+At most ADMISSION_MAX_CONCURRENT requests run at once; up to
+ADMISSION_MAX_QUEUE more wait for a slot, each no longer than its deadline.
+A request that finds the queue full, or whose deadline passes while it
+waits, is turned away at once with AdmissionRejected so the caller can show
+a "busy, retry" message instead of timing out. Registration-day spikes then
+cost some rejections rather than slow answers for everyone.
+
+    result, waited = await admission.call(handle, payload, deadline=deadline_s)
+
+call() runs the handler on a dedicated pool of ADMISSION_MAX_CONCURRENT
+threads, so admitted work never queues again out of sight, and a slot stays
+taken until its thread has finished, even if the caller disconnected. Queue
+depth, slot usage, wait-time percentiles and rejection counts are in
+admission.stats().
+"""
+
+import os
+import time
+import asyncio
+import logging
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from db_metrics import QueryStats
+
+logger = logging.getLogger(__name__)
+
+# Admission configuration
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', '8'))  # Requests running at once
+ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', '32'))  # Requests waiting for a slot
+ADMISSION_DEADLINE = float(os.getenv('ADMISSION_DEADLINE', '20'))  # Default max seconds in the queue
+ADMISSION_RETRY_AFTER = float(os.getenv('ADMISSION_RETRY_AFTER', '5'))  # Seconds suggested to rejected callers
+
+QUEUE_FULL = 'queue_full'
+DEADLINE = 'deadline'
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request can't get a slot: the queue is full or its deadline passed"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Request not admitted ({reason}), retry after {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded, deadline-aware wait queue
+
+    Use from one event loop (the entrypoint's); the semaphore is created on first use.
+
+    Args:
+        max_concurrent: Requests allowed to run at once
+        max_queue: Requests allowed to wait for a slot; more are rejected immediately
+        deadline: Default seconds a request may wait for a slot
+        retry_after: Seconds suggested to rejected callers
+        enabled: If False, every request is admitted at once
+    """
+
+    def __init__(self, max_concurrent: int = ADMISSION_MAX_CONCURRENT, max_queue: int = ADMISSION_MAX_QUEUE,
+                 deadline: float = ADMISSION_DEADLINE, retry_after: float = ADMISSION_RETRY_AFTER,
+                 enabled: bool = ADMISSION_ENABLED):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.retry_after = retry_after
+        self.enabled = enabled
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.active = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_deadline = 0
+        self.waits = QueryStats()  # Queue wait per admitted request (ms histogram)
+
+    async def acquire(self, deadline: Optional[float] = None) -> float:
+        """
+        Wait for a slot; returns the seconds spent queued
+
+        Every successful acquire() must be paired with release().
+
+        Args:
+            deadline: Max seconds to wait (default: the controller's deadline)
+
+        Raises:
+            AdmissionRejected: The queue is full, or no slot freed up before the deadline
+        """
+        if not self.enabled:
+            return 0.0
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        start = time.perf_counter()
+        if self._semaphore.locked():
+            if self.queued >= self.max_queue:
+                self.rejected_full += 1
+                logger.warning(f"🚦 Busy: {self.active} running, {self.queued} queued; rejecting request")
+                raise AdmissionRejected(QUEUE_FULL, self.retry_after)
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.deadline if deadline is None else deadline)
+            except asyncio.TimeoutError:
+                self.rejected_deadline += 1
+                logger.warning(f"🚦 Busy: no slot within {time.perf_counter() - start:.1f}s; rejecting request")
+                raise AdmissionRejected(DEADLINE, self.retry_after) from None
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+
+        waited = time.perf_counter() - start
+        self.active += 1
+        self.admitted += 1
+        self.waits.add(waited * 1000, 0, 0, False, False)
+        return waited
+
+    def release(self):
+        if not self.enabled:
+            return
+        self.active -= 1
+        self._semaphore.release()
+
+    def _release_when_done(self, future: asyncio.Future):
+        if not future.cancelled():
+            future.exception()  # Retrieved, so an abandoned failure isn't logged as never retrieved
+        self.release()
+
+    async def call(self, func: Callable, *args, deadline: Optional[float] = None,
+                   keep_slot: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, float]:
+        """
+        Run func(*args) on a worker thread once admitted; returns (result, seconds queued)
+
+        The slot is released when func returns or raises. If the caller is cancelled
+        meanwhile, the thread can't be stopped, so the slot is released only once it
+        finishes. If keep_slot(result) is true the caller keeps the slot and must
+        release() it (e.g. when a returned stream has been read).
+
+        Args:
+            func: Blocking callable, run with a copy of the caller's context
+            deadline: Max seconds to wait for a slot (default: the controller's deadline)
+            keep_slot: Decides from the result whether the slot stays taken
+
+        Raises:
+            AdmissionRejected: The queue is full, or no slot freed up before the deadline
+        """
+        waited = await self.acquire(deadline)
+        if self.enabled and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='admitted')
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor if self.enabled else None,
+            functools.partial(contextvars.copy_context().run, func, *args))
+        try:
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(self._release_when_done)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        if keep_slot is None or not keep_slot(result):
+            self.release()
+        return result, waited
+
+    def stats(self) -> Dict:
+        waits = self.waits.as_dict()
+        return {
+            'enabled': self.enabled,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'active': self.active,
+            'queued': self.queued,
+            'max_queued': self.max_queued,
+            'admitted': self.admitted,
+            'rejected_queue_full': self.rejected_full,
+            'rejected_deadline': self.rejected_deadline,
+            'wait_ms': {key: waits[key] for key in ('avg_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')},
+        }
+
+
+admission = AdmissionController()
@@ -0,0 +1,226 @@
+"""
+Per-session pool of live agents for the lautech_assistant entrypoint
+
+Building an AgentCoreMemoryConfig, an AgentCoreMemorySessionManager and an
+Agent for every message costs set-up time and a memory read to rehydrate the
+conversation. AgentCore routes every message of a runtime session to the same
+container, so follow-up messages can reuse the agent that answered the
+previous one: its conversation is already in memory, and the session manager
+keeps persisting new messages to AgentCore Memory as before.
+
+The pool is an LRU keyed by (session_id, actor_id), bounded by agent count
+and by the estimated size of the agents' conversations, with idle expiry.
+An agent serves one request at a time; concurrent requests for the same
+session wait for it in turn instead of sharing it.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration
+AGENT_POOL_ENABLED = os.getenv('AGENT_POOL_ENABLED', 'true').lower() == 'true'
+AGENT_POOL_MAX_AGENTS = int(os.getenv('AGENT_POOL_MAX_AGENTS', '256'))
+AGENT_POOL_MAX_BYTES = int(os.getenv('AGENT_POOL_MAX_BYTES', str(64 * 1024 * 1024)))  # Estimated conversation size
+AGENT_POOL_IDLE_TTL = float(os.getenv('AGENT_POOL_IDLE_TTL', '900'))  # Seconds an unused agent is kept
+AGENT_POOL_SWEEP_INTERVAL = float(os.getenv('AGENT_POOL_SWEEP_INTERVAL', '60'))
+
+
+def conversation_size(agent: Any) -> int:
+    """Estimated memory held by an agent: JSON length of its conversation"""
+    messages = getattr(agent, 'messages', None)
+    if not messages:
+        return 0
+    try:
+        return len(json.dumps(messages, default=str, separators=(',', ':')))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _Slot:
+    """One session's agent; lock is held while a request uses it"""
+
+    __slots__ = ('lock', 'agent', 'size', 'last_used', 'in_use')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.agent = None
+        self.size = 0
+        self.last_used = time.monotonic()
+        self.in_use = 0  # Requests holding or waiting for lock
+
+
+class AgentPool:
+    """
+    Thread-safe LRU of live agents with idle expiry
+
+    Args:
+        factory: factory(session_id, actor_id) builds a new agent for a session
+        max_agents: Maximum number of pooled agents
+        max_bytes: Maximum total estimated conversation size of pooled agents
+        idle_ttl: Seconds an agent may go unused before it is dropped
+        sweep_interval: Minimum seconds between sweeps for idle agents
+        sizer: Estimates the memory held by an agent (default: conversation_size)
+        enabled: If False, every lease gets a freshly built agent
+    """
+
+    def __init__(self, factory: Callable[[str, str], Any], max_agents: int = AGENT_POOL_MAX_AGENTS,
+                 max_bytes: int = AGENT_POOL_MAX_BYTES, idle_ttl: float = AGENT_POOL_IDLE_TTL,
+                 sweep_interval: float = AGENT_POOL_SWEEP_INTERVAL, sizer: Callable[[Any], int] = conversation_size,
+                 enabled: bool = AGENT_POOL_ENABLED):
+        self.factory = factory
+        self.max_agents = max_agents
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self.sizer = sizer
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[Tuple[str, str], _Slot]" = OrderedDict()
+        self._bytes = 0
+        self._last_sweep = time.monotonic()
+
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, key: Tuple[str, str]):
+        # Caller holds self._lock
+        slot = self._slots.pop(key)
+        self._bytes -= slot.size
+
+    def _idle(self, slot: _Slot, now: float) -> bool:
+        return not slot.in_use and now - slot.last_used >= self.idle_ttl
+
+    def _sweep(self, now: float) -> int:
+        # Caller holds self._lock
+        self._last_sweep = now
+        idle = [key for key, slot in self._slots.items() if self._idle(slot, now)]
+        for key in idle:
+            self._drop(key)
+        self.expirations += len(idle)
+        return len(idle)
+
+    def _evict(self):
+        # Caller holds self._lock; agents in use are skipped, not interrupted
+        for key in list(self._slots):
+            if len(self._slots) <= self.max_agents and self._bytes <= self.max_bytes:
+                return
+            if not self._slots[key].in_use:
+                self._drop(key)
+                self.evictions += 1
+
+    def _acquire(self, key: Tuple[str, str]) -> _Slot:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            slot = self._slots.get(key)
+            if slot is not None and self._idle(slot, now):
+                self._drop(key)
+                self.expirations += 1
+                slot = None
+            if slot is None:
+                slot = self._slots[key] = _Slot()
+            self._slots.move_to_end(key)
+            slot.in_use += 1
+        if not slot.lock.acquire(blocking=False):
+            with self._lock:
+                self.waits += 1
+            slot.lock.acquire()
+        return slot
+
+    def _release(self, key: Tuple[str, str], slot: _Slot, discard: bool):
+        size = 0 if discard or slot.agent is None else self.sizer(slot.agent)
+        with self._lock:
+            slot.in_use -= 1
+            slot.last_used = time.monotonic()
+            if self._slots.get(key) is slot:
+                if discard:
+                    slot.agent = None
+                    if slot.in_use:
+                        self._bytes -= slot.size
+                        slot.size = 0
+                    else:
+                        self._drop(key)
+                else:
+                    self._bytes += size - slot.size
+                    slot.size = size
+                self._evict()
+            slot.lock.release()
+
+    @contextmanager
+    def lease(self, session_id: str, actor_id: str) -> Iterator[Any]:
+        """
+        Exclusive use of the session's agent for one request
+
+        The agent is built on the first request of a session. If the request
+        raises, the agent is discarded so a half-finished turn isn't reused.
+
+        Args:
+            session_id: Caller-supplied session ID
+            actor_id: Caller-supplied actor ID
+        """
+        if not self.enabled:
+            yield self.factory(session_id, actor_id)
+            return
+
+        key = (session_id, actor_id)
+        slot = self._acquire(key)
+        discard = True
+        try:
+            if slot.agent is None:
+                with self._lock:
+                    self.misses += 1
+                slot.agent = self.factory(session_id, actor_id)
+            else:
+                with self._lock:
+                    self.hits += 1
+            yield slot.agent
+            discard = False
+        finally:
+            self._release(key, slot, discard)
+
+    def discard(self, session_id: str, actor_id: str) -> bool:
+        """Drop a session's agent (e.g. when the session ends); in-flight requests finish with it"""
+        with self._lock:
+            slot = self._slots.get((session_id, actor_id))
+            if slot is None:
+                return False
+            self._drop((session_id, actor_id))
+            return True
+
+    def sweep(self) -> int:
+        """Drop idle agents now; returns how many were dropped"""
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            self._slots.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            leases = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'agents': len(self._slots),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / leases, 3) if leases else 0.0,
+                'waits': self.waits,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
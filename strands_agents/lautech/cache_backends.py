@@ -0,0 +1,292 @@
+"""
+Key/value storage backends for the LAUTECH response cache
+
+A backend stores string values under string keys with a TTL, and supports
+the two operations cross-instance request coalescing needs: add() (set only
+if absent) and delete_if() (delete only if the value still matches).
+
+- MemoryBackend: per-process LRU bounded by entries and bytes (the L1 tier)
+- RedisBackend: any Redis-protocol server (ElastiCache, redis-server), shared
+  by all AgentCore replicas; pass a fakeredis client to test it offline:
+
+      backend = RedisBackend(client=fakeredis.FakeRedis(decode_responses=True))
+"""
+
+import os
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+# Redis configuration
+REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL', '')  # e.g. rediss://cache.xxxxxx.use1.cache.amazonaws.com:6379/0
+REDIS_TIMEOUT = float(os.getenv('RESPONSE_CACHE_REDIS_TIMEOUT', '0.25'))  # Seconds per command
+REDIS_PREFIX = os.getenv('RESPONSE_CACHE_REDIS_PREFIX', 'lautech:')
+
+
+class CacheBackend(ABC):
+    """Interface for response cache storage; keys and values are strings, TTLs in seconds"""
+
+    name = 'backend'
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float):
+        ...
+
+    @abstractmethod
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        """Set key only if it doesn't exist; True if this call set it (or the backend can't tell)"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def delete_if(self, key: str, value: str) -> bool:
+        """Delete key only if it still holds value; True if it was deleted"""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every key starting with prefix; returns how many were deleted"""
+
+    def sweep(self) -> int:
+        """Drop expired entries now (backends with their own expiry return 0)"""
+        return 0
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    def stats(self) -> Dict:
+        return {'backend': self.name}
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Thread-safe in-process LRU with per-entry TTL
+
+    Expired entries are dropped lazily on lookup and in a sweep at most every
+    sweep_interval seconds on writes.
+
+    Args:
+        max_entries: Maximum number of entries
+        max_bytes: Maximum total size of values (UTF-8 bytes)
+        sweep_interval: Minimum seconds between sweeps for expired entries
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 16 * 1024 * 1024, sweep_interval: float = 60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+
+        self._lock = threading.Lock()
+        # key -> (expires_at, size, value)
+        self._entries: "OrderedDict[str, Tuple[float, int, str]]" = OrderedDict()
+        self._bytes = 0
+        self._last_sweep = time.monotonic()
+
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: str):
+        # Caller holds self._lock
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _live(self, key: str, now: float) -> Optional[Tuple[float, int, str]]:
+        # Caller holds self._lock
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= now:
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def _store(self, key: str, value: str, ttl: float, now: float):
+        # Caller holds self._lock
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        if now - self._last_sweep >= self.sweep_interval:
+            self._sweep(now)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (now + ttl, size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._store(key, value, ttl, time.monotonic())
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._live(key, now) is not None:
+                return False
+            self._store(key, value, ttl, now)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def delete_if(self, key: str, value: str) -> bool:
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            if entry is None or entry[2] != value:
+                return False
+            self._remove(key)
+            return True
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def _sweep(self, now: float) -> int:
+        # Caller holds self._lock
+        self._last_sweep = now
+        expired = [key for key, (expires_at, _, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'backend': self.name,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class RedisBackend(CacheBackend):
+    """
+    Shared backend on a Redis-protocol server
+
+    Command errors are logged and treated as misses, so an unavailable cache
+    slows requests down to the uncached path instead of failing them.
+
+    Args:
+        client: A redis.Redis-compatible client created with decode_responses=True
+            (default: one built from url)
+        url: Server URL (default RESPONSE_CACHE_REDIS_URL)
+        prefix: Namespace prepended to every key
+    """
+
+    name = 'redis'
+
+    def __init__(self, client=None, url: str = None, prefix: str = REDIS_PREFIX):
+        if client is None:
+            if not HAS_REDIS:
+                raise RuntimeError("RedisBackend needs the redis package (pip install redis)")
+            client = redis.Redis.from_url(url or REDIS_URL, decode_responses=True,
+                                          socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT)
+        self.client = client
+        self.prefix = prefix
+        self.errors = 0
+
+    def _failed(self, operation: str, error: Exception):
+        self.errors += 1
+        logger.warning(f"⚠️  Redis {operation} failed, continuing without the shared cache: {error}")
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self.client.get(self.prefix + key)
+        except Exception as e:
+            self._failed('GET', e)
+            return None
+
+    def set(self, key: str, value: str, ttl: float):
+        try:
+            self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+        except Exception as e:
+            self._failed('SET', e)
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        try:
+            return bool(self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)), nx=True))
+        except Exception as e:
+            self._failed('SET NX', e)
+            return True  # Can't coordinate: let the caller go ahead rather than wait on a lock
+
+    def delete(self, key: str):
+        try:
+            self.client.delete(self.prefix + key)
+        except Exception as e:
+            self._failed('DEL', e)
+
+    def delete_if(self, key: str, value: str) -> bool:
+        # WATCH/MULTI rather than a Lua script: works on servers without scripting
+        key = self.prefix + key
+        try:
+            with self.client.pipeline() as pipe:
+                pipe.watch(key)
+                if pipe.get(key) != value:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.delete(key)
+                return bool(pipe.execute()[0])
+        except Exception as e:
+            if HAS_REDIS and isinstance(e, redis.WatchError):
+                return False  # Changed between GET and DEL: no longer ours
+            self._failed('compare-and-delete', e)
+            return False
+
+    def delete_prefix(self, prefix: str) -> int:
+        try:
+            keys = list(self.client.scan_iter(match=f"{self.prefix}{prefix}*", count=500))
+            return self.client.delete(*keys) if keys else 0
+        except Exception as e:
+            self._failed('SCAN/DEL', e)
+            return 0
+
+    def clear(self):
+        self.delete_prefix('')
+
+    def stats(self) -> Dict:
+        return {'backend': self.name, 'errors': self.errors}
@@ -0,0 +1,540 @@
+"""
+Async database API for LAUTECH tools
+Same helpers as db_utils, backed by asyncpg (PostgreSQL) or aiosqlite (SQLite)
+
+Strands runs each agent invocation on its own short-lived event loop, so the
+async pool can't belong to the caller's loop. Instead all database work runs
+on one long-lived background loop that owns the pool, and callers on any
+loop await the result without blocking. Results share db_utils' result cache.
+
+If the async driver for the active backend isn't installed, every helper
+falls back to running the sync db_utils function in a worker thread.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Optional, List, Dict, Union
+
+import db_queries
+import db_paging
+import db_utils
+from db_metrics import query_metrics
+from db_results import Table
+from db_schema import calendar_today
+from db_replicas import ReplicaRouter, READ_REPLICAS, LAG_SQL, parse_endpoints
+from db_pool import PoolMetrics, POOL_MIN_SIZE, POOL_MAX_SIZE, POOL_TIMEOUT
+from db_utils import USE_POSTGRES, MAX_RESULTS, SNAPSHOT_MAX_ROWS, _result_cache
+
+logger = logging.getLogger(__name__)
+
+# Import async database drivers
+if USE_POSTGRES:
+    try:
+        import asyncpg
+        HAS_ASYNC_DRIVER = True
+    except ImportError:
+        logger.warning("asyncpg not installed, async DB calls will use threads. Install with: pip install asyncpg")
+        HAS_ASYNC_DRIVER = False
+else:
+    try:
+        import aiosqlite
+        HAS_ASYNC_DRIVER = True
+    except ImportError:
+        logger.warning("aiosqlite not installed, async DB calls will use threads. Install with: pip install aiosqlite")
+        HAS_ASYNC_DRIVER = False
+
+
+# ============================================================================
+# BACKGROUND DATABASE LOOP
+# ============================================================================
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Get (or start) the event loop thread that owns the async pool"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='lautech-db-loop', daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+async def _on_db_loop(coro):
+    """Run a coroutine on the database loop and await its result from any loop"""
+    loop = _get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+# ============================================================================
+# POOLS (only touched from the database loop)
+# ============================================================================
+
+class _SQLitePool:
+    """Small pool of aiosqlite connections (each runs queries on its own thread)"""
+
+    def __init__(self, max_size: int = POOL_MAX_SIZE, timeout: float = POOL_TIMEOUT):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle: asyncio.LifoQueue = asyncio.LifoQueue()
+        self._size = 0
+        self.metrics = PoolMetrics()
+
+    async def _connect(self):
+        database, kwargs = db_utils.sqlite_connect_args()
+        conn = await aiosqlite.connect(database, **kwargs)
+        conn.row_factory = aiosqlite.Row
+        for pragma in db_utils.sqlite_pragmas():
+            await conn.execute(pragma)
+        self.metrics.incr('connections_created')
+        return conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        start = time.monotonic()
+        if self._idle.empty() and self._size < self.max_size:
+            self._size += 1
+            try:
+                conn = await self._connect()
+            except Exception:
+                self._size -= 1
+                raise
+        else:
+            try:
+                conn = await asyncio.wait_for(self._idle.get(), self.timeout)
+            except asyncio.TimeoutError:
+                self.metrics.incr('checkout_timeouts')
+                raise
+        self.metrics.idle = self._idle.qsize()
+        self.metrics.record_checkout(time.monotonic() - start)
+        try:
+            yield conn
+        except Exception:
+            await conn.rollback()
+            raise
+        finally:
+            self.metrics.record_checkin()
+            self._idle.put_nowait(conn)
+            self.metrics.idle = self._idle.qsize()
+
+    async def close(self):
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            await conn.close()
+            self._size -= 1
+            self.metrics.incr('connections_closed')
+
+    def stats(self) -> Dict:
+        stats = self.metrics.snapshot()
+        stats.update(size=self._size, max_size=self.max_size)
+        return stats
+
+
+_pool = None
+_pool_lock: Optional[asyncio.Lock] = None
+
+
+async def _init_pg_connection(conn):
+    # DATE columns as 'YYYY-MM-DD' strings, matching db_utils and SQLite
+    await conn.set_type_codec('date', schema='pg_catalog', encoder=str, decoder=str, format='text')
+
+
+async def _create_pg_pool(host: str = None, port: int = None):
+    creds = await asyncio.to_thread(db_utils.get_db_credentials)
+
+    async def create(creds):
+        return await asyncpg.create_pool(
+            host=host or creds['host'],
+            port=port or creds['port'],
+            database=creds['dbname'],
+            user=creds['username'],
+            password=creds['password'],
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            timeout=10,
+            # asyncpg prepares and caches every statement per connection
+            statement_cache_size=max(100, 2 * len(db_queries.QUERIES)),
+            init=_init_pg_connection,
+        )
+
+    try:
+        return await create(creds)
+    except asyncpg.InvalidPasswordError:
+        # Secret was probably rotated since we cached it: re-fetch once and retry
+        logger.warning("🔐 Database authentication failed, re-fetching rotated credentials")
+        return await create(await asyncio.to_thread(db_utils.refresh_db_credentials))
+
+
+async def _get_pool():
+    global _pool, _pool_lock
+    if _pool is None:
+        if _pool_lock is None:
+            _pool_lock = asyncio.Lock()
+        async with _pool_lock:
+            if _pool is None:
+                if USE_POSTGRES:
+                    _pool = await _create_pg_pool()
+                    logger.info(f"✅ asyncpg pool ready (min={POOL_MIN_SIZE}, max={POOL_MAX_SIZE})")
+                else:
+                    _pool = _SQLitePool()
+    return _pool
+
+
+_replica_router: Optional[ReplicaRouter] = None
+_replica_router_ready = False
+
+
+async def _replica_lag(pool) -> float:
+    async with pool.acquire() as conn:
+        return float(await conn.fetchval(LAG_SQL))
+
+
+def _is_replica_failure(error: Exception) -> bool:
+    return isinstance(error, (OSError, asyncio.TimeoutError, asyncpg.PostgresConnectionError,
+                              asyncpg.InterfaceError, asyncpg.TransactionRollbackError))
+
+
+async def _get_replica_router() -> Optional[ReplicaRouter]:
+    """Read-replica router for asyncpg pools (see db_utils._get_replica_router)"""
+    global _replica_router, _replica_router_ready
+    if not _replica_router_ready:
+        primary = await _get_pool()
+        async with _pool_lock:
+            if not _replica_router_ready:
+                if USE_POSTGRES and READ_REPLICAS:
+                    creds = await asyncio.to_thread(db_utils.get_db_credentials)
+                    replicas = {}
+                    for host, port in parse_endpoints(READ_REPLICAS, int(creds['port'])):
+                        replicas[f'{host}:{port}'] = _LazyPgPool(host, port)
+                    _replica_router = ReplicaRouter(primary, replicas, measure_lag=_replica_lag,
+                                                    is_failover_error=_is_replica_failure)
+                    logger.info(f"✅ Routing async reads across {len(replicas)} replica(s): {READ_REPLICAS}")
+                _replica_router_ready = True
+    return _replica_router
+
+
+class _LazyPgPool:
+    """asyncpg pool for a replica, created on first use so a down replica only fails its own reads"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._pool = None
+
+    def acquire(self):
+        return _LazyAcquire(self)
+
+    async def get(self):
+        if self._pool is None:
+            self._pool = await _create_pg_pool(self.host, self.port)
+        return self._pool
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+
+
+class _LazyAcquire:
+    def __init__(self, lazy: _LazyPgPool):
+        self._lazy = lazy
+        self._ctx = None
+
+    async def __aenter__(self):
+        self._ctx = (await self._lazy.get()).acquire()
+        return await self._ctx.__aenter__()
+
+    async def __aexit__(self, *exc):
+        return await self._ctx.__aexit__(*exc)
+
+
+async def _reset_pg_pool():
+    """Drop the pools after an auth failure so new connections use refreshed credentials"""
+    global _pool, _replica_router, _replica_router_ready
+    pool, _pool = _pool, None
+    router, _replica_router, _replica_router_ready = _replica_router, None, False
+    await asyncio.to_thread(db_utils.refresh_db_credentials)
+    if pool is not None:
+        await pool.close()
+    if router is not None:
+        for replica_pool in router.pools():
+            await replica_pool.close()
+
+
+async def _explain(conn, sql: str, args) -> Optional[str]:
+    """Capture the plan of a slow read-only query (see db_utils._explain)"""
+    try:
+        if USE_POSTGRES:
+            rows = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", *args)
+            return '\n'.join(row['QUERY PLAN'] for row in rows)
+        async with conn.execute(f"EXPLAIN QUERY PLAN {sql}", args) as cursor:
+            return '\n'.join(row['detail'] for row in await cursor.fetchall())
+    except Exception as e:
+        logger.warning(f"Could not capture query plan: {e}")
+        return None
+
+
+async def _run(conn, query, params: Optional[Dict], fetch: str):
+    """Execute on an acquired connection, recording timings in db_metrics.query_metrics"""
+    dialect = 'postgres' if USE_POSTGRES else 'sqlite'
+    if USE_POSTGRES:
+        sql, args = query.pg_numbered_sql, query.pg_args(params)
+    else:
+        sql, args = query.sqlite_sql, params or {}
+
+    start = time.perf_counter()
+    try:
+        if USE_POSTGRES:
+            if fetch == 'all':
+                result = [dict(row) for row in await conn.fetch(sql, *args)]
+            elif fetch == 'one':
+                row = await conn.fetchrow(sql, *args)
+                result = dict(row) if row else None
+            elif fetch == 'table':
+                statement = await conn.prepare(sql)  # Served from the connection's statement cache
+                columns = [attribute.name for attribute in statement.get_attributes()]
+                result = Table(columns, await statement.fetch(*args))
+            else:
+                await conn.execute(sql, *args)
+                result = None
+        else:
+            async with conn.execute(sql, args) as cursor:
+                if fetch == 'all':
+                    result = [dict(row) for row in await cursor.fetchall()]
+                elif fetch == 'one':
+                    row = await cursor.fetchone()
+                    result = dict(row) if row else None
+                elif fetch == 'table':
+                    cursor.row_factory = None
+                    result = Table.from_cursor(cursor, await cursor.fetchall())
+                else:
+                    result = None
+    except Exception as e:
+        query_metrics.record(query.name, (time.perf_counter() - start) * 1000, error=e, dialect=dialect)
+        raise
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    if not USE_POSTGRES and not query.readonly:
+        await conn.commit()
+    plan = None
+    if query.readonly and query_metrics.should_explain(query.name, duration_ms):
+        plan = await _explain(conn, sql, args)
+    query_metrics.record(query.name, duration_ms, result=result, plan=plan, dialect=dialect)
+    return result
+
+
+async def _run_on(pool, query, params: Optional[Dict], fetch: str):
+    async with pool.acquire() as conn:
+        return await _run(conn, query, params, fetch)
+
+
+async def _execute(name: str, params: Optional[Dict], fetch: str, retry: bool = True):
+    query = db_queries.get(name)
+    pool = await _get_pool()
+
+    if USE_POSTGRES:
+        router = await _get_replica_router() if query.readonly else None
+        try:
+            if router is not None:
+                return await router.execute_async(lambda target: _run_on(target, query, params, fetch))
+            return await _run_on(pool, query, params, fetch)
+        except asyncpg.InvalidPasswordError:
+            if not retry:
+                raise
+            await _reset_pg_pool()
+            return await _execute(name, params, fetch, retry=False)
+
+    async with pool.acquire() as conn:
+        return await _run(conn, query, params, fetch)
+
+
+async def run_query(name: str, params: Optional[Dict] = None, fetch: str = 'all'):
+    """
+    Execute a query from the db_queries registry without blocking the caller's loop
+
+    Args:
+        name: Registered query name (e.g. 'courses.list')
+        params: Named parameters; keys not used by the query are ignored
+        fetch: 'all', 'one', 'table', or None (for INSERT/UPDATE/DELETE)
+
+    Returns:
+        List of dictionaries, a single dictionary, a Table, or None (as db_utils.run_query)
+    """
+    if not HAS_ASYNC_DRIVER:
+        return await asyncio.to_thread(db_utils.run_query, name, params, fetch)
+    return await _on_db_loop(_execute(name, params, fetch))
+
+
+async def get_data_version() -> Optional[int]:
+    """Get the data version bumped by import_data.py / migrate_to_rds.py"""
+    row = await run_query('meta.data_version', fetch='one')
+    return row['value'] if row else 0
+
+
+async def current_data_version() -> Optional[int]:
+    """Data version the result cache is serving (see db_utils.current_data_version)"""
+    await _result_cache.check_version_async(get_data_version)
+    return _result_cache.version
+
+
+def get_async_pool_metrics() -> Dict:
+    """Get async pool metrics (asyncpg reports sizes only)"""
+    pool = _pool
+    if pool is None:
+        return {}
+    if isinstance(pool, _SQLitePool):
+        return pool.stats()
+    stats = {'size': pool.get_size(), 'idle': pool.get_idle_size(),
+             'min_size': pool.get_min_size(), 'max_size': pool.get_max_size()}
+    if _replica_router is not None:
+        stats['replicas'] = _replica_router.stats()
+    return stats
+
+
+async def close_async_pool():
+    """Close the async pools (call at shutdown)"""
+    global _pool, _replica_router, _replica_router_ready
+    pool, _pool = _pool, None
+    router, _replica_router, _replica_router_ready = _replica_router, None, False
+    if pool is not None:
+        await _on_db_loop(pool.close())
+    if router is not None:
+        for replica_pool in router.pools():
+            await _on_db_loop(replica_pool.close())
+
+
+_course_search_indexed: Optional[bool] = None
+
+
+async def _has_course_search() -> bool:
+    global _course_search_indexed
+    if _course_search_indexed is None:
+        _course_search_indexed = await asyncio.to_thread(db_utils.has_course_search)
+    return _course_search_indexed
+
+
+# ============================================================================
+# QUERY HELPERS (async twins of db_utils; same names, parameters and cache keys)
+# ============================================================================
+
+async def _select(name: str, params: Dict, as_table: bool = False) -> Union[List[Dict], Table]:
+    """Run a read query as a list of dicts, or as a column-oriented Table"""
+    if as_table:
+        return await run_query(name, params, fetch='table')
+    return await run_query(name, params) or []
+
+
+@_result_cache.memoize_async('get_courses', get_data_version)
+async def get_courses(limit: int = MAX_RESULTS, search: str = None,
+                      as_table: bool = False) -> Union[List[Dict], Table]:
+    """Get courses with optional limit and search filter (ranked full-text search)"""
+    if search:
+        if await _has_course_search():
+            params = db_utils.course_search_params(search, limit)
+            if params is None:
+                return await get_courses(limit=limit, as_table=as_table)
+            return await _select('courses.search', params, as_table)
+        return await _select('courses.search_like', {'pattern': f'%{search.lower()}%', 'limit': limit}, as_table)
+    return await _select('courses.list', {'limit': limit}, as_table)
+
+
+@_result_cache.memoize_async('get_fees', get_data_version)
+async def get_fees(limit: int = MAX_RESULTS, level: str = None,
+                   as_table: bool = False) -> Union[List[Dict], Table]:
+    """Get fees with optional limit and level filter"""
+    if level:
+        return await _select('fees.by_level', {'pattern': f'%{level.lower()}%', 'limit': limit}, as_table)
+    return await _select('fees.list', {'limit': limit}, as_table)
+
+
+async def get_calendar(limit: int = MAX_RESULTS, upcoming_only: bool = True,
+                       as_table: bool = False, today: str = None) -> Union[List[Dict], Table]:
+    """Get calendar events by date; upcoming_only keeps those on or after today (default: calendar_today())"""
+    return await _get_calendar(limit, upcoming_only, (today or calendar_today()) if upcoming_only else None,
+                               as_table)
+
+
+@_result_cache.memoize_async('get_calendar', get_data_version)
+async def _get_calendar(limit: int, upcoming_only: bool, today: Optional[str],
+                        as_table: bool) -> Union[List[Dict], Table]:
+    if upcoming_only:
+        return await _select('calendar.upcoming', {'today': today, 'limit': limit}, as_table)
+    return await _select('calendar.list', {'limit': limit}, as_table)
+
+
+async def get_next_deadlines(limit: int = MAX_RESULTS, today: str = None,
+                             as_table: bool = False) -> Union[List[Dict], Table]:
+    """Get the next event of each type on or after today (default: calendar_today()), soonest first"""
+    return await _get_next_deadlines(limit, today or calendar_today(), as_table)
+
+
+@_result_cache.memoize_async('get_next_deadlines', get_data_version)
+async def _get_next_deadlines(limit: int, today: str, as_table: bool) -> Union[List[Dict], Table]:
+    row = await run_query('meta.next_deadlines_as_of', fetch='one')
+    current = bool(row) and str(row['value']) == today.replace('-', '')
+    if not current:
+        # New day: the (rare) refresh runs on the sync pool
+        current = await asyncio.to_thread(db_utils.next_deadlines_current, today)
+    name = 'calendar.next_deadlines' if current else 'calendar.next_deadlines_live'
+    return await _select(name, {'today': today, 'limit': limit}, as_table)
+
+
+async def get_open_windows(on_date: str = None, as_table: bool = False) -> Union[List[Dict], Table]:
+    """Get the calendar windows (registration, exams, ...) open on a 'YYYY-MM-DD' date (default: calendar_today())"""
+    on_date = date.fromisoformat(on_date).isoformat() if on_date else calendar_today()  # ValueError if malformed
+    return await _get_open_windows(on_date, as_table)
+
+
+@_result_cache.memoize_async('get_open_windows', get_data_version)
+async def _get_open_windows(on_date: str, as_table: bool) -> Union[List[Dict], Table]:
+    return await _select('calendar.open_on', {'on_date': on_date}, as_table)
+
+
+@_result_cache.memoize_async('get_hostels', get_data_version)
+async def get_hostels(limit: int = MAX_RESULTS, gender: str = None, as_table: bool = False,
+                      facilities: List[str] = None, min_capacity: int = None) -> Union[List[Dict], Table]:
+    """Get hostels with optional limit, gender, facilities (all required, e.g. ['Wi-Fi', 'kitchen']) and minimum capacity"""
+    if facilities or min_capacity is not None:
+        params = db_utils.hostel_search_params(limit, gender, facilities, min_capacity)
+        return await _select('hostels.search', params, as_table)
+    if gender:
+        return await _select('hostels.by_gender', {'gender': gender.strip().lower(), 'limit': limit}, as_table)
+    return await _select('hostels.list', {'limit': limit}, as_table)
+
+
+async def get_course_by_code(code: str) -> Optional[Dict]:
+    """Get a specific course by code"""
+    return await run_query('courses.by_code', {'code': code}, fetch='one')
+
+
+async def get_fees_by_level(level: str) -> List[Dict]:
+    """Get fees for a specific level"""
+    return await run_query('fees.exact_level', {'level': level}) or []
+
+
+@_result_cache.memoize_async('get_snapshot', get_data_version)
+async def get_snapshot(max_rows: int = SNAPSHOT_MAX_ROWS) -> Dict:
+    """Get the working set of all four tables in a single query (see db_utils.get_snapshot)"""
+    row = await run_query('snapshot', {'limit': max_rows + 1}, fetch='one')
+    return db_utils.build_snapshot(row['snapshot'], max_rows)
+
+
+@_result_cache.memoize_async('get_page', get_data_version)
+async def get_page(table: str, page_size: int = db_paging.DEFAULT_PAGE_SIZE, cursor: str = None, **filters) -> Dict:
+    """Get one keyset page of a table (see db_utils.get_page)"""
+    spec, after, filters, page_size = db_paging.resolve(table, page_size, cursor, filters)
+    rows = await run_query(spec.query, spec.params(after, filters, page_size + 1)) or []
+    return db_paging.build_page(spec, table, rows, page_size, filters)
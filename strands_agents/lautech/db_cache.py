@@ -0,0 +1,285 @@
+"""
+Read-through result cache for LAUTECH db_utils query helpers
+
+The LAUTECH tables only change when import_data.py or setup/migrate_to_rds.py
+runs, and both bump the data version in the ``meta`` table. Cached results are
+kept until that version changes (checked at most every few seconds) or they
+are evicted by the entry/byte bounds.
+"""
+
+import os
+import json
+import time
+import inspect
+import logging
+import functools
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+CACHE_ENABLED = os.getenv('DB_RESULT_CACHE', 'true').lower() == 'true'
+CACHE_MAX_ENTRIES = int(os.getenv('DB_CACHE_MAX_ENTRIES', '1024'))
+CACHE_MAX_BYTES = int(os.getenv('DB_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+VERSION_CHECK_INTERVAL = float(os.getenv('DB_CACHE_VERSION_CHECK_INTERVAL', '5'))  # Seconds between data version checks
+
+
+_UNSET = object()
+
+
+def normalize_arg(value: Any) -> Any:
+    """Normalize an argument for use in a cache key (case/whitespace-insensitive strings)"""
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [normalize_arg(v) for v in value]
+        return tuple(sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items)
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalize_arg(v)) for k, v in value.items()))
+    return value
+
+
+# Arguments whose case matters (base64 page cursors), used verbatim in cache keys
+VERBATIM_ARGS = frozenset({'cursor', 'page_token'})
+
+
+def normalize_args(arguments: Dict[str, Any]) -> Tuple:
+    """Cache key parts for bound arguments: normalize_arg() on each, except VERBATIM_ARGS"""
+    return tuple(value if name in VERBATIM_ARGS else normalize_arg(value) for name, value in arguments.items())
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy of nested lists/dicts (tuples and MappingProxyTypes), served from the cache without copying"""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    # db_results.Table (immutable, so cached as is) serializes as columns + row lists
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    return value.as_lists() if hasattr(value, 'as_lists') else str(value)
+
+
+def _estimate_size(value: Any) -> int:
+    return len(json.dumps(value, default=_json_default, separators=(',', ':')))
+
+
+def _copy_result(value: Any) -> Any:
+    # Copy lists/dicts (rows) so callers can't mutate cached results; frozen values are shared as is
+    if isinstance(value, list):
+        return [_copy_result(item) for item in value]
+    if isinstance(value, dict):
+        return {k: _copy_result(v) for k, v in value.items()}
+    return value
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache bounded by entry count and serialized size
+
+    Args:
+        version_fn: Callable returning the current data version; all entries are
+            dropped when the returned value changes
+        max_entries: Maximum number of cached results
+        max_bytes: Maximum total size of cached results (JSON-encoded length)
+        version_check_interval: Minimum seconds between version_fn calls
+        enabled: If False, memoized functions always call through
+    """
+
+    def __init__(self, version_fn: Optional[Callable[[], Any]] = None, max_entries: int = CACHE_MAX_ENTRIES,
+                 max_bytes: int = CACHE_MAX_BYTES, version_check_interval: float = VERSION_CHECK_INTERVAL,
+                 enabled: bool = CACHE_ENABLED):
+        self._version_fn = version_fn
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version_check_interval = version_check_interval
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._version_checked_at = float('-inf')
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def version(self):
+        return self._version
+
+    def _claim_version_check(self, force: bool = False) -> bool:
+        """Return True (at most once per interval) if the data version should be polled"""
+        if self._version_fn is None and not force:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._version_checked_at < self.version_check_interval:
+                return False
+            # Claim this check so concurrent callers don't all hit the database
+            self._version_checked_at = now
+            return True
+
+    def check_version(self, force: bool = False):
+        """Poll version_fn if the check interval has elapsed and invalidate on change"""
+        if self._version_fn is None or not self._claim_version_check(force):
+            return
+        try:
+            version = self._version_fn()
+        except Exception as e:
+            logger.warning(f"Data version check failed, keeping cached results: {e}")
+            return
+        self.observe_version(version)
+
+    async def check_version_async(self, version_fn: Callable, force: bool = False):
+        """check_version() for async callers; version_fn is a coroutine function"""
+        if not self._claim_version_check(force):
+            return
+        try:
+            version = await version_fn()
+        except Exception as e:
+            logger.warning(f"Data version check failed, keeping cached results: {e}")
+            return
+        self.observe_version(version)
+
+    def observe_version(self, version: Any):
+        """Record the current data version, dropping all entries if it changed"""
+        with self._lock:
+            if version == self._version:
+                return
+            if self._entries:
+                self.invalidations += 1
+                logger.info(f"🔄 Data version changed ({self._version} → {version}), clearing result cache")
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        """Look up a key, returning (hit, value)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key: Tuple, value: Any, version: Any = _UNSET):
+        """
+        Store a value, evicting least-recently-used entries to stay within bounds
+
+        If version is given and no longer current, the value is not stored.
+        """
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version is not _UNSET and version != self._version:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    @staticmethod
+    def _key(name: str, signature: inspect.Signature, args: tuple, kwargs: dict) -> Tuple:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return (name,) + normalize_args(bound.arguments)
+
+    def memoize(self, name: str) -> Callable:
+        """
+        Decorator caching a query helper's result by (name, normalized arguments)
+
+        Args:
+            name: Logical name of the query, used as the first part of the key
+        """
+        def decorator(func: Callable) -> Callable:
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                key = self._key(name, signature, args, kwargs)
+
+                self.check_version()
+                version = self._version
+                hit, value = self.get(key)
+                if not hit:
+                    value = func(*args, **kwargs)
+                    self.put(key, value, version)
+                return _copy_result(value)
+
+            wrapper.cache = self
+            return wrapper
+        return decorator
+
+    def memoize_async(self, name: str, version_fn: Callable) -> Callable:
+        """
+        memoize() for coroutine functions
+
+        An async twin registered under the same name and with the same
+        parameters as a sync helper shares its cache entries.
+
+        Args:
+            name: Logical name of the query, used as the first part of the key
+            version_fn: Coroutine function returning the current data version
+        """
+        def decorator(func: Callable) -> Callable:
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await func(*args, **kwargs)
+                key = self._key(name, signature, args, kwargs)
+
+                await self.check_version_async(version_fn)
+                version = self._version
+                hit, value = self.get(key)
+                if not hit:
+                    value = await func(*args, **kwargs)
+                    self.put(key, value, version)
+                return _copy_result(value)
+
+            wrapper.cache = self
+            return wrapper
+        return decorator
+
+    def clear(self):
+        """Drop all cached results (the data version is re-checked on next use)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._version_checked_at = float('-inf')
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'data_version': self._version,
+            }
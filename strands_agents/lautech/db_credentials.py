@@ -0,0 +1,141 @@
+"""
+Cached database credentials for LAUTECH db_utils
+Keeps Secrets Manager off the hot path while still following secret rotation
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Callable, Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+# Credential cache configuration
+SECRET_TTL = float(os.getenv('DB_SECRET_TTL', '900'))  # Seconds a fetched secret is trusted
+SECRET_REFRESH_AHEAD = float(os.getenv('DB_SECRET_REFRESH_AHEAD', '60'))  # Refresh in background this long before expiry
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_secrets_client():
+    """Get the shared Secrets Manager client (boto3 clients are thread-safe)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import boto3
+                _client = boto3.session.Session().client(
+                    service_name='secretsmanager',
+                    region_name=os.getenv('AWS_REGION', 'us-east-1')
+                )
+    return _client
+
+
+def fetch_secret(secret_name: str) -> Dict:
+    """Fetch and decode a JSON secret from Secrets Manager"""
+    response = get_secrets_client().get_secret_value(SecretId=secret_name)
+    return json.loads(response['SecretString'])
+
+
+class CredentialCache:
+    """
+    TTL cache for a single secret with background refresh
+
+    Within ``ttl - refresh_ahead`` of the last fetch the cached value is returned
+    without any network call. In the refresh-ahead window the cached value is
+    still returned while one background thread fetches a new copy, so callers
+    only block on Secrets Manager at cold start, after expiry, or on refresh().
+
+    Args:
+        fetch: Callable returning the secret dictionary
+        ttl: Seconds a fetched secret is considered valid
+        refresh_ahead: Seconds before expiry to start a background refresh
+    """
+
+    def __init__(self, fetch: Callable[[], Dict], ttl: float = SECRET_TTL,
+                 refresh_ahead: float = SECRET_REFRESH_AHEAD):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl)
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()  # Serializes synchronous fetches so cold start is one call
+        self._generation = 0
+        self._value: Optional[Dict] = None
+        self._fetched_at = 0.0
+        self._refreshing = False
+        self.fetches = 0
+        self.refresh_failures = 0
+
+    def _load(self) -> Dict:
+        value = self._fetch()
+        with self._lock:
+            self._value = value
+            self._fetched_at = time.monotonic()
+            self._generation += 1
+            self.fetches += 1
+        return value
+
+    def _background_refresh(self):
+        try:
+            self._load()
+            logger.info("🔄 Refreshed database credentials in background")
+        except Exception as e:
+            # Keep serving the cached secret; the next get() after expiry retries synchronously
+            self.refresh_failures += 1
+            logger.warning(f"Background credential refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _fresh_value(self) -> Optional[Dict]:
+        with self._lock:
+            age = time.monotonic() - self._fetched_at
+            if self._value is None or age >= self.ttl:
+                return None
+            if age >= self.ttl - self.refresh_ahead and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._background_refresh, name='db-credential-refresh',
+                                 daemon=True).start()
+            return self._value
+
+    def get(self) -> Dict:
+        """Get the secret, fetching synchronously only if missing or expired"""
+        value = self._fresh_value()
+        if value is not None:
+            return value
+        with self._fetch_lock:
+            # Another thread may have fetched while we waited for the lock
+            value = self._fresh_value()
+            return value if value is not None else self._load()
+
+    def refresh(self) -> Dict:
+        """
+        Force a synchronous re-fetch (e.g. after an authentication failure)
+
+        Concurrent callers that fail together share a single fetch.
+        """
+        with self._lock:
+            generation = self._generation
+        with self._fetch_lock:
+            with self._lock:
+                if self._generation != generation and self._value is not None:
+                    return self._value
+            return self._load()
+
+    def invalidate(self):
+        """Drop the cached secret so the next get() fetches it again"""
+        with self._lock:
+            self._value = None
+            self._fetched_at = 0.0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'fetches': self.fetches,
+                'refresh_failures': self.refresh_failures,
+                'age_seconds': round(time.monotonic() - self._fetched_at, 1) if self._value is not None else None,
+                'ttl_seconds': self.ttl,
+            }
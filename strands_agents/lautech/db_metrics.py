@@ -0,0 +1,336 @@
+"""
+Query instrumentation for LAUTECH db_utils / db_async
+
+Every query is recorded under its logical name (the db_queries registry name,
+or ``sql.<verb>`` for ad-hoc statements), never its SQL text:
+
+- latency histogram (fixed millisecond buckets) with estimated percentiles
+- rows returned and bytes serialized (JSON-encoded result size, estimated
+  from the first row unless ``DB_METRICS_EXACT_BYTES=true``)
+- slow-query log above ``DB_SLOW_QUERY_MS``, optionally with the query plan
+  (``EXPLAIN (ANALYZE, BUFFERS)`` on PostgreSQL, ``EXPLAIN QUERY PLAN`` on SQLite)
+
+Stats are available from ``query_metrics.stats()`` and can be written to
+stdout as CloudWatch Embedded Metric Format lines (``DB_METRICS_EMF=true``)
+for the dashboard created by setup/setup_monitoring.py. EMF lines go through
+the ``lautech.emf`` logger, which writes bare JSON to stdout and doesn't
+propagate to the application log.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Metrics configuration
+METRICS_ENABLED = os.getenv('DB_METRICS_ENABLED', 'true').lower() == 'true'
+EXACT_BYTES = os.getenv('DB_METRICS_EXACT_BYTES', 'false').lower() == 'true'  # Serialize whole results to count bytes
+SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', '200'))
+EXPLAIN_SLOW_QUERIES = os.getenv('DB_EXPLAIN_SLOW_QUERIES', 'false').lower() == 'true'
+EXPLAIN_INTERVAL = float(os.getenv('DB_EXPLAIN_INTERVAL', '300'))  # Min seconds between plans for one query
+EMF_ENABLED = os.getenv('DB_METRICS_EMF', 'false').lower() == 'true'
+EMF_INTERVAL = float(os.getenv('DB_METRICS_EMF_INTERVAL', '60'))  # Seconds between EMF flushes
+EMF_NAMESPACE = os.getenv('DB_METRICS_NAMESPACE', 'LAUTECH/Database')
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+EMF_MAX_VALUES = 100  # CloudWatch accepts at most 100 values per metric per EMF line
+SLOW_LOG_SIZE = 50
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, default=str, separators=(',', ':')))
+
+
+def result_size(result: Any, exact: bool = EXACT_BYTES) -> Tuple[int, int]:
+    """
+    Rows and JSON-encoded bytes of a query result
+
+    Unless exact, bytes are estimated as rows x the size of the first row, so
+    recording a query doesn't serialize its whole result.
+    """
+    if result is None:
+        return 0, 0
+    if hasattr(result, 'as_lists'):  # db_results.Table
+        rows = len(result)
+        if exact:
+            return rows, _json_size(result.as_lists())
+        return rows, _json_size(result.columns) + (rows * (_json_size(list(result.rows[0])) + 1) if rows else 0)
+    if not isinstance(result, list):
+        return 1, _json_size(result)
+    rows = len(result)
+    if exact or not rows:
+        return rows, _json_size(result)
+    return rows, rows * (_json_size(result[0]) + 1) + 1
+
+
+class QueryStats:
+    """Cumulative stats for one logical query name"""
+
+    __slots__ = ('count', 'errors', 'slow', 'total_ms', 'max_ms', 'rows', 'bytes', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.slow = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, duration_ms: float, rows: int, nbytes: int, error: bool, slow: bool):
+        self.count += 1
+        self.errors += error
+        self.slow += slow
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.rows += rows
+        self.bytes += nbytes
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else round(self.max_ms, 2)
+        return round(self.max_ms, 2)
+
+    def as_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'slow': self.slow,
+            'avg_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max_ms, 2),
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'histogram': dict(zip([f'le_{b}ms' for b in LATENCY_BUCKETS_MS] + ['gt_max'], self.buckets)),
+        }
+
+
+class _Interval:
+    """Per-flush accumulator for EMF output (latency samples are reservoir-sampled)"""
+
+    __slots__ = ('count', 'errors', 'slow', 'rows', 'bytes', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.slow = 0
+        self.rows = 0
+        self.bytes = 0
+        self.samples: List[float] = []
+
+    def add(self, duration_ms: float, rows: int, nbytes: int, error: bool, slow: bool):
+        self.count += 1
+        self.errors += error
+        self.slow += slow
+        self.rows += rows
+        self.bytes += nbytes
+        if len(self.samples) < EMF_MAX_VALUES:
+            self.samples.append(round(duration_ms, 3))
+        else:
+            i = random.randrange(self.count)
+            if i < EMF_MAX_VALUES:
+                self.samples[i] = round(duration_ms, 3)
+
+
+class QueryMetrics:
+    """
+    Thread-safe registry of per-query stats
+
+    Args:
+        slow_ms: Queries taking longer than this are logged as slow
+        explain: Capture the query plan of slow read-only queries
+        explain_interval: Minimum seconds between plan captures for the same query
+        emf: Write CloudWatch EMF lines every emf_interval seconds
+        emf_interval: Seconds between EMF flushes
+        enabled: If False, record() is a no-op
+    """
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, explain: bool = EXPLAIN_SLOW_QUERIES,
+                 explain_interval: float = EXPLAIN_INTERVAL, emf: bool = EMF_ENABLED,
+                 emf_interval: float = EMF_INTERVAL, enabled: bool = METRICS_ENABLED):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.emf = emf
+        self.emf_interval = emf_interval
+        self.enabled = enabled
+        self.emf_writer: Callable[[str], None] = _emf_logger().info
+
+        self._lock = threading.Lock()
+        self._stats: Dict[str, QueryStats] = {}
+        self._interval: Dict[str, _Interval] = {}
+        self._last_emit = time.monotonic()
+        self._explained_at: Dict[str, float] = {}
+        self._slow_log: deque = deque(maxlen=SLOW_LOG_SIZE)
+        self._listeners: List[Callable[[Dict], None]] = []
+
+    def add_listener(self, listener: Callable[[Dict], None]):
+        """Call listener(event) after every recorded query (event keys as in record())"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Dict], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def should_explain(self, name: str, duration_ms: float) -> bool:
+        """Return True (at most once per explain_interval per query) if a slow query's plan should be captured"""
+        if not (self.enabled and self.explain) or duration_ms < self.slow_ms:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained_at.get(name, float('-inf')) < self.explain_interval:
+                return False
+            self._explained_at[name] = now
+            return True
+
+    def record(self, name: str, duration_ms: float, result: Any = None, error: Optional[Exception] = None,
+               plan: Optional[str] = None, dialect: Optional[str] = None):
+        """
+        Record one query execution
+
+        Args:
+            name: Logical query name
+            duration_ms: Wall-clock time including fetch
+            result: Fetched rows (list of dicts or a Table), a single row, or None
+            error: Exception raised by the query, if any
+            plan: Query plan captured after should_explain() returned True
+            dialect: 'sqlite' or 'postgres', passed through to listeners
+        """
+        if not self.enabled:
+            return
+        rows, nbytes = result_size(result)
+        slow = duration_ms >= self.slow_ms
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = QueryStats()
+            stats.add(duration_ms, rows, nbytes, error is not None, slow)
+            if self.emf:
+                interval = self._interval.get(name)
+                if interval is None:
+                    interval = self._interval[name] = _Interval()
+                interval.add(duration_ms, rows, nbytes, error is not None, slow)
+            if slow:
+                self._slow_log.append({'name': name, 'duration_ms': round(duration_ms, 2), 'rows': rows,
+                                       'at': time.time(), 'plan': plan})
+            listeners = list(self._listeners)
+
+        if slow:
+            logger.warning(f"🐢 Slow query {name}: {duration_ms:.1f} ms, {rows} rows, {nbytes} bytes")
+            if plan:
+                logger.warning(f"🐢 Plan for {name}:\n{plan}")
+
+        event = {'name': name, 'dialect': dialect, 'duration_ms': duration_ms, 'rows': rows,
+                 'bytes': nbytes, 'slow': slow, 'error': error, 'plan': plan}
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Query metrics listener failed: {e}")
+
+        if self.emf and time.monotonic() - self._last_emit >= self.emf_interval:
+            self.emit_emf()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Cumulative stats per logical query name"""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in sorted(self._stats.items())}
+
+    def slow_queries(self) -> List[Dict]:
+        """Most recent slow queries, oldest first"""
+        with self._lock:
+            return list(self._slow_log)
+
+    def emf_documents(self) -> List[Dict]:
+        """Take the stats recorded since the last flush as CloudWatch EMF documents (one per query)"""
+        with self._lock:
+            interval, self._interval = self._interval, {}
+            self._last_emit = time.monotonic()
+
+        timestamp = int(time.time() * 1000)
+        documents = []
+        for name, data in sorted(interval.items()):
+            documents.append({
+                '_aws': {
+                    'Timestamp': timestamp,
+                    'CloudWatchMetrics': [{
+                        'Namespace': EMF_NAMESPACE,
+                        'Dimensions': [['QueryName']],
+                        'Metrics': [
+                            {'Name': 'QueryLatency', 'Unit': 'Milliseconds'},
+                            {'Name': 'QueryCount', 'Unit': 'Count'},
+                            {'Name': 'QueryErrors', 'Unit': 'Count'},
+                            {'Name': 'SlowQueries', 'Unit': 'Count'},
+                            {'Name': 'RowsReturned', 'Unit': 'Count'},
+                            {'Name': 'BytesSerialized', 'Unit': 'Bytes'},
+                        ],
+                    }],
+                },
+                'QueryName': name,
+                'QueryLatency': data.samples,
+                'QueryCount': data.count,
+                'QueryErrors': data.errors,
+                'SlowQueries': data.slow,
+                'RowsReturned': data.rows,
+                'BytesSerialized': data.bytes,
+            })
+        return documents
+
+    def emit_emf(self):
+        """Write pending stats as EMF log lines (CloudWatch Logs turns them into metrics)"""
+        for document in self.emf_documents():
+            try:
+                self.emf_writer(json.dumps(document, separators=(',', ':')))
+            except Exception as e:
+                logger.warning(f"Failed to write EMF metrics: {e}")
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._interval.clear()
+            self._slow_log.clear()
+            self._explained_at.clear()
+
+
+def _emf_logger() -> logging.Logger:
+    """Logger writing bare EMF JSON lines to stdout, kept out of the application log"""
+    emf_logger = logging.getLogger('lautech.emf')
+    if not emf_logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        emf_logger.addHandler(handler)
+        emf_logger.setLevel(logging.INFO)
+        emf_logger.propagate = False
+    return emf_logger
+
+
+query_metrics = QueryMetrics()
+
+
+def statement_name(sql: str) -> str:
+    """Logical name for an ad-hoc statement, e.g. 'sql.select'"""
+    words = sql.split(None, 1)
+    return f"sql.{words[0].lower()}" if words else 'sql.empty'
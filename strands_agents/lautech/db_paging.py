@@ -0,0 +1,120 @@
+"""
+Keyset pagination for the LAUTECH get_* helpers
+
+Each pageable table has a unique sort key (``code`` for courses, the rowid
+``id`` otherwise, prefixed by the display order column). A page query asks
+for rows strictly after the previous page's last key, so fetching page N
+never re-reads pages 1..N-1, and a page cursor stays valid while rows are
+added or removed.
+
+Cursors are opaque URL-safe strings that carry the table, the last key and
+the filters, so "the next 10" needs nothing but the cursor.
+"""
+
+import json
+import base64
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+
+class PagedTable:
+    """How one table is paged: its page query, sort key and filters"""
+
+    __slots__ = ('query', 'key', 'hidden', 'filters')
+
+    def __init__(self, query: str, key: Tuple[str, ...], filters: Dict[str, Any], hidden: Tuple[str, ...] = ()):
+        self.query = query
+        self.key = key
+        self.hidden = hidden  # Key columns the matching get_* helper doesn't return
+        self.filters = filters  # Filter name -> function building the query parameter
+
+    def params(self, after: Optional[List], filters: Dict, limit: Optional[int]) -> Dict:
+        params = {f'after_{column}': None for column in self.key}
+        if after is not None:
+            params.update(zip((f'after_{column}' for column in self.key), after))
+        for name, build in self.filters.items():
+            params.update(build(filters.get(name)))
+        params['limit'] = limit
+        return params
+
+    def last_key(self, row: Dict) -> List:
+        return [row[column] for column in self.key]
+
+    def strip(self, row: Dict) -> Dict:
+        if not self.hidden:
+            return row
+        return {k: v for k, v in row.items() if k not in self.hidden}
+
+
+def _pattern(level: Optional[str]) -> Dict:
+    return {'pattern': f'%{level.lower()}%' if level else None}
+
+
+def _gender(gender: Optional[str]) -> Dict:
+    return {'gender': gender.strip().lower() if gender else None}
+
+
+PAGED_TABLES: Dict[str, PagedTable] = {
+    'courses': PagedTable('courses.page', key=('code',), filters={}),
+    'fees': PagedTable('fees.page', key=('id',), filters={'level': _pattern}, hidden=('id',)),
+    'calendar': PagedTable('calendar.page', key=('event_date', 'id'), filters={}, hidden=('id',)),
+    'hostels': PagedTable('hostels.page', key=('name', 'id'), filters={'gender': _gender}, hidden=('id',)),
+}
+
+
+def paged_table(table: str) -> PagedTable:
+    try:
+        return PAGED_TABLES[table]
+    except KeyError:
+        raise ValueError(f"Table can't be paged: {table}") from None
+
+
+def encode_cursor(table: str, after: List, filters: Dict) -> str:
+    """Opaque cursor resuming after the given key"""
+    payload = json.dumps([table, after, filters], separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, table: str) -> Tuple[List, Dict]:
+    """Decode a cursor from encode_cursor() into (last key, filters)"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_table, after, filters = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid page cursor: {e}") from None
+    if cursor_table != table:
+        raise ValueError(f"Page cursor is for {cursor_table}, not {table}")
+    return after, filters
+
+
+def clean_filters(spec: PagedTable, filters: Dict) -> Dict:
+    """Keep the filters a table supports, dropping empty ones"""
+    unknown = set(filters) - set(spec.filters)
+    if unknown:
+        raise ValueError(f"Unsupported filter(s): {', '.join(sorted(unknown))}")
+    return {name: value for name, value in filters.items() if value}
+
+
+def resolve(table: str, page_size: int, cursor: Optional[str], filters: Dict) -> Tuple[PagedTable, Optional[List], Dict, int]:
+    """Validate a page request; a cursor carries its own filters"""
+    spec = paged_table(table)
+    filters = clean_filters(spec, filters)
+    after = None
+    if cursor:
+        after, cursor_filters = decode_cursor(cursor, table)
+        if filters and filters != cursor_filters:
+            raise ValueError("Filters don't match the page cursor")
+        filters = cursor_filters
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    return spec, after, filters, page_size
+
+
+def build_page(spec: PagedTable, table: str, rows: List[Dict], page_size: int, filters: Dict) -> Dict:
+    """Turn page_size + 1 fetched rows into a page with the next cursor (None on the last page)"""
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(table, spec.last_key(rows[-1]), filters)
+    return {'rows': [spec.strip(row) for row in rows], 'next_cursor': next_cursor}
@@ -0,0 +1,385 @@
+"""
+Connection pooling for LAUTECH db_utils
+Thread-safe pool for PostgreSQL and per-thread persistent connections for SQLite
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration
+POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))  # Max seconds to wait for a free connection
+POOL_IDLE_TIMEOUT = float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))  # Close idle connections above min size
+POOL_REAP_INTERVAL = float(os.getenv('DB_POOL_REAP_INTERVAL', '60'))  # Seconds between background reaps; 0 disables
+POOL_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', '30'))  # Ping connections idle this long
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+
+class PoolMetrics:
+    """Counters describing pool behaviour, used to size the pool under load"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.health_check_failures = 0
+        self.in_use = 0
+        self.idle = 0
+
+    def record_checkout(self, waited: float):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.checkout_wait_total += waited
+            self.checkout_wait_max = max(self.checkout_wait_max, waited)
+
+    def record_checkin(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self) -> Dict:
+        """Return a point-in-time copy of all counters"""
+        with self._lock:
+            return {
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+                'checkouts': self.checkouts,
+                'checkout_timeouts': self.checkout_timeouts,
+                'checkout_wait_avg_ms': round(1000 * self.checkout_wait_total / self.checkouts, 3) if self.checkouts else 0.0,
+                'checkout_wait_max_ms': round(1000 * self.checkout_wait_max, 3),
+                'health_check_failures': self.health_check_failures,
+                'in_use': self.in_use,
+                'idle': self.idle,
+            }
+
+
+class _IdleConnection:
+    __slots__ = ('conn', 'returned_at')
+
+    def __init__(self, conn, returned_at: float):
+        self.conn = conn
+        self.returned_at = returned_at
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of long-lived DB-API connections
+
+    Connections are handed out most-recently-used first so that a small working
+    set stays warm, while connections idle longer than ``idle_timeout`` are
+    reaped back down to ``min_size``, on checkout and, once start_reaper() has
+    been called, every ``POOL_REAP_INTERVAL`` seconds on a daemon thread so they
+    are closed even when traffic stops. A connection that has been idle longer
+    than ``health_check_interval`` is pinged before it is handed out.
+
+    Args:
+        connect: Callable returning a new connection
+        min_size: Connections kept open even when idle
+        max_size: Upper bound on open connections
+        timeout: Seconds to wait for a connection before raising PoolTimeout
+        idle_timeout: Seconds after which idle connections above min_size are closed
+        health_check_interval: Idle seconds after which a connection is pinged before reuse
+        ping: Callable(conn) raising if the connection is unusable
+        reset: Callable(conn) restoring a returned connection to a clean state
+        is_closed: Callable(conn) returning True if the connection is already closed
+    """
+
+    def __init__(self, connect: Callable, min_size: int = POOL_MIN_SIZE, max_size: int = POOL_MAX_SIZE,
+                 timeout: float = POOL_TIMEOUT, idle_timeout: float = POOL_IDLE_TIMEOUT,
+                 health_check_interval: float = POOL_HEALTH_CHECK_INTERVAL,
+                 ping: Optional[Callable] = None, reset: Optional[Callable] = None,
+                 is_closed: Optional[Callable] = None):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Invalid pool sizes: min={min_size}, max={max_size}")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self._ping = ping
+        self._reset = reset
+        self._is_closed = is_closed or (lambda conn: False)
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._size = 0  # Open connections, idle + in use + being created
+        self._closed = False
+        self._stop_reaper = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+        self.metrics = PoolMetrics()
+
+    def fill(self):
+        """Open connections until min_size are available"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            conn = self._create()
+            self._checkin(conn)
+
+    def _create(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self.metrics.incr('connections_created')
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {e}")
+        self.metrics.incr('connections_closed')
+
+    def _discard(self, conn):
+        self._close(conn)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _reap_locked(self, now: float) -> list:
+        """Pop connections idle past idle_timeout (oldest first); caller closes them outside the lock"""
+        reaped = []
+        while self._idle and self._size > self.min_size and now - self._idle[0].returned_at > self.idle_timeout:
+            reaped.append(self._idle.popleft().conn)
+            self._size -= 1
+        self.metrics.idle = len(self._idle)
+        return reaped
+
+    def _healthy(self, entry: _IdleConnection, now: float) -> bool:
+        if self._is_closed(entry.conn):
+            return False
+        if self._ping is None or now - entry.returned_at < self.health_check_interval:
+            return True
+        try:
+            self._ping(entry.conn)
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled connection failed health check: {e}")
+            self.metrics.incr('health_check_failures')
+            return False
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Check out a connection, waiting up to timeout seconds for one to free up"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            entry = None
+            create = False
+            reaped = []
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    now = time.monotonic()
+                    reaped.extend(self._reap_locked(now))
+                    if self._idle:
+                        entry = self._idle.pop()
+                        self.metrics.idle = len(self._idle)
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.metrics.incr('checkout_timeouts')
+                        raise PoolTimeout(f"No database connection available within {timeout:.1f}s "
+                                          f"(max_size={self.max_size})")
+                    self._cond.wait(remaining)
+
+            for conn in reaped:
+                self._close(conn)
+
+            if create:
+                conn = self._create()
+            elif self._healthy(entry, time.monotonic()):
+                conn = entry.conn
+            else:
+                self._discard(entry.conn)
+                continue
+
+            self.metrics.record_checkout(time.monotonic() - start)
+            return conn
+
+    def _checkin(self, conn):
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                close = True
+            else:
+                self._idle.append(_IdleConnection(conn, time.monotonic()))
+                self.metrics.idle = len(self._idle)
+                self._cond.notify()
+                close = False
+        if close:
+            self._close(conn)
+
+    def release(self, conn, discard: bool = False):
+        """Return a connection to the pool, or close it if it is broken"""
+        self.metrics.record_checkin()
+        if not discard and not self._is_closed(conn):
+            try:
+                if self._reset is not None:
+                    self._reset(conn)
+            except Exception as e:
+                logger.warning(f"Discarding connection that failed to reset: {e}")
+                discard = True
+        else:
+            discard = True
+
+        if discard:
+            self._discard(conn)
+        else:
+            self._checkin(conn)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager that checks a connection out and always returns it"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            # Also on GeneratorExit/cancellation: release() resets the connection, or discards it
+            # if it is closed or the reset fails
+            self.release(conn)
+
+    def reap_idle(self):
+        """Close connections idle longer than idle_timeout, keeping min_size open"""
+        with self._cond:
+            reaped = self._reap_locked(time.monotonic())
+        for conn in reaped:
+            self._close(conn)
+
+    def start_reaper(self, interval: float = POOL_REAP_INTERVAL):
+        """Run reap_idle() every interval seconds on a daemon thread until close()"""
+        if interval <= 0 or self._reaper is not None:
+            return
+
+        def run():
+            while not self._stop_reaper.wait(interval):
+                try:
+                    self.reap_idle()
+                except Exception as e:
+                    logger.warning(f"Idle connection reaping failed: {e}")
+
+        self._reaper = threading.Thread(target=run, name='db-pool-reaper', daemon=True)
+        self._reaper.start()
+
+    def close(self):
+        """Close all idle connections; in-use connections are closed when released"""
+        self._stop_reaper.set()
+        with self._cond:
+            self._closed = True
+            idle = [entry.conn for entry in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self.metrics.idle = 0
+            self._cond.notify_all()
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self) -> Dict:
+        """Pool metrics plus current sizing"""
+        stats = self.metrics.snapshot()
+        with self._cond:
+            stats.update(size=self._size, min_size=self.min_size, max_size=self.max_size)
+        return stats
+
+
+class ThreadLocalConnections:
+    """
+    One persistent connection per thread, for SQLite
+
+    sqlite3 connections are cheap to use but not to open (file open, schema
+    parse), and must not be shared across threads, so each worker thread keeps
+    its own for as long as the thread lives. Connections left behind by exited
+    threads are closed the next time a thread opens a connection.
+    """
+
+    def __init__(self, connect: Callable):
+        self._connect = connect
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+        self.metrics = PoolMetrics()
+
+    def _get(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                orphaned = [c for t, c in self._all if not t.is_alive()]
+                self._all = [(t, c) for t, c in self._all if t.is_alive()]
+                self._all.append((threading.current_thread(), conn))
+            self.metrics.incr('connections_created')
+            for orphan in orphaned:
+                self._close(orphan)
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Error closing SQLite connection: {e}")
+        self.metrics.incr('connections_closed')
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager yielding this thread's connection; rolls back on error"""
+        start = time.monotonic()
+        conn = self._get()
+        self.metrics.record_checkout(time.monotonic() - start)
+        try:
+            yield conn
+        except BaseException:  # Including GeneratorExit from a caller that stopped reading
+            try:
+                conn.rollback()
+            except Exception as e:
+                logger.debug(f"Rollback failed: {e}")
+            raise
+        finally:
+            self.metrics.record_checkin()
+
+    def close(self):
+        """Close every thread's connection (call at shutdown)"""
+        with self._lock:
+            conns, self._all = [c for _, c in self._all], []
+        for conn in conns:
+            self._close(conn)
+        self._local = threading.local()
+
+    def stats(self) -> Dict:
+        stats = self.metrics.snapshot()
+        with self._lock:
+            stats.update(size=len(self._all))
+        return stats
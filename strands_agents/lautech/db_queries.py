@@ -0,0 +1,300 @@
+"""
+Query registry for LAUTECH db_utils
+
+Each query is defined once in dialect-neutral SQL with ``:name`` parameters
+and compiled at import time for every backend:
+
+- SQLite: the neutral text itself (sqlite3 binds ``:name`` natively), so the
+  connection's statement cache is keyed on one stable string per query
+- PostgreSQL (psycopg2): a server-side ``PREPARE`` with ``$n`` parameters plus
+  the matching ``EXECUTE``, and a ``%(name)s`` form for unprepared execution
+- PostgreSQL (asyncpg): the ``$n`` text with an ordered parameter list
+
+Queries whose SQL genuinely differs per backend (e.g. full-text search) can
+pass a ``postgres=`` override in the same neutral syntax.
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+_PARAM = re.compile(r'(?<![:\w]):([A-Za-z_]\w*)')
+
+
+class Query:
+    """A named query compiled for each supported dialect"""
+
+    __slots__ = ('name', 'readonly', 'sqlite_sql', 'pg_sql', 'pg_numbered_sql',
+                 'pg_param_names', 'prepare_sql', 'execute_sql')
+
+    def __init__(self, name: str, sql: str, postgres: Optional[str] = None, readonly: bool = True):
+        self.name = name
+        self.readonly = readonly
+        self.sqlite_sql = _clean(sql)
+
+        pg_source = _clean(postgres or sql)
+        names = []
+
+        def number(match):
+            param = match.group(1)
+            if param not in names:
+                names.append(param)
+            return f'${names.index(param) + 1}'
+
+        self.pg_numbered_sql = _PARAM.sub(number, pg_source)
+        self.pg_param_names: Tuple[str, ...] = tuple(names)
+        self.pg_sql = _PARAM.sub(r'%(\1)s', pg_source.replace('%', '%%'))
+
+        statement = prepared_name(name)
+        self.prepare_sql = f'PREPARE {statement} AS {self.pg_numbered_sql}'
+        placeholders = ', '.join(['%s'] * len(names))
+        self.execute_sql = f'EXECUTE {statement} ({placeholders})' if names else f'EXECUTE {statement}'
+
+    def pg_args(self, params: Optional[Dict]) -> Tuple:
+        """Order named parameters for the $n / EXECUTE forms"""
+        params = params or {}
+        return tuple(params[name] for name in self.pg_param_names)
+
+    def __repr__(self):
+        return f'Query({self.name!r})'
+
+
+def _clean(sql: str) -> str:
+    # Collapse whitespace so logs and statement caches see one canonical string
+    return ' '.join(sql.split())
+
+
+def prepared_name(name: str) -> str:
+    """Server-side statement name for a query (dots aren't valid identifiers)"""
+    return 'lautech_' + re.sub(r'\W', '_', name)
+
+
+QUERIES: Dict[str, Query] = {}
+
+
+def register(name: str, sql: str, postgres: Optional[str] = None, readonly: bool = True) -> Query:
+    """Define and compile a query; names must be unique"""
+    if name in QUERIES:
+        raise ValueError(f"Query already registered: {name}")
+    query = Query(name, sql, postgres=postgres, readonly=readonly)
+    QUERIES[name] = query
+    return query
+
+
+def get(name: str) -> Query:
+    """Look up a registered query by name"""
+    try:
+        return QUERIES[name]
+    except KeyError:
+        raise KeyError(f"Unknown query: {name}") from None
+
+
+# ============================================================================
+# LAUTECH QUERIES
+# ============================================================================
+
+register('meta.data_version', "SELECT value FROM meta WHERE key = 'data_version'")
+register('meta.next_deadlines_as_of', "SELECT value FROM meta WHERE key = 'next_deadlines_as_of'")
+
+register('courses.list', """
+    SELECT code, name, credits, department FROM courses ORDER BY code LIMIT :limit
+""")
+
+register('courses.by_code', "SELECT * FROM courses WHERE code = :code")
+
+# Full-text search (see db_schema.create_course_search_index). Both backends
+# match every search word as a prefix of a word in code, name, description or
+# lecturer, plus substrings of the course code (3+ characters), and rank exact
+# code matches, then code matches, then text relevance.
+register('courses.search', """
+    WITH text_hits AS (
+        SELECT rowid, bm25(courses_fts, 10.0, 5.0, 1.0, 2.0) AS score
+        FROM courses_fts WHERE courses_fts MATCH :fts_match
+    ),
+    code_hits AS (
+        SELECT rowid FROM courses_code_fts WHERE courses_code_fts MATCH :code_match
+    ),
+    hits AS (
+        SELECT rowid FROM text_hits UNION SELECT rowid FROM code_hits
+    )
+    SELECT c.code, c.name, c.credits, c.department
+    FROM hits h
+    JOIN courses c ON c.rowid = h.rowid
+    LEFT JOIN text_hits t ON t.rowid = h.rowid
+    ORDER BY lower(c.code) = :code DESC,
+             h.rowid IN (SELECT rowid FROM code_hits) DESC,
+             COALESCE(t.score, 0),
+             c.code
+    LIMIT :limit
+""", postgres="""
+    SELECT code, name, credits, department
+    FROM courses
+    WHERE search_vector @@ to_tsquery('simple', :tsquery)
+       OR code ILIKE :code_pattern
+    ORDER BY lower(code) = :code DESC,
+             code ILIKE :code_pattern DESC,
+             ts_rank(search_vector, to_tsquery('simple', :tsquery)) DESC,
+             code
+    LIMIT :limit
+""")
+
+# Fallback when the search index is unavailable (e.g. SQLite without FTS5)
+register('courses.search_like', """
+    SELECT code, name, credits, department FROM courses
+    WHERE LOWER(name) LIKE :pattern OR LOWER(code) LIKE :pattern
+    LIMIT :limit
+""")
+
+register('fees.list', "SELECT level, amount, fee_type FROM fees ORDER BY id LIMIT :limit")
+
+register('fees.by_level', """
+    SELECT level, amount, fee_type FROM fees WHERE LOWER(level) LIKE :pattern ORDER BY id LIMIT :limit
+""")
+
+register('fees.exact_level', "SELECT * FROM fees WHERE level = :level")
+
+register('calendar.list', """
+    SELECT event_type, event_date, description FROM academic_calendar ORDER BY event_date LIMIT :limit
+""")
+
+# Range scan on idx_calendar_event_date from :today onwards
+register('calendar.upcoming', """
+    SELECT event_type, event_date, description FROM academic_calendar
+    WHERE event_date >= :today
+    ORDER BY event_date
+    LIMIT :limit
+""")
+
+register('calendar.next_deadlines', """
+    SELECT event_type, event_date, description FROM calendar_next_deadlines
+    WHERE event_date >= :today
+    ORDER BY event_date, event_type
+    LIMIT :limit
+""")
+
+# The selection db_schema.refresh_next_deadlines() stores, for databases that
+# can't be refreshed (read-only SQLite) when the stored date is stale
+register('calendar.next_deadlines_live', """
+    SELECT c.event_type, c.event_date, c.description FROM academic_calendar c
+    WHERE c.event_date >= :today AND c.id = (
+        SELECT n.id FROM academic_calendar n
+        WHERE n.event_type = c.event_type AND n.event_date >= :today
+        ORDER BY n.event_date, n.id
+        LIMIT 1
+    )
+    ORDER BY c.event_date, c.event_type
+    LIMIT :limit
+""")
+
+register('calendar.open_on', """
+    SELECT name, starts_on, ends_on, description FROM calendar_windows
+    WHERE starts_on <= :on_date AND ends_on >= :on_date
+    ORDER BY starts_on, name
+""", postgres="""
+    SELECT name, starts_on, ends_on, description FROM calendar_windows
+    WHERE daterange(starts_on, ends_on, '[]') @> CAST(:on_date AS date)
+    ORDER BY starts_on, name
+""")
+
+register('hostels.list', """
+    SELECT name, gender, capacity, status, facilities FROM hostels ORDER BY name LIMIT :limit
+""")
+
+register('hostels.by_gender', """
+    SELECT name, gender, capacity, status FROM hostels
+    WHERE LOWER(gender) IN (:gender, 'mixed')
+    ORDER BY name
+    LIMIT :limit
+""")
+
+# Hostels having every facility in :facilities (a JSON array of canonical names,
+# see db_schema.normalize_facility): one hostel_facilities key range per facility,
+# grouped by hostel. NULL filters match everything.
+register('hostels.search', """
+    SELECT name, gender, capacity, status, facilities FROM hostels
+    WHERE (:facilities IS NULL OR id IN (
+            SELECT hostel_id FROM hostel_facilities
+            WHERE facility IN (SELECT value FROM json_each(:facilities))
+            GROUP BY hostel_id
+            HAVING COUNT(*) = :facility_count))
+      AND (:gender IS NULL OR LOWER(gender) IN (:gender, 'mixed'))
+      AND (:min_capacity IS NULL OR capacity >= :min_capacity)
+    ORDER BY name
+    LIMIT :limit
+""", postgres="""
+    SELECT name, gender, capacity, status, facilities FROM hostels
+    WHERE (CAST(:facilities AS json) IS NULL OR id IN (
+            SELECT hostel_id FROM hostel_facilities
+            WHERE facility IN (SELECT json_array_elements_text(CAST(:facilities AS json)))
+            GROUP BY hostel_id
+            HAVING COUNT(*) = :facility_count))
+      AND (:gender IS NULL OR LOWER(gender) IN (:gender, 'mixed'))
+      AND (:min_capacity IS NULL OR capacity >= :min_capacity)
+    ORDER BY name
+    LIMIT :limit
+""")
+
+# Keyset pages (see db_paging): each query resumes strictly after the last row's
+# sort key, so page N costs the same as page 1. NULL :after_* starts from the
+# beginning, NULL filters match everything, and NULL :limit streams everything.
+register('courses.page', """
+    SELECT code, name, credits, department FROM courses
+    WHERE :after_code IS NULL OR code > :after_code
+    ORDER BY code
+    LIMIT :limit
+""")
+
+register('fees.page', """
+    SELECT id, level, amount, fee_type FROM fees
+    WHERE (:after_id IS NULL OR id > :after_id)
+      AND (:pattern IS NULL OR LOWER(level) LIKE :pattern)
+    ORDER BY id
+    LIMIT :limit
+""")
+
+register('calendar.page', """
+    SELECT id, event_type, event_date, description FROM academic_calendar
+    WHERE :after_event_date IS NULL OR (event_date, id) > (:after_event_date, :after_id)
+    ORDER BY event_date, id
+    LIMIT :limit
+""")
+
+register('hostels.page', """
+    SELECT id, name, gender, capacity, status, facilities FROM hostels
+    WHERE (:after_name IS NULL OR (name, id) > (:after_name, :after_id))
+      AND (:gender IS NULL OR LOWER(gender) IN (:gender, 'mixed'))
+    ORDER BY name, id
+    LIMIT :limit
+""")
+
+# Compact working set of all four tables in one round trip, as a single JSON
+# document (see db_utils.get_snapshot). :limit is one more than the snapshot
+# size so truncated tables can be detected.
+register('snapshot', """
+    SELECT json_object(
+        'courses', json((SELECT json_group_array(json_object(
+                'code', code, 'name', name, 'credits', credits, 'department', department))
+            FROM (SELECT code, name, credits, department FROM courses ORDER BY code LIMIT :limit))),
+        'fees', json((SELECT json_group_array(json_object(
+                'level', level, 'amount', amount, 'fee_type', fee_type))
+            FROM (SELECT level, amount, fee_type FROM fees ORDER BY id LIMIT :limit))),
+        'calendar', json((SELECT json_group_array(json_object(
+                'event_type', event_type, 'event_date', event_date, 'description', description))
+            FROM (SELECT event_type, event_date, description FROM academic_calendar
+                  ORDER BY event_date LIMIT :limit))),
+        'hostels', json((SELECT json_group_array(json_object(
+                'name', name, 'gender', gender, 'capacity', capacity, 'status', status, 'facilities', facilities))
+            FROM (SELECT name, gender, capacity, status, facilities FROM hostels ORDER BY name LIMIT :limit)))
+    ) AS snapshot
+""", postgres="""
+    SELECT json_build_object(
+        'courses', (SELECT coalesce(json_agg(t), '[]'::json) FROM (
+            SELECT code, name, credits, department FROM courses ORDER BY code LIMIT :limit) t),
+        'fees', (SELECT coalesce(json_agg(t), '[]'::json) FROM (
+            SELECT level, amount, fee_type FROM fees ORDER BY id LIMIT :limit) t),
+        'calendar', (SELECT coalesce(json_agg(t), '[]'::json) FROM (
+            SELECT event_type, event_date, description FROM academic_calendar
+            ORDER BY event_date LIMIT :limit) t),
+        'hostels', (SELECT coalesce(json_agg(t), '[]'::json) FROM (
+            SELECT name, gender, capacity, status, facilities FROM hostels ORDER BY name LIMIT :limit) t)
+    ) AS snapshot
+""")
@@ -0,0 +1,213 @@
+"""
+Read-replica routing for LAUTECH db_utils / db_async
+
+Read-only registry queries are spread round-robin across the RDS read
+replicas listed in ``DB_READ_REPLICAS``; writes, DDL and init_database()
+always use the primary. A replica is skipped while its replication lag is
+above ``DB_REPLICA_MAX_LAG`` seconds, and for ``DB_REPLICA_RETRY_AFTER``
+seconds after a connection failure, in which case the read is retried on
+the primary.
+
+The router only needs objects it can hand to a caller-supplied function, so
+it can be exercised with stub pools locally:
+
+    router = ReplicaRouter(primary_pool, {'r1': pool1, 'r2': pool2}, measure_lag=lambda pool: 0.0)
+    rows = router.execute(lambda pool: query_on(pool))
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Replica configuration
+READ_REPLICAS = os.getenv('DB_READ_REPLICAS', '')  # Comma-separated host[:port] list
+REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', '5'))  # Seconds
+REPLICA_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_CHECK_INTERVAL', '10'))  # Seconds between lag checks
+REPLICA_RETRY_AFTER = float(os.getenv('DB_REPLICA_RETRY_AFTER', '30'))  # Seconds a failed replica is skipped
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything
+# it received (so an idle primary doesn't look like lag) and on a primary
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END AS lag
+"""
+
+
+def parse_endpoints(value: str, default_port: int = 5432) -> List[Tuple[str, int]]:
+    """Parse 'host[:port],host[:port]' into (host, port) pairs"""
+    endpoints = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(':')
+        endpoints.append((host, int(port) if port else default_port))
+    return endpoints
+
+
+class Replica:
+    """Routing state for one read replica"""
+
+    __slots__ = ('name', 'pool', 'lag', 'down_until', 'next_check', 'checking', 'reads', 'failures')
+
+    def __init__(self, name: str, pool: Any):
+        self.name = name
+        self.pool = pool
+        self.lag: Optional[float] = None
+        self.down_until = 0.0
+        self.next_check = 0.0  # Check lag before first use
+        self.checking = False
+        self.reads = 0
+        self.failures = 0
+
+
+class ReplicaRouter:
+    """
+    Round-robin router for read-only queries with lag checks and primary fallback
+
+    Args:
+        primary: Pool (or any handle) for the primary
+        replicas: Mapping of replica name to pool
+        measure_lag: Callable(pool) returning replica lag in seconds; for
+            execute_async() it must be a coroutine function
+        max_lag: Replicas lagging more than this many seconds are skipped
+        check_interval: Seconds between lag checks per replica
+        retry_after: Seconds a replica is skipped after a failure
+        is_failover_error: Predicate for errors that should retry on the primary
+            (e.g. connection errors); other errors are raised unchanged
+    """
+
+    def __init__(self, primary: Any, replicas: Dict[str, Any], measure_lag: Callable,
+                 max_lag: float = REPLICA_MAX_LAG, check_interval: float = REPLICA_CHECK_INTERVAL,
+                 retry_after: float = REPLICA_RETRY_AFTER,
+                 is_failover_error: Callable[[Exception], bool] = lambda e: True):
+        self.primary = primary
+        self.replicas = [Replica(name, pool) for name, pool in replicas.items()]
+        self.measure_lag = measure_lag
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.retry_after = retry_after
+        self.is_failover_error = is_failover_error
+
+        self._lock = threading.Lock()
+        self._next = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
+
+    def _claim_checks(self) -> List[Replica]:
+        """Replicas whose lag check is due; each is claimed by exactly one caller"""
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for replica in self.replicas:
+                if not replica.checking and now >= replica.next_check and now >= replica.down_until:
+                    replica.checking = True
+                    due.append(replica)
+        return due
+
+    def _finish_check(self, replica: Replica, lag: Optional[float], error: Optional[Exception] = None):
+        with self._lock:
+            replica.checking = False
+            replica.next_check = time.monotonic() + self.check_interval
+            if error is not None:
+                self._mark_down(replica, error)
+                return
+            was_usable = replica.lag is not None and replica.lag <= self.max_lag
+            replica.lag = lag
+        if lag > self.max_lag and was_usable:
+            logger.warning(f"⏳ Replica {replica.name} is {lag:.1f}s behind (max {self.max_lag}s), skipping it")
+
+    def _mark_down(self, replica: Replica, error: Exception):
+        # Caller holds self._lock
+        replica.failures += 1
+        replica.down_until = time.monotonic() + self.retry_after
+        replica.lag = None
+        replica.next_check = replica.down_until
+        logger.warning(f"⚠️  Replica {replica.name} unavailable, using primary for {self.retry_after:.0f}s: {error}")
+
+    def mark_failed(self, replica: Replica, error: Exception):
+        """Take a replica out of rotation for retry_after seconds"""
+        with self._lock:
+            self._mark_down(replica, error)
+
+    def choose(self) -> Optional[Replica]:
+        """Next usable replica in round-robin order, or None to use the primary"""
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[self._next % len(self.replicas)]
+                self._next += 1
+                if now >= replica.down_until and replica.lag is not None and replica.lag <= self.max_lag:
+                    replica.reads += 1
+                    return replica
+            self.primary_reads += 1
+            return None
+
+    def _fall_back(self, replica: Replica, error: Exception) -> None:
+        if not self.is_failover_error(error):
+            raise error
+        self.mark_failed(replica, error)
+        with self._lock:
+            self.fallbacks += 1
+
+    def execute(self, fn: Callable[[Any], Any]) -> Any:
+        """Run fn(pool) on a replica, or on the primary if none is usable or the replica fails"""
+        for replica in self._claim_checks():
+            try:
+                self._finish_check(replica, float(self.measure_lag(replica.pool)))
+            except Exception as e:
+                self._finish_check(replica, None, e)
+
+        replica = self.choose()
+        if replica is None:
+            return fn(self.primary)
+        try:
+            return fn(replica.pool)
+        except Exception as e:
+            self._fall_back(replica, e)
+        return fn(self.primary)
+
+    async def execute_async(self, fn: Callable[[Any], Any]) -> Any:
+        """execute() for coroutine functions (fn and measure_lag are awaited)"""
+        for replica in self._claim_checks():
+            try:
+                self._finish_check(replica, float(await self.measure_lag(replica.pool)))
+            except Exception as e:
+                self._finish_check(replica, None, e)
+
+        replica = self.choose()
+        if replica is None:
+            return await fn(self.primary)
+        try:
+            return await fn(replica.pool)
+        except Exception as e:
+            self._fall_back(replica, e)
+        return await fn(self.primary)
+
+    def pools(self) -> List[Any]:
+        return [replica.pool for replica in self.replicas]
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'primary_reads': self.primary_reads,
+                'fallbacks': self.fallbacks,
+                'replicas': {
+                    replica.name: {
+                        'available': now >= replica.down_until and replica.lag is not None
+                                     and replica.lag <= self.max_lag,
+                        'lag_seconds': None if replica.lag is None else round(replica.lag, 3),
+                        'reads': replica.reads,
+                        'failures': replica.failures,
+                    }
+                    for replica in self.replicas
+                },
+            }
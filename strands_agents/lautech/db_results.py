@@ -0,0 +1,111 @@
+"""
+Column-oriented query results and compact serialization for tool output
+
+A Table holds one header tuple and row tuples instead of one dict per row:
+fewer Python objects per row, and a tabular rendering that repeats no keys.
+Tool output goes through format_rows(), which writes either CSV-like text
+(the default, cheapest in model tokens) or JSON (orjson when installed).
+"""
+
+import io
+import os
+import csv
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 'csv' (header + rows), 'json' ({"columns", "rows"}) or 'records' (list of objects, the old format)
+TOOL_OUTPUT_FORMAT = os.getenv('TOOL_OUTPUT_FORMAT', 'csv').lower()
+
+
+class Table:
+    """Immutable column-oriented result: a header tuple plus row tuples"""
+
+    __slots__ = ('columns', 'rows')
+
+    def __init__(self, columns: Sequence[str], rows: Iterable[Sequence[Any]]):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.rows: Tuple[Tuple[Any, ...], ...] = tuple(tuple(row) for row in rows)
+
+    @classmethod
+    def from_cursor(cls, cursor, rows: Iterable[Sequence[Any]]) -> 'Table':
+        """Build from a DB-API cursor's description and fetched tuples"""
+        return cls([column[0] for column in cursor.description or ()], rows)
+
+    @classmethod
+    def from_dicts(cls, rows: List[Dict]) -> 'Table':
+        if not rows:
+            return cls((), ())
+        columns = tuple(rows[0])
+        return cls(columns, (tuple(row.get(column) for column in columns) for row in rows))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return bool(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __eq__(self, other):
+        return isinstance(other, Table) and self.columns == other.columns and self.rows == other.rows
+
+    def __repr__(self):
+        return f'Table(columns={self.columns!r}, rows={len(self.rows)})'
+
+    def head(self, n: int) -> 'Table':
+        return Table(self.columns, self.rows[:n])
+
+    def as_dicts(self) -> List[Dict]:
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+    def as_lists(self) -> Dict:
+        """JSON-ready form: {'columns': [...], 'rows': [[...], ...]}"""
+        return {'columns': list(self.columns), 'rows': [list(row) for row in self.rows]}
+
+
+def to_csv(table: Table) -> str:
+    """Header line plus one line per row; fields are quoted only when needed"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(table.columns)
+    writer.writerows(table.rows)
+    return buffer.getvalue().rstrip('\n')
+
+
+def to_json(value: Any) -> str:
+    """Compact JSON, through orjson when installed"""
+    if isinstance(value, Table):
+        value = value.as_lists()
+    if HAS_ORJSON:
+        return orjson.dumps(value, default=str).decode()
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def format_rows(rows: Union[Table, List[Dict]], output_format: str = None) -> str:
+    """
+    Serialize query results for a tool response
+
+    Args:
+        rows: A Table or a list of row dictionaries
+        output_format: 'csv', 'json' or 'records' (default TOOL_OUTPUT_FORMAT)
+
+    Returns:
+        The rows as compact text
+    """
+    output_format = output_format or TOOL_OUTPUT_FORMAT
+    if output_format == 'records':
+        return to_json(rows.as_dicts() if isinstance(rows, Table) else rows)
+    table = rows if isinstance(rows, Table) else Table.from_dicts(rows)
+    if output_format == 'json':
+        return to_json(table)
+    return to_csv(table)
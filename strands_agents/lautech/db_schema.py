@@ -0,0 +1,620 @@
+"""
+Schema helpers shared by db_utils, import_data.py and setup/migrate_to_rds.py
+
+migrate() brings a SQLite or PostgreSQL database up to the latest schema
+version by applying the numbered MIGRATIONS in order, and records the
+version in the meta table. The other helpers take a DB-API cursor and use
+SQL that runs unchanged on both backends unless they take a dialect.
+"""
+
+import os
+import re
+import logging
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+logger = logging.getLogger(__name__)
+
+# Key/value table for database-level metadata such as the data version
+META_TABLE = """
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value BIGINT NOT NULL
+    )
+"""
+
+DATA_VERSION_KEY = 'data_version'
+SCHEMA_VERSION_KEY = 'schema_version'
+
+
+def create_meta_table(cursor):
+    """Create the meta table if it doesn't exist"""
+    cursor.execute(META_TABLE)
+
+
+def bump_data_version(cursor) -> Optional[int]:
+    """
+    Increment the data version after changing table contents
+
+    Every process caching query results (see db_cache.py) drops its cache when
+    it next sees a new version. Call this inside the same transaction as the
+    data change.
+    """
+    create_meta_table(cursor)
+    cursor.execute(f"""
+        INSERT INTO meta (key, value) VALUES ('{DATA_VERSION_KEY}', 1)
+        ON CONFLICT (key) DO UPDATE SET value = meta.value + 1
+    """)
+    return read_data_version(cursor)
+
+
+def _read_meta(cursor, key: str) -> int:
+    cursor.execute(f"SELECT value FROM meta WHERE key = '{key}'")
+    row = cursor.fetchone()
+    if row is None:
+        return 0
+    return row['value'] if isinstance(row, dict) else row[0]
+
+
+def _write_meta(cursor, key: str, value: int):
+    cursor.execute(f"""
+        INSERT INTO meta (key, value) VALUES ('{key}', {int(value)})
+        ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value
+    """)
+
+
+def read_data_version(cursor) -> Optional[int]:
+    """Read the current data version (0 if the data has never been versioned)"""
+    return _read_meta(cursor, DATA_VERSION_KEY)
+
+
+def read_schema_version(cursor) -> int:
+    """Read the applied schema version (0 before the first migrate())"""
+    return _read_meta(cursor, SCHEMA_VERSION_KEY)
+
+
+# ============================================================================
+# COURSE SEARCH INDEX
+# ============================================================================
+
+# SQLite: FTS5 external-content tables over courses, kept in sync by triggers.
+# courses_fts ranks word/prefix matches across code, name, description and
+# lecturer; courses_code_fts is a trigram index for substring matches on codes.
+SQLITE_COURSE_SEARCH = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5(
+        code, name, description, lecturer,
+        content='courses', content_rowid='rowid'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS courses_code_fts USING fts5(
+        code,
+        content='courses', content_rowid='rowid', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_search_ai AFTER INSERT ON courses BEGIN
+        INSERT INTO courses_fts (rowid, code, name, description, lecturer)
+        VALUES (new.rowid, new.code, new.name, new.description, new.lecturer);
+        INSERT INTO courses_code_fts (rowid, code) VALUES (new.rowid, new.code);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_search_ad AFTER DELETE ON courses BEGIN
+        INSERT INTO courses_fts (courses_fts, rowid, code, name, description, lecturer)
+        VALUES ('delete', old.rowid, old.code, old.name, old.description, old.lecturer);
+        INSERT INTO courses_code_fts (courses_code_fts, rowid, code) VALUES ('delete', old.rowid, old.code);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_search_au AFTER UPDATE ON courses BEGIN
+        INSERT INTO courses_fts (courses_fts, rowid, code, name, description, lecturer)
+        VALUES ('delete', old.rowid, old.code, old.name, old.description, old.lecturer);
+        INSERT INTO courses_code_fts (courses_code_fts, rowid, code) VALUES ('delete', old.rowid, old.code);
+        INSERT INTO courses_fts (rowid, code, name, description, lecturer)
+        VALUES (new.rowid, new.code, new.name, new.description, new.lecturer);
+        INSERT INTO courses_code_fts (rowid, code) VALUES (new.rowid, new.code);
+    END
+    """,
+]
+
+# PostgreSQL: weighted tsvector (same column weights as the SQLite bm25 ranking)
+# with a GIN index, plus a pg_trgm index for substring matches on codes.
+POSTGRES_COURSE_SEARCH = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE courses ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(code, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(name, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(lecturer, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_courses_search ON courses USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS idx_courses_code_trgm ON courses USING GIN (code gin_trgm_ops)",
+]
+
+
+def has_course_search_index(cursor, dialect: str) -> bool:
+    """Check whether create_course_search_index() has been applied"""
+    if dialect == 'postgres':
+        cursor.execute("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'courses' AND column_name = 'search_vector'
+        """)
+    else:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'courses_fts'")
+    return cursor.fetchone() is not None
+
+
+def create_course_search_index(cursor, dialect: str):
+    """
+    Create the full-text course search index (idempotent)
+
+    Args:
+        cursor: Open cursor; the caller commits
+        dialect: 'sqlite' or 'postgres'
+    """
+    if dialect == 'postgres':
+        for statement in POSTGRES_COURSE_SEARCH:
+            cursor.execute(statement)
+        return
+
+    existed = has_course_search_index(cursor, dialect)
+    for statement in SQLITE_COURSE_SEARCH:
+        cursor.execute(statement)
+    if not existed:
+        # Index rows that were loaded before the triggers existed
+        cursor.execute("INSERT INTO courses_fts (courses_fts) VALUES ('rebuild')")
+        cursor.execute("INSERT INTO courses_code_fts (courses_code_fts) VALUES ('rebuild')")
+
+
+# ============================================================================
+# CALENDAR VIEWS
+# ============================================================================
+
+# Two tables derived from academic_calendar and rebuilt whenever it changes:
+# calendar_windows pairs each "<Name> Start" event with the "<Name> End" of the
+# same semester and session, so "what's open on date D" is an interval lookup;
+# calendar_next_deadlines holds the next event of each type as of the date in
+# meta, and is rebuilt again when that date rolls over.
+NEXT_DEADLINES_KEY = 'next_deadlines_as_of'
+
+# "Today" for upcoming events is the university's date, not the server's
+CALENDAR_TIMEZONE = os.getenv('CALENDAR_TIMEZONE', 'Africa/Lagos')
+_timezone_missing_logged = False
+
+CALENDAR_WINDOWS_SQL = """
+    INSERT INTO calendar_windows (name, semester, session, starts_on, ends_on, description)
+    SELECT substr(s.event_type, 1, length(s.event_type) - 6), s.semester, s.session,
+           s.event_date, e.event_date, s.description
+    FROM academic_calendar s
+    JOIN academic_calendar e
+      ON e.event_type = substr(s.event_type, 1, length(s.event_type) - 6) || ' End'
+     AND COALESCE(e.semester, '') = COALESCE(s.semester, '')
+     AND COALESCE(e.session, '') = COALESCE(s.session, '')
+     AND e.event_date >= s.event_date
+    WHERE s.event_type LIKE '% Start'
+"""
+
+# {p} is the driver's placeholder; the same selection is registered as
+# calendar.next_deadlines_live for databases that can't be refreshed
+NEXT_DEADLINES_SQL = """
+    INSERT INTO calendar_next_deadlines (event_type, event_date, semester, session, description)
+    SELECT c.event_type, c.event_date, c.semester, c.session, c.description
+    FROM academic_calendar c
+    WHERE c.event_date >= {p} AND c.id = (
+        SELECT n.id FROM academic_calendar n
+        WHERE n.event_type = c.event_type AND n.event_date >= {p}
+        ORDER BY n.event_date, n.id
+        LIMIT 1
+    )
+"""
+
+# Serializes concurrent rollover refreshes from several containers on PostgreSQL
+_CALENDAR_LOCK_ID = 0x1A07EC5
+
+
+def calendar_today() -> str:
+    """Today's date in CALENDAR_TIMEZONE, as 'YYYY-MM-DD'"""
+    try:
+        return datetime.now(ZoneInfo(CALENDAR_TIMEZONE)).date().isoformat()
+    except ZoneInfoNotFoundError:
+        global _timezone_missing_logged
+        if not _timezone_missing_logged:
+            _timezone_missing_logged = True
+            logger.warning(f"⚠️  Time zone {CALENDAR_TIMEZONE} not found (install tzdata), "
+                           f"using the server's local date for the calendar")
+        return date.today().isoformat()
+
+
+def read_next_deadlines_date(cursor) -> Optional[str]:
+    """Date calendar_next_deadlines was computed for ('YYYY-MM-DD'), or None if never"""
+    value = _read_meta(cursor, NEXT_DEADLINES_KEY)
+    if not value:
+        return None
+    value = str(value)
+    return f"{value[:4]}-{value[4:6]}-{value[6:]}"
+
+
+def refresh_calendar_views(cursor, dialect: str, today: Optional[str] = None):
+    """
+    Rebuild calendar_windows and calendar_next_deadlines from academic_calendar
+
+    Call in the same transaction as a calendar import, before bump_data_version().
+
+    Args:
+        cursor: DB-API cursor
+        dialect: 'sqlite' or 'postgres'
+        today: Date the next deadlines are computed for (default calendar_today())
+    """
+    cursor.execute("DELETE FROM calendar_windows")
+    cursor.execute(CALENDAR_WINDOWS_SQL)  # No parameters, so psycopg2 leaves the LIKE's % alone
+    refresh_next_deadlines(cursor, dialect, today)
+
+
+def refresh_next_deadlines(cursor, dialect: str, today: Optional[str] = None):
+    """Recompute calendar_next_deadlines for today and record the date in meta"""
+    today = today or calendar_today()
+    placeholder = '%s' if dialect == 'postgres' else '?'
+    cursor.execute("DELETE FROM calendar_next_deadlines")
+    cursor.execute(NEXT_DEADLINES_SQL.format(p=placeholder), (today, today))
+    _write_meta(cursor, NEXT_DEADLINES_KEY, int(today.replace('-', '')))
+
+
+def roll_next_deadlines(conn, dialect: str, today: Optional[str] = None) -> bool:
+    """
+    Refresh calendar_next_deadlines on a new day (once, however many processes ask)
+
+    Args:
+        conn: DB-API connection (autocommit or not); committed on success
+        dialect: 'sqlite' or 'postgres'
+        today: Date to roll to (default calendar_today())
+
+    Returns:
+        True if this call refreshed the table, False if it was already current
+    """
+    today = today or calendar_today()
+    with _exclusive_transaction(conn, dialect, _CALENDAR_LOCK_ID) as cursor:
+        if read_next_deadlines_date(cursor) == today:
+            return False
+        refresh_next_deadlines(cursor, dialect, today)
+    logger.info(f"📅 Next deadlines refreshed for {today}")
+    return True
+
+
+# ============================================================================
+# HOSTEL FACILITIES
+# ============================================================================
+
+# hostels.facilities is free text ("24/7 electricity | Water supply | ...");
+# hostel_facilities holds one row per (canonical facility, hostel) so facility
+# filters are index lookups. An entry maps to every facility with a keyword
+# pattern matching at a word start, or to its own lowercased text if none does.
+FACILITY_KEYWORDS = {
+    'electricity': ('electric', 'power'),
+    'backup power': ('backup', 'generator'),
+    'water': ('water',),
+    'security': ('security', 'guard'),
+    'wifi': ('wi-?fi', 'internet'),
+    'kitchen': ('kitchen', 'cooking'),
+    'study room': ('reading', 'study'),
+    'common room': ('common room', 'common area', 'lounge', 'recreation'),
+    'air conditioning': (r'a/?c\b', 'air.?condition'),
+    'private room': ('individual room', 'private room', 'single room'),
+    'notice board': ('notice ?board',),
+}
+
+_FACILITY_PATTERNS = [(name, re.compile(r'\b(?:' + '|'.join(keywords) + ')'))
+                      for name, keywords in FACILITY_KEYWORDS.items()]
+
+
+def normalize_facility(text: str) -> List[str]:
+    """Canonical facility names for one facility entry or search term (e.g. 'Wi-Fi in common areas')"""
+    text = ' '.join(text.lower().split())
+    if not text:
+        return []
+    return [name for name, pattern in _FACILITY_PATTERNS if pattern.search(text)] or [text]
+
+
+def parse_facilities(value: Optional[str]) -> List[str]:
+    """Canonical facilities of a pipe-delimited hostels.facilities value, without duplicates"""
+    facilities = []
+    for entry in (value or '').split('|'):
+        for name in normalize_facility(entry):
+            if name not in facilities:
+                facilities.append(name)
+    return facilities
+
+
+def refresh_hostel_facilities(cursor, dialect: str):
+    """
+    Rebuild hostel_facilities from hostels.facilities
+
+    Call in the same transaction as a hostels import, before bump_data_version().
+    """
+    placeholder = '%s' if dialect == 'postgres' else '?'
+    cursor.execute("SELECT id, facilities FROM hostels")
+    rows = [(row['id'], row['facilities']) if isinstance(row, dict) else tuple(row) for row in cursor.fetchall()]
+    cursor.execute("DELETE FROM hostel_facilities")
+    cursor.executemany(
+        f"INSERT INTO hostel_facilities (facility, hostel_id) VALUES ({placeholder}, {placeholder})",
+        [(facility, hostel_id) for hostel_id, value in rows for facility in parse_facilities(value)],
+    )
+
+
+# ============================================================================
+# MIGRATIONS
+# ============================================================================
+
+def _create_tables(cursor, dialect: str):
+    """The original four tables (unchanged, so existing databases are left as they are)"""
+    serial = 'SERIAL PRIMARY KEY' if dialect == 'postgres' else 'INTEGER PRIMARY KEY AUTOINCREMENT'
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS courses (
+            code TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            credits INTEGER,
+            prerequisites TEXT,
+            description TEXT,
+            semester TEXT,
+            lecturer TEXT,
+            department TEXT
+        )
+    """)
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS fees (
+            id {serial},
+            level TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            fee_type TEXT,
+            session TEXT
+        )
+    """)
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS academic_calendar (
+            id {serial},
+            event_type TEXT NOT NULL,
+            event_date TEXT NOT NULL,
+            semester TEXT,
+            session TEXT,
+            description TEXT
+        )
+    """)
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS hostels (
+            id {serial},
+            name TEXT NOT NULL,
+            gender TEXT,
+            capacity INTEGER,
+            status TEXT,
+            facilities TEXT
+        )
+    """)
+
+
+def _add_course_search(cursor, dialect: str):
+    # Optional: without FTS5 (SQLite) or CREATE EXTENSION rights (RDS) course search uses LIKE
+    cursor.execute("SAVEPOINT course_search")
+    try:
+        create_course_search_index(cursor, dialect)
+    except Exception as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT course_search")
+        logger.warning(f"Course search index unavailable, falling back to LIKE search: {e}")
+    cursor.execute("RELEASE SAVEPOINT course_search")
+
+
+def _column_type(cursor, dialect: str, table: str, column: str) -> Optional[str]:
+    if dialect == 'postgres':
+        cursor.execute("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_name = %s AND column_name = %s
+        """, (table, column))
+        row = cursor.fetchone()
+    else:
+        cursor.execute(f"SELECT type FROM pragma_table_info('{table}') WHERE name = ?", (column,))
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return (row[0] if not isinstance(row, dict) else next(iter(row.values()))).lower()
+
+
+def _event_date_as_date(cursor, dialect: str):
+    """Store academic_calendar.event_date as a DATE instead of free text"""
+    if dialect == 'postgres':
+        if _column_type(cursor, dialect, 'academic_calendar', 'event_date') != 'date':
+            cursor.execute("""
+                ALTER TABLE academic_calendar
+                ALTER COLUMN event_date TYPE DATE USING event_date::date
+            """)
+        return
+
+    if _column_type(cursor, dialect, 'academic_calendar', 'event_date') == 'date':
+        return
+    # SQLite can't change a column type in place: rebuild the table. DATE has no
+    # storage class of its own, so the CHECK keeps values in ISO YYYY-MM-DD form
+    cursor.execute("""
+        CREATE TABLE academic_calendar_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_type TEXT NOT NULL,
+            event_date DATE NOT NULL CHECK (event_date IS date(event_date)),
+            semester TEXT,
+            session TEXT,
+            description TEXT
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO academic_calendar_new (id, event_type, event_date, semester, session, description)
+        SELECT id, event_type, date(event_date), semester, session, description FROM academic_calendar
+    """)
+    cursor.execute("DROP TABLE academic_calendar")
+    cursor.execute("ALTER TABLE academic_calendar_new RENAME TO academic_calendar")
+
+
+def _add_lookup_indexes(cursor, dialect: str):
+    """Indexes for the get_* helpers' filters and sort orders"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_fees_level_lower ON fees (lower(level))")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_hostels_gender_lower ON hostels (lower(gender))")
+    if dialect == 'postgres':
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_calendar_event_date
+            ON academic_calendar (event_date) INCLUDE (event_type, description)
+        """)
+    else:
+        # Covers calendar.list so the ordered scan never touches the table
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_calendar_event_date
+            ON academic_calendar (event_date, event_type, description)
+        """)
+    cursor.execute("ANALYZE")
+
+
+def _add_calendar_views(cursor, dialect: str):
+    """Derived calendar tables for upcoming deadlines and open windows"""
+    serial = 'SERIAL PRIMARY KEY' if dialect == 'postgres' else 'INTEGER PRIMARY KEY AUTOINCREMENT'
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS calendar_windows (
+            id {serial},
+            name TEXT NOT NULL,
+            semester TEXT,
+            session TEXT,
+            starts_on DATE NOT NULL,
+            ends_on DATE NOT NULL,
+            description TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS calendar_next_deadlines (
+            event_type TEXT PRIMARY KEY,
+            event_date DATE NOT NULL,
+            semester TEXT,
+            session TEXT,
+            description TEXT
+        )
+    """)
+    if dialect == 'postgres':
+        # GiST over the closed date range: "windows containing D" is an index probe
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_calendar_windows_span
+            ON calendar_windows USING gist (daterange(starts_on, ends_on, '[]'))
+        """)
+    else:
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_calendar_windows_span
+            ON calendar_windows (starts_on, ends_on)
+        """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_next_deadlines_date ON calendar_next_deadlines (event_date)")
+    # Next event of one type on or after a date (the refresh's correlated lookup)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_calendar_type_date ON academic_calendar (event_type, event_date)")
+    refresh_calendar_views(cursor, dialect)
+
+
+def _add_hostel_facilities(cursor, dialect: str):
+    """Normalized hostel facilities for facility search"""
+    without_rowid = '' if dialect == 'postgres' else ' WITHOUT ROWID'
+    # The (facility, hostel_id) key answers "hostels with facility X"; intersecting
+    # several facilities is one index range per facility
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS hostel_facilities (
+            facility TEXT NOT NULL,
+            hostel_id INTEGER NOT NULL REFERENCES hostels (id) ON DELETE CASCADE,
+            PRIMARY KEY (facility, hostel_id)
+        ){without_rowid}
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_hostel_facilities_hostel ON hostel_facilities (hostel_id)")
+    refresh_hostel_facilities(cursor, dialect)
+
+
+# (version, description, apply(cursor, dialect)); append only, never renumber.
+# Every step must also succeed on databases created before migrations existed.
+MIGRATIONS = [
+    (1, 'Create courses, fees, academic_calendar and hostels tables', _create_tables),
+    (2, 'Add full-text course search index', _add_course_search),
+    (3, 'Store academic_calendar.event_date as DATE', _event_date_as_date),
+    (4, 'Add lookup indexes on lower(level), lower(gender) and event_date', _add_lookup_indexes),
+    (5, 'Add calendar_windows and calendar_next_deadlines', _add_calendar_views),
+    (6, 'Add hostel_facilities', _add_hostel_facilities),
+]
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Serializes concurrent migrate() calls from several containers on PostgreSQL
+_MIGRATION_LOCK_ID = 0x1A07EC4
+
+
+@contextmanager
+def _exclusive_transaction(conn, dialect: str, lock_id: int):
+    """
+    Run the block in one transaction, serialized across processes
+
+    psycopg2 in autocommit mode (the db_utils pool) needs an explicit
+    transaction, and an advisory lock serializes callers on PostgreSQL;
+    SQLite takes the write lock up front with BEGIN IMMEDIATE.
+    """
+    cursor = conn.cursor()
+    try:
+        if dialect == 'postgres':
+            explicit = conn.autocommit
+            if explicit:
+                cursor.execute("BEGIN")
+            cursor.execute(f"SELECT pg_advisory_xact_lock({lock_id})")
+        else:
+            conn.commit()
+            explicit = True
+            cursor.execute("BEGIN IMMEDIATE")
+
+        try:
+            yield cursor
+        except Exception:
+            if explicit:
+                cursor.execute("ROLLBACK")
+            else:
+                conn.rollback()
+            raise
+        if explicit:
+            cursor.execute("COMMIT")
+        else:
+            conn.commit()
+    finally:
+        cursor.close()
+
+
+def migrate(conn, dialect: str) -> List[int]:
+    """
+    Apply pending migrations in a single transaction (idempotent)
+
+    Up-to-date databases cost two statements, so this is safe to call at
+    every startup. Concurrent callers are serialized (advisory lock on
+    PostgreSQL, BEGIN IMMEDIATE on SQLite) and only one applies each step.
+
+    Args:
+        conn: DB-API connection (autocommit or not); committed on success
+        dialect: 'sqlite' or 'postgres'
+
+    Returns:
+        Versions applied by this call (empty if already up to date)
+    """
+    cursor = conn.cursor()
+    try:
+        create_meta_table(cursor)
+        if read_schema_version(cursor) >= LATEST_SCHEMA_VERSION:
+            conn.commit()
+            return []
+    finally:
+        cursor.close()
+
+    with _exclusive_transaction(conn, dialect, _MIGRATION_LOCK_ID) as cursor:
+        current = read_schema_version(cursor)  # Another process may have migrated meanwhile
+        applied = []
+        for version, description, apply in MIGRATIONS:
+            if version > current:
+                logger.info(f"🧱 Applying schema migration {version}: {description}")
+                apply(cursor, dialect)
+                applied.append(version)
+        if applied:
+            _write_meta(cursor, SCHEMA_VERSION_KEY, applied[-1])
+    return applied
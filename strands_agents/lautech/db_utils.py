@@ -4,25 +4,64 @@ Supports both SQLite (local/development) and PostgreSQL (production/RDS)
 """
 
 import os
+import re
 import json
+import time
 import logging
-from typing import Optional, List, Dict
+import threading
+from datetime import date
+from typing import Optional, List, Dict, Tuple, Iterator, Union
+from urllib.request import pathname2url
 from contextlib import contextmanager
 
+from db_pool import ConnectionPool, ThreadLocalConnections, PoolTimeout
+from db_credentials import CredentialCache, fetch_secret
+from db_cache import ResultCache, freeze
+from db_results import Table
+from db_metrics import query_metrics, statement_name
+from db_replicas import ReplicaRouter, READ_REPLICAS, LAG_SQL, parse_endpoints
+import db_queries
+import db_paging
+from db_schema import (
+    migrate,
+    has_course_search_index,
+    read_schema_version,
+    calendar_today,
+    roll_next_deadlines,
+    normalize_facility,
+    LATEST_SCHEMA_VERSION,
+)
+
 logger = logging.getLogger(__name__)
 
 # Database configuration
 USE_POSTGRES = os.getenv('USE_POSTGRES', 'false').lower() == 'true'
 SECRET_NAME = os.getenv('DB_SECRET_NAME', 'lautech/rds/credentials')
-SQLITE_PATH = os.getenv('SQLITE_PATH', '/tmp/lautech_data.db')
+
+# Read-only serving mode: open the packaged database in place (no copy, no DDL)
+# as an immutable file; the writable /tmp copy remains the default for development
+SQLITE_READ_ONLY = os.getenv('SQLITE_READ_ONLY', 'false').lower() == 'true'
+PACKAGED_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lautech_data.db')
+SQLITE_PATH = os.getenv('SQLITE_PATH', PACKAGED_SQLITE_PATH if SQLITE_READ_ONLY else '/tmp/lautech_data.db')
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))  # Bytes
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', str(64 * 1024)))
 
 # Import database libraries
 if USE_POSTGRES:
     try:
         import psycopg2
         import psycopg2.extras
-        import boto3
         HAS_POSTGRES = True
+
+        class _PooledConnection(psycopg2.extensions.connection):
+            """psycopg2 connection that remembers which registry queries it has prepared"""
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.prepared = set()
+
+        _DATE_AS_TEXT = psycopg2.extensions.new_type(
+            psycopg2.extensions.DATE.values, 'LAUTECH_DATE_AS_TEXT', lambda value, cursor: value)
     except ImportError:
         logger.warning("psycopg2 not installed. Install with: pip install psycopg2-binary")
         HAS_POSTGRES = False
@@ -31,267 +70,760 @@ else:
     HAS_POSTGRES = False
 
 
+def _fetch_credentials() -> Dict:
+    secret = fetch_secret(SECRET_NAME)
+    logger.info(f"✅ Retrieved database credentials from {SECRET_NAME}")
+    return secret
+
+
+_credentials = CredentialCache(_fetch_credentials)
+
+
 def get_db_credentials():
-    """Get database credentials from AWS Secrets Manager"""
+    """Get database credentials from AWS Secrets Manager (cached, see db_credentials)"""
     if not USE_POSTGRES:
         return None
 
     try:
-        session = boto3.session.Session()
-        client = session.client(
-            service_name='secretsmanager',
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
-        )
-
-        response = client.get_secret_value(SecretId=SECRET_NAME)
-        secret = json.loads(response['SecretString'])
-
-        logger.info(f"✅ Retrieved database credentials from {SECRET_NAME}")
-        return secret
-
+        return _credentials.get()
     except Exception as e:
         logger.error(f"Failed to retrieve database credentials: {e}")
         raise
 
 
+def refresh_db_credentials() -> Optional[Dict]:
+    """Re-fetch credentials now (after an authentication failure)"""
+    if not USE_POSTGRES:
+        return None
+    return _credentials.refresh()
+
+
+def get_credential_stats() -> Dict:
+    """Get Secrets Manager fetch counts and the age of the cached secret"""
+    return _credentials.stats()
+
+
+def _is_auth_error(error: Exception) -> bool:
+    """True if a connect error means the password was rejected (e.g. after rotation)"""
+    if getattr(error, 'pgcode', None) in ('28P01', '28000'):
+        return True
+    return 'password authentication failed' in str(error).lower()
+
+
+# Room for every registry query plus ad-hoc statements in each connection's statement cache
+SQLITE_STATEMENT_CACHE_SIZE = max(128, 2 * len(db_queries.QUERIES))
+
+# Connection pools are created lazily on first use and live for the whole process
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _open_postgres(creds: Dict, host: str = None, port: int = None):
+    return psycopg2.connect(
+        host=host or creds['host'],
+        port=port or creds['port'],
+        database=creds['dbname'],
+        user=creds['username'],
+        password=creds['password'],
+        connect_timeout=10,
+        connection_factory=_PooledConnection
+    )
+
+
+def _connect_postgres(host: str = None, port: int = None):
+    """Open a new PostgreSQL connection to the primary, or to a replica if host is given (used by the pools)"""
+    try:
+        conn = _open_postgres(get_db_credentials(), host, port)
+    except psycopg2.OperationalError as e:
+        if not _is_auth_error(e):
+            raise
+        # Secret was probably rotated since we cached it: re-fetch once and retry
+        logger.warning("🔐 Database authentication failed, re-fetching rotated credentials")
+        conn = _open_postgres(refresh_db_credentials(), host, port)
+    # Reads are single statements, so skip the BEGIN/COMMIT round trips psycopg2
+    # would otherwise add around every query
+    conn.autocommit = True
+    # Return DATE columns as 'YYYY-MM-DD' strings, as SQLite does, so results stay JSON-serializable
+    psycopg2.extensions.register_type(_DATE_AS_TEXT, conn)
+    return conn
+
+
+def _ping_postgres(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    finally:
+        cursor.close()
+    conn.rollback()
+
+
+def _reset_postgres(conn):
+    # Never hand out a connection with an open (or aborted) transaction
+    if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+        conn.rollback()
+
+
+def sqlite_connect_args() -> Tuple[str, Dict]:
+    """sqlite3.connect() arguments for the configured mode (shared with db_async)"""
+    kwargs = {'cached_statements': SQLITE_STATEMENT_CACHE_SIZE}
+    if not SQLITE_READ_ONLY:
+        return SQLITE_PATH, kwargs
+    # immutable=1 also skips file locking and change detection: the file must not change while served
+    uri = f"file:{pathname2url(os.path.abspath(SQLITE_PATH))}?mode=ro&immutable=1"
+    kwargs['uri'] = True
+    return uri, kwargs
+
+
+def sqlite_pragmas() -> List[str]:
+    """Per-connection tuning for read-only serving (none in writable mode)"""
+    if not SQLITE_READ_ONLY:
+        return []
+    return [
+        f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA query_only = ON",
+    ]
+
+
+def _connect_sqlite():
+    """Open a new SQLite connection (one per thread)"""
+    database, kwargs = sqlite_connect_args()
+    # check_same_thread=False only so close_db_connections() can close every
+    # thread's connection at shutdown; each connection is still used by one thread
+    conn = sqlite3.connect(database, check_same_thread=False, **kwargs)
+    conn.row_factory = sqlite3.Row
+    for pragma in sqlite_pragmas():
+        conn.execute(pragma)
+    return conn
+
+
+def _new_postgres_pool(host: str = None, port: int = None) -> ConnectionPool:
+    pool = ConnectionPool(
+        connect=lambda: _connect_postgres(host, port),
+        ping=_ping_postgres,
+        reset=_reset_postgres,
+        is_closed=lambda conn: conn.closed != 0
+    )
+    # Idle connections above min_size are closed even when no request checks one out
+    pool.start_reaper()
+    return pool
+
+
+def _get_pool():
+    """Get (or create) the process-wide connection pool (the primary, on PostgreSQL)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if USE_POSTGRES and HAS_POSTGRES:
+                    pool = _new_postgres_pool()
+                    pool.fill()
+                    logger.info(f"✅ PostgreSQL pool ready (min={pool.min_size}, max={pool.max_size})")
+                else:
+                    pool = ThreadLocalConnections(connect=_connect_sqlite)
+                _pool = pool
+    return _pool
+
+
+_replica_router: Optional[ReplicaRouter] = None
+_replica_router_ready = False
+
+
+def _replica_lag(pool) -> float:
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LAG_SQL)
+        lag = cursor.fetchone()[0]
+        cursor.close()
+    return float(lag)
+
+
+def _is_replica_failure(error: Exception) -> bool:
+    # Connection problems and recovery conflicts; query bugs are raised as usual
+    return isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError, PoolTimeout))
+
+
+def _get_replica_router() -> Optional[ReplicaRouter]:
+    """Get the read-replica router, or None if DB_READ_REPLICAS isn't set (or on SQLite)"""
+    global _replica_router, _replica_router_ready
+    if not _replica_router_ready:
+        primary = _get_pool()
+        with _pool_lock:
+            if not _replica_router_ready:
+                if USE_POSTGRES and HAS_POSTGRES and READ_REPLICAS:
+                    endpoints = parse_endpoints(READ_REPLICAS, int(get_db_credentials()['port']))
+                    _replica_router = ReplicaRouter(
+                        primary=primary,
+                        replicas={f'{host}:{port}': _new_postgres_pool(host, port) for host, port in endpoints},
+                        measure_lag=_replica_lag,
+                        is_failover_error=_is_replica_failure
+                    )
+                    logger.info(f"✅ Routing reads across {len(endpoints)} replica(s): {READ_REPLICAS}")
+                _replica_router_ready = True
+    return _replica_router
+
+
 @contextmanager
 def get_db_connection():
-    """Get database connection (SQLite or PostgreSQL)"""
+    """Get a pooled database connection (SQLite or PostgreSQL)"""
+    with _get_pool().connection() as conn:
+        yield conn
+
+
+def get_pool_metrics() -> Dict:
+    """
+    Get connection pool metrics
+
+    Returns:
+        Dictionary with connections created/closed, checkouts, checkout wait
+        times (avg/max, ms), in-use and idle counts, and pool size
+    """
+    if _pool is None:
+        return {}
+    stats = _pool.stats()
+    if _replica_router is not None:
+        stats['replicas'] = _replica_router.stats()
+    return stats
+
+
+def close_db_connections():
+    """Close all pooled connections (call at shutdown or after changing SQLITE_PATH)"""
+    global _pool, _replica_router, _replica_router_ready
+    with _pool_lock:
+        pool, _pool = _pool, None
+        router, _replica_router, _replica_router_ready = _replica_router, None, False
+    if pool is not None:
+        pool.close()
+    if router is not None:
+        for replica_pool in router.pools():
+            replica_pool.close()
+
+
+def _fetch(cursor, fetch: str):
+    if fetch == 'all':
+        return [dict(row) for row in cursor.fetchall()]
+    if fetch == 'one':
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    if fetch == 'table':
+        return Table.from_cursor(cursor, cursor.fetchall())
+    return None
+
+
+def _cursor(conn, fetch: str = 'all'):
+    # fetch='table' reads plain tuples: no per-row dict or sqlite3.Row objects
     if USE_POSTGRES and HAS_POSTGRES:
-        # PostgreSQL connection
-        creds = get_db_credentials()
-        conn = psycopg2.connect(
-            host=creds['host'],
-            port=creds['port'],
-            database=creds['dbname'],
-            user=creds['username'],
-            password=creds['password'],
-            connect_timeout=10
-        )
-        try:
-            yield conn
-        finally:
-            conn.close()
-    else:
-        # SQLite connection
-        conn = sqlite3.connect(SQLITE_PATH)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+        if fetch == 'table':
+            return conn.cursor()
+        return conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    cursor = conn.cursor()
+    if fetch == 'table':
+        cursor.row_factory = None
+    return cursor
+
+
+def _explain(conn, sql: str, params) -> Optional[str]:
+    """Capture the plan of a slow query (runs it again on PostgreSQL: read-only queries only)"""
+    cursor = _cursor(conn)
+    try:
+        if USE_POSTGRES and HAS_POSTGRES:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            return '\n'.join(row['QUERY PLAN'] for row in cursor.fetchall())
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return '\n'.join(row['detail'] for row in cursor.fetchall())
+    except Exception as e:
+        logger.warning(f"Could not capture query plan: {e}")
+        return None
+    finally:
+        cursor.close()
 
 
-def execute_query(query: str, params: tuple = None, fetch: str = 'all') -> Optional[List[Dict]]:
+def execute_query(query: str, params: tuple = None, fetch: str = 'all', name: str = None) -> Optional[List[Dict]]:
     """
     Execute a database query
 
+    Prefer run_query() with a registered query for anything on the hot path;
+    this is for DDL and one-off statements.
+
     Args:
         query: SQL query to execute
         params: Query parameters
-        fetch: 'all', 'one', or None (for INSERT/UPDATE/DELETE)
+        fetch: 'all', 'one', 'table' (a db_results.Table), or None (for INSERT/UPDATE/DELETE)
+        name: Logical name for query metrics (default 'sql.<verb>')
 
     Returns:
         List of dictionaries (for SELECT queries) or None
     """
+    name = name or statement_name(query)
     with get_db_connection() as conn:
-        if USE_POSTGRES and HAS_POSTGRES:
-            # PostgreSQL
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cursor = _cursor(conn, fetch)
+        start = time.perf_counter()
+        try:
             cursor.execute(query, params or ())
+            result = _fetch(cursor, fetch)
+        except Exception as e:
+            query_metrics.record(name, (time.perf_counter() - start) * 1000, error=e, dialect=_dialect())
+            raise
+        duration_ms = (time.perf_counter() - start) * 1000
+        conn.commit()
+        plan = None
+        if name.startswith('sql.select') and query_metrics.should_explain(name, duration_ms):
+            plan = _explain(conn, query, params or ())
+        cursor.close()
+        query_metrics.record(name, duration_ms, result=result, plan=plan, dialect=_dialect())
+        return result
+
+
+def _run_registered(pool, query: db_queries.Query, params: Optional[Dict], fetch: str):
+    with pool.connection() as conn:
+        cursor = _cursor(conn, fetch)
+        if USE_POSTGRES and HAS_POSTGRES:
+            if query.name not in conn.prepared:
+                cursor.execute(query.prepare_sql)
+                conn.prepared.add(query.name)
+            sql, args = query.execute_sql, query.pg_args(params)
+        else:
+            sql, args = query.sqlite_sql, params or {}
 
-            if fetch == 'all':
-                result = [dict(row) for row in cursor.fetchall()]
-            elif fetch == 'one':
-                row = cursor.fetchone()
-                result = dict(row) if row else None
-            else:
-                result = None
-
+        start = time.perf_counter()
+        try:
+            cursor.execute(sql, args)
+            result = _fetch(cursor, fetch)
+        except Exception as e:
+            query_metrics.record(query.name, (time.perf_counter() - start) * 1000, error=e, dialect=_dialect())
+            raise
+        duration_ms = (time.perf_counter() - start) * 1000
+        if not query.readonly:
             conn.commit()
-            cursor.close()
-            return result
-        else:
-            # SQLite
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
+        plan = None
+        if query.readonly and query_metrics.should_explain(query.name, duration_ms):
+            plan = _explain(conn, sql, args)
+        cursor.close()
+        query_metrics.record(query.name, duration_ms, result=result, plan=plan, dialect=_dialect())
+        return result
 
-            if fetch == 'all':
-                result = [dict(row) for row in cursor.fetchall()]
-            elif fetch == 'one':
-                row = cursor.fetchone()
-                result = dict(row) if row else None
-            else:
-                result = None
 
-            conn.commit()
+def run_query(name: str, params: Optional[Dict] = None, fetch: str = 'all'):
+    """
+    Execute a query from the db_queries registry
+
+    On PostgreSQL the statement is prepared server-side once per pooled
+    connection and then only EXECUTEd; on SQLite the connection's statement
+    cache reuses the compiled statement. Read-only queries go to a read
+    replica when DB_READ_REPLICAS is set (see db_replicas). Timings are
+    recorded in db_metrics.query_metrics under the query name.
+
+    Args:
+        name: Registered query name (e.g. 'courses.list')
+        params: Named parameters; keys not used by the query are ignored
+        fetch: 'all', 'one', 'table', or None (for INSERT/UPDATE/DELETE)
+
+    Returns:
+        List of dictionaries, a single dictionary, a Table, or None (as execute_query)
+    """
+    query = db_queries.get(name)
+    router = _get_replica_router() if query.readonly else None
+    if router is None:
+        return _run_registered(_get_pool(), query, params, fetch)
+    return router.execute(lambda pool: _run_registered(pool, query, params, fetch))
+
+
+def _check_read_only_database():
+    """Verify the packaged database can be served read-only (no DDL is run)"""
+    global _course_search_indexed
+    if not os.path.exists(SQLITE_PATH):
+        raise FileNotFoundError(f"SQLITE_READ_ONLY is set but {SQLITE_PATH} does not exist")
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        tables = {row['name'] for row in cursor.fetchall()}
+        cursor.close()
+    missing = {'courses', 'fees', 'academic_calendar', 'hostels'} - tables
+    if missing:
+        raise RuntimeError(f"Packaged database {SQLITE_PATH} is missing tables: {', '.join(sorted(missing))}")
+    _course_search_indexed = 'courses_fts' in tables
+    version = 0
+    if 'meta' in tables:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            version = read_schema_version(cursor)
             cursor.close()
-            return result
+    if version < LATEST_SCHEMA_VERSION:
+        logger.warning(f"Packaged database is at schema version {version} (latest {LATEST_SCHEMA_VERSION}); "
+                       "run import_data.py to migrate it before packaging")
+    if not _course_search_indexed:
+        logger.warning("Packaged database has no course search index, falling back to LIKE search "
+                       "(re-run import_data.py to build it)")
+    logger.info(f"✅ Serving {SQLITE_PATH} read-only (immutable, mmap {SQLITE_MMAP_SIZE // (1024 * 1024)} MB)")
 
 
 def init_database():
-    """Initialize database schema"""
+    """Bring the schema up to date (only checks the file in SQLite read-only mode)"""
+    global _course_search_indexed
+    if SQLITE_READ_ONLY and not USE_POSTGRES:
+        _check_read_only_database()
+        return
+
     logger.info(f"Initializing database (USE_POSTGRES={USE_POSTGRES})...")
+    with get_db_connection() as conn:
+        applied = migrate(conn, _dialect())
+    _course_search_indexed = None
 
-    # Define schema
-    # PostgreSQL uses SERIAL for auto-increment, SQLite uses AUTOINCREMENT
-    if USE_POSTGRES and HAS_POSTGRES:
-        courses_table = """
-            CREATE TABLE IF NOT EXISTS courses (
-                code TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                credits INTEGER,
-                prerequisites TEXT,
-                description TEXT,
-                semester TEXT,
-                lecturer TEXT,
-                department TEXT
-            )
-        """
-
-        fees_table = """
-            CREATE TABLE IF NOT EXISTS fees (
-                id SERIAL PRIMARY KEY,
-                level TEXT NOT NULL,
-                amount INTEGER NOT NULL,
-                fee_type TEXT,
-                session TEXT
-            )
-        """
-
-        calendar_table = """
-            CREATE TABLE IF NOT EXISTS academic_calendar (
-                id SERIAL PRIMARY KEY,
-                event_type TEXT NOT NULL,
-                event_date TEXT NOT NULL,
-                semester TEXT,
-                session TEXT,
-                description TEXT
-            )
-        """
-
-        hostels_table = """
-            CREATE TABLE IF NOT EXISTS hostels (
-                id SERIAL PRIMARY KEY,
-                name TEXT NOT NULL,
-                gender TEXT,
-                capacity INTEGER,
-                status TEXT,
-                facilities TEXT
-            )
-        """
+    if applied:
+        logger.info(f"✅ Database schema migrated to version {applied[-1]}")
     else:
-        courses_table = """
-            CREATE TABLE IF NOT EXISTS courses (
-                code TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                credits INTEGER,
-                prerequisites TEXT,
-                description TEXT,
-                semester TEXT,
-                lecturer TEXT,
-                department TEXT
-            )
-        """
-
-        fees_table = """
-            CREATE TABLE IF NOT EXISTS fees (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                level TEXT NOT NULL,
-                amount INTEGER NOT NULL,
-                fee_type TEXT,
-                session TEXT
-            )
-        """
-
-        calendar_table = """
-            CREATE TABLE IF NOT EXISTS academic_calendar (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_type TEXT NOT NULL,
-                event_date TEXT NOT NULL,
-                semester TEXT,
-                session TEXT,
-                description TEXT
-            )
-        """
-
-        hostels_table = """
-            CREATE TABLE IF NOT EXISTS hostels (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                gender TEXT,
-                capacity INTEGER,
-                status TEXT,
-                facilities TEXT
-            )
-        """
-
-    # Create tables
-    execute_query(courses_table, fetch=None)
-    execute_query(fees_table, fetch=None)
-    execute_query(calendar_table, fetch=None)
-    execute_query(hostels_table, fetch=None)
-
-    logger.info("✅ Database schema initialized")
+        logger.info(f"✅ Database schema up to date (version {LATEST_SCHEMA_VERSION})")
+
+
+def _dialect() -> str:
+    return 'postgres' if USE_POSTGRES and HAS_POSTGRES else 'sqlite'
+
+
+def get_data_version() -> Optional[int]:
+    """Get the data version bumped by import_data.py / migrate_to_rds.py"""
+    row = run_query('meta.data_version', fetch='one')
+    return row['value'] if row else 0
+
+
+# Read-through cache for the query helpers below, invalidated when the data version changes
+# (an immutable read-only database never changes, so there is no version to poll)
+_result_cache = ResultCache(version_fn=None if SQLITE_READ_ONLY and not USE_POSTGRES else get_data_version)
+
+
+def current_data_version() -> Optional[int]:
+    """Data version the result cache is serving (polled at most every DB_CACHE_VERSION_CHECK_INTERVAL seconds)"""
+    _result_cache.check_version()
+    return _result_cache.version
+
+
+def get_query_stats() -> Dict:
+    """Get per-query latency, row and byte stats (see db_metrics)"""
+    return query_metrics.stats()
+
+
+def get_cache_stats() -> Dict:
+    """Get result cache hit/miss/eviction counters and current size"""
+    return _result_cache.stats()
+
+
+def clear_result_cache():
+    """Drop all cached query results"""
+    _result_cache.clear()
 
 
 # Query functions for each table - with optional limits for performance
 MAX_RESULTS = int(os.getenv('DB_MAX_RESULTS', '50'))  # Increased limit to ensure all records are returned
 
-def get_courses(limit: int = MAX_RESULTS, search: str = None) -> List[Dict]:
-    """Get courses with optional limit and search filter"""
+_course_search_indexed = None
+
+
+def has_course_search() -> bool:
+    """Check (once) whether the full-text course index exists"""
+    global _course_search_indexed
+    if _course_search_indexed is None:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            _course_search_indexed = has_course_search_index(cursor, _dialect())
+            cursor.close()
+    return _course_search_indexed
+
+
+def course_search_params(search: str, limit: int) -> Optional[Dict]:
+    """Build courses.search parameters, or None if the search has no words"""
+    terms = re.findall(r'\w+', search.lower())
+    if not terms:
+        return None
+    code = ''.join(terms)
+    return {
+        'fts_match': ' '.join(f'"{term}"*' for term in terms),
+        'tsquery': ' & '.join(f'{term}:*' for term in terms),
+        # Code substring matching needs 3+ characters (trigram indexes);
+        # an empty FTS phrase / NULL pattern matches nothing
+        'code_match': f'"{code}"' if len(code) >= 3 else '""',
+        'code_pattern': '%' + code.replace('_', r'\_') + '%' if len(code) >= 3 else None,
+        'code': code,
+        'limit': limit,
+    }
+
+
+def _select(name: str, params: Dict, as_table: bool = False) -> Union[List[Dict], Table]:
+    """Run a read query as a list of dicts, or as a column-oriented Table"""
+    if as_table:
+        return run_query(name, params, fetch='table')
+    return run_query(name, params) or []
+
+
+@_result_cache.memoize('get_courses')
+def get_courses(limit: int = MAX_RESULTS, search: str = None,
+                as_table: bool = False) -> Union[List[Dict], Table]:
+    """Get courses with optional limit and search filter (ranked full-text search)"""
     if search:
-        if USE_POSTGRES and HAS_POSTGRES:
-            query = "SELECT code, name, credits, department FROM courses WHERE LOWER(name) LIKE %s OR LOWER(code) LIKE %s LIMIT %s"
-            params = (f'%{search.lower()}%', f'%{search.lower()}%', limit)
-        else:
-            query = "SELECT code, name, credits, department FROM courses WHERE LOWER(name) LIKE ? OR LOWER(code) LIKE ? LIMIT ?"
-            params = (f'%{search.lower()}%', f'%{search.lower()}%', limit)
-        return execute_query(query, params, fetch='all') or []
-    else:
-        return execute_query(f"SELECT code, name, credits, department FROM courses LIMIT {limit}", fetch='all') or []
+        if has_course_search():
+            params = course_search_params(search, limit)
+            if params is None:
+                return get_courses(limit=limit, as_table=as_table)
+            return _select('courses.search', params, as_table)
 
+        # No search index (e.g. SQLite without FTS5): substring scan
+        return _select('courses.search_like', {'pattern': f'%{search.lower()}%', 'limit': limit}, as_table)
+    return _select('courses.list', {'limit': limit}, as_table)
 
-def get_fees(limit: int = MAX_RESULTS, level: str = None) -> List[Dict]:
+
+@_result_cache.memoize('get_fees')
+def get_fees(limit: int = MAX_RESULTS, level: str = None,
+             as_table: bool = False) -> Union[List[Dict], Table]:
     """Get fees with optional limit and level filter"""
     if level:
-        if USE_POSTGRES and HAS_POSTGRES:
-            return execute_query("SELECT level, amount, fee_type FROM fees WHERE LOWER(level) LIKE %s LIMIT %s", 
-                               (f'%{level.lower()}%', limit), fetch='all') or []
-        else:
-            return execute_query("SELECT level, amount, fee_type FROM fees WHERE LOWER(level) LIKE ? LIMIT ?", 
-                               (f'%{level.lower()}%', limit), fetch='all') or []
-    return execute_query(f"SELECT level, amount, fee_type FROM fees LIMIT {limit}", fetch='all') or []
+        return _select('fees.by_level', {'pattern': f'%{level.lower()}%', 'limit': limit}, as_table)
+    return _select('fees.list', {'limit': limit}, as_table)
+
+
+def get_calendar(limit: int = MAX_RESULTS, upcoming_only: bool = True,
+                 as_table: bool = False, today: str = None) -> Union[List[Dict], Table]:
+    """Get calendar events by date; upcoming_only keeps those on or after today (default: calendar_today())"""
+    return _get_calendar(limit, upcoming_only, (today or calendar_today()) if upcoming_only else None, as_table)
+
+
+# Public helpers resolve "today" before the cache lookup, so cached results roll over with the date
+@_result_cache.memoize('get_calendar')
+def _get_calendar(limit: int, upcoming_only: bool, today: Optional[str],
+                  as_table: bool) -> Union[List[Dict], Table]:
+    if upcoming_only:
+        return _select('calendar.upcoming', {'today': today, 'limit': limit}, as_table)
+    return _select('calendar.list', {'limit': limit}, as_table)
+
+
+def get_next_deadlines(limit: int = MAX_RESULTS, today: str = None,
+                       as_table: bool = False) -> Union[List[Dict], Table]:
+    """Get the next event of each type on or after today (default: calendar_today()), soonest first"""
+    return _get_next_deadlines(limit, today or calendar_today(), as_table)
+
+
+@_result_cache.memoize('get_next_deadlines')
+def _get_next_deadlines(limit: int, today: str, as_table: bool) -> Union[List[Dict], Table]:
+    if next_deadlines_current(today):
+        return _select('calendar.next_deadlines', {'today': today, 'limit': limit}, as_table)
+    return _select('calendar.next_deadlines_live', {'today': today, 'limit': limit}, as_table)
 
 
-def get_calendar(limit: int = MAX_RESULTS, upcoming_only: bool = True) -> List[Dict]:
-    """Get calendar events with optional limit"""
-    return execute_query(f"SELECT event_type, event_date, description FROM academic_calendar ORDER BY event_date LIMIT {limit}", fetch='all') or []
+def next_deadlines_current(today: str) -> bool:
+    """Make calendar_next_deadlines current for today, refreshing it on a new day if the database is writable"""
+    row = run_query('meta.next_deadlines_as_of', fetch='one')
+    if row and str(row['value']) == today.replace('-', ''):
+        return True
+    if (SQLITE_READ_ONLY and not USE_POSTGRES) or today != calendar_today():
+        return False  # The table only ever tracks the current date
+    try:
+        with get_db_connection() as conn:
+            roll_next_deadlines(conn, _dialect(), today)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not refresh next deadlines for {today}, computing them directly: {e}")
+        return False
+
+
+def get_open_windows(on_date: str = None, as_table: bool = False) -> Union[List[Dict], Table]:
+    """Get the calendar windows (registration, exams, ...) open on a 'YYYY-MM-DD' date (default: calendar_today())"""
+    on_date = date.fromisoformat(on_date).isoformat() if on_date else calendar_today()  # ValueError if malformed
+    return _get_open_windows(on_date, as_table)
+
 
+@_result_cache.memoize('get_open_windows')
+def _get_open_windows(on_date: str, as_table: bool) -> Union[List[Dict], Table]:
+    return _select('calendar.open_on', {'on_date': on_date}, as_table)
 
-def get_hostels(limit: int = MAX_RESULTS, gender: str = None) -> List[Dict]:
-    """Get hostels with optional limit and gender filter"""
+
+@_result_cache.memoize('get_hostels')
+def get_hostels(limit: int = MAX_RESULTS, gender: str = None, as_table: bool = False,
+                facilities: List[str] = None, min_capacity: int = None) -> Union[List[Dict], Table]:
+    """Get hostels with optional limit, gender, facilities (all required, e.g. ['Wi-Fi', 'kitchen']) and minimum capacity"""
+    if facilities or min_capacity is not None:
+        return _select('hostels.search', hostel_search_params(limit, gender, facilities, min_capacity), as_table)
     if gender:
-        if USE_POSTGRES and HAS_POSTGRES:
-            return execute_query("SELECT name, gender, capacity, status FROM hostels WHERE LOWER(gender) LIKE %s OR LOWER(gender) = 'mixed' LIMIT %s",
-                               (f'%{gender.lower()}%', limit), fetch='all') or []
-        else:
-            return execute_query("SELECT name, gender, capacity, status FROM hostels WHERE LOWER(gender) LIKE ? OR LOWER(gender) = 'mixed' LIMIT ?",
-                               (f'%{gender.lower()}%', limit), fetch='all') or []
-    return execute_query(f"SELECT name, gender, capacity, status, facilities FROM hostels ORDER BY name LIMIT {limit}", fetch='all') or []
+        return _select('hostels.by_gender', {'gender': gender.strip().lower(), 'limit': limit}, as_table)
+    return _select('hostels.list', {'limit': limit}, as_table)
+
+
+def hostel_search_params(limit: int, gender: Optional[str], facilities: Optional[List[str]],
+                         min_capacity: Optional[int]) -> Dict:
+    """Parameters for the hostels.search query (facility names are normalized)"""
+    names = []
+    for facility in facilities or ():
+        for name in normalize_facility(facility):
+            if name not in names:
+                names.append(name)
+    return {
+        'facilities': json.dumps(names) if names else None,
+        'facility_count': len(names),
+        'gender': gender.strip().lower() if gender else None,
+        'min_capacity': min_capacity,
+        'limit': limit,
+    }
 
 
 def get_course_by_code(code: str) -> Optional[Dict]:
     """Get a specific course by code"""
-    if USE_POSTGRES and HAS_POSTGRES:
-        return execute_query("SELECT * FROM courses WHERE code = %s", (code,), fetch='one')
-    else:
-        return execute_query("SELECT * FROM courses WHERE code = ?", (code,), fetch='one')
+    return run_query('courses.by_code', {'code': code}, fetch='one')
 
 
 def get_fees_by_level(level: str) -> List[Dict]:
     """Get fees for a specific level"""
-    if USE_POSTGRES and HAS_POSTGRES:
-        return execute_query("SELECT * FROM fees WHERE level = %s", (level,), fetch='all') or []
-    else:
-        return execute_query("SELECT * FROM fees WHERE level = ?", (level,), fetch='all') or []
+    return run_query('fees.exact_level', {'level': level}) or []
+
+
+# ============================================================================
+# PAGING AND STREAMING
+# ============================================================================
+
+STREAM_BATCH_SIZE = int(os.getenv('DB_STREAM_BATCH_SIZE', '500'))
+
+
+@_result_cache.memoize('get_page')
+def get_page(table: str, page_size: int = db_paging.DEFAULT_PAGE_SIZE, cursor: str = None, **filters) -> Dict:
+    """
+    Get one keyset page of a table (see db_paging)
+
+    Args:
+        table: 'courses', 'fees', 'calendar' or 'hostels'
+        page_size: Rows per page (capped at db_paging.MAX_PAGE_SIZE)
+        cursor: next_cursor from the previous page, or None for the first page
+        **filters: level (fees) or gender (hostels); taken from the cursor when given
+
+    Returns:
+        Dictionary with 'rows' (same columns as the get_* helper) and
+        'next_cursor' (None on the last page)
+
+    Raises:
+        ValueError: Unknown table or filter, or an invalid cursor
+    """
+    spec, after, filters, page_size = db_paging.resolve(table, page_size, cursor, filters)
+    rows = run_query(spec.query, spec.params(after, filters, page_size + 1)) or []
+    return db_paging.build_page(spec, table, rows, page_size, filters)
+
+
+def iter_rows(table: str, batch_size: int = STREAM_BATCH_SIZE, **filters) -> Iterator[Dict]:
+    """
+    Stream every row of a table in key order without materializing it
+
+    On PostgreSQL this reads through a named server-side cursor, batch_size
+    rows per round trip, holding one pooled connection until the generator
+    is exhausted or closed. On SQLite it walks keyset ranges batch by batch,
+    so the connection is free between batches.
+    """
+    spec = db_paging.paged_table(table)
+    filters = db_paging.clean_filters(spec, filters)
+
+    if not (USE_POSTGRES and HAS_POSTGRES):
+        after = None
+        while True:
+            rows = run_query(spec.query, spec.params(after, filters, batch_size)) or []
+            for row in rows:
+                yield spec.strip(row)
+            if len(rows) < batch_size:
+                return
+            after = spec.last_key(rows[-1])
+
+    query = db_queries.get(spec.query)
+    with get_db_connection() as conn:
+        # Named cursors need a transaction; pooled connections are autocommit
+        conn.autocommit = False
+        cursor = None
+        try:
+            cursor = conn.cursor(name=f'lautech_stream_{table}', cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor.itersize = batch_size
+            cursor.execute(query.pg_sql, spec.params(None, filters, None))
+            for row in cursor:
+                yield spec.strip(dict(row))
+        finally:
+            # Also when the caller stops reading early (break / close() raise GeneratorExit here)
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception as e:
+                    logger.debug(f"Error closing stream cursor: {e}")
+            conn.rollback()
+            conn.autocommit = True
+
+
+# ============================================================================
+# SNAPSHOT (all four tables in one round trip)
+# ============================================================================
+
+SNAPSHOT_MAX_ROWS = int(os.getenv('DB_SNAPSHOT_MAX_ROWS', '500'))  # Per table
+SNAPSHOT_TABLES = ('courses', 'fees', 'calendar', 'hostels')
+
+
+def build_snapshot(document, max_rows: int) -> Dict:
+    """Turn the 'snapshot' query's JSON document into read-only per-table rows (see db_cache.freeze)"""
+    if isinstance(document, str):
+        document = json.loads(document)
+    snapshot = {'truncated': []}
+    for table in SNAPSHOT_TABLES:
+        rows = document.get(table) or []
+        if len(rows) > max_rows:
+            rows = rows[:max_rows]
+            snapshot['truncated'].append(table)
+        snapshot[table] = rows
+    # Read-only, so cache hits share it instead of deep-copying every table
+    return freeze(snapshot)
+
+
+@_result_cache.memoize('get_snapshot')
+def get_snapshot(max_rows: int = SNAPSHOT_MAX_ROWS) -> Dict:
+    """
+    Get the working set of all four tables in a single query
+
+    Memoized per data version like the other helpers, so a process normally
+    loads it once per import. Use from_snapshot() to answer tool queries from it.
+
+    Returns:
+        Read-only mapping with 'courses', 'fees', 'calendar' and 'hostels' row
+        tuples (the columns the get_* helpers return) and 'truncated', the
+        tables that had more than max_rows rows
+    """
+    row = run_query('snapshot', {'limit': max_rows + 1}, fetch='one')
+    return build_snapshot(row['snapshot'], max_rows)
+
+
+def from_snapshot(snapshot: Dict, table: str, limit: int = MAX_RESULTS, **filters) -> Optional[List[Dict]]:
+    """
+    Answer a get_* query from a snapshot, with the same filter semantics
+
+    Args:
+        snapshot: Result of get_snapshot()
+        table: 'courses', 'fees', 'calendar' or 'hostels'
+        limit: Maximum rows to return
+        **filters: The filter arguments of the matching helper (search, level, gender,
+            upcoming_only, today, facilities and min_capacity)
+
+    Returns:
+        List of dictionaries, or None if the snapshot can't answer the query
+        (table truncated, a course search or a facility filter, which need their indexes)
+    """
+    if table in snapshot['truncated']:
+        return None
+    rows = snapshot[table]
+
+    if table == 'courses':
+        if filters.get('search'):
+            return None
+    elif table == 'fees' and filters.get('level'):
+        level = filters['level'].lower()
+        rows = [row for row in rows if level in row['level'].lower()]
+    elif table == 'calendar' and filters.get('upcoming_only', True):
+        today = filters.get('today') or calendar_today()
+        rows = [row for row in rows if row['event_date'] >= today]
+    elif table == 'hostels':
+        if filters.get('facilities'):
+            return None  # Needs hostel_facilities
+        gender = filters.get('gender')
+        min_capacity = filters.get('min_capacity')
+        if gender:
+            genders = (gender.strip().lower(), 'mixed')
+            rows = [row for row in rows if (row['gender'] or '').lower() in genders]
+        if min_capacity is not None:
+            rows = [row for row in rows if row['capacity'] is not None and row['capacity'] >= min_capacity]
+        elif gender:
+            rows = [{k: v for k, v in row.items() if k != 'facilities'} for row in rows]
+    return [dict(row) for row in rows[:limit]]
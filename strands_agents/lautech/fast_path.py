@@ -0,0 +1,398 @@
+"""
+Deterministic fast path for pure data lookups in front of the orchestrator
+
+Questions like "how much is 300 level fee", "when does registration end" or
+"male hostels" are single lookups, yet through the agent each costs a model
+call to pick the tool and another to phrase the answer. The router here
+classifies the question with keyword rules (optionally confirmed by a small
+local text classifier), extracts its slots - level, fee item, calendar event
+and bound, gender, facilities, course code - and, when confident, answers it
+from db_utils through a response template. Anything else falls through to
+the agent.
+
+The router is deliberately conservative: a question is only answered when
+every word in its canonical form is accounted for by the intent's vocabulary
+or a slot, so "what is the 200 level fee for direct entry students" still
+goes to the agent.
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+import db_utils
+from db_schema import normalize_facility
+from semantic_cache import canonical_question, question_slots
+
+logger = logging.getLogger(__name__)
+
+try:
+    import joblib
+    HAS_JOBLIB = True
+except ImportError:
+    HAS_JOBLIB = False
+
+# Router configuration
+FAST_PATH_ENABLED = os.getenv('FAST_PATH_ENABLED', 'true').lower() == 'true'
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv('FAST_PATH_MIN_CONFIDENCE', '0.8'))
+# Optional scikit-learn text classifier (joblib file) trained on canonical questions, with
+# classes 'fees', 'calendar', 'hostels', 'course' and 'other'
+FAST_PATH_MODEL = os.getenv('FAST_PATH_MODEL', '')
+
+FEES = 'fees'
+CALENDAR = 'calendar'
+HOSTELS = 'hostels'
+COURSE = 'course'
+
+# Questions that ask for advice, procedure or comparison, not a lookup (matched on the raw question)
+_COMPLEX = re.compile(
+    r"\b(why|how (?:do|does|can|could|should|to|long)|should|recommend|advise|suggest|explain|compare|"
+    r"difference|better|best|help|apply|process|procedure|requirements?|prerequisites?|eligib\w*|"
+    r"scholarships?|refunds?|installments?|penalty|if|but|also|else)\b"
+)
+
+# Fee items: canonical token -> fees.level filter
+FEE_ITEMS = {
+    'hostel': 'hostel',
+    'medical': 'medical',
+    'library': 'library',
+    'sports': 'sports',
+    'union': 'student union',
+    'ict': 'ict',
+    'lab': 'lab fee',
+    'laboratory': 'lab fee',
+    'project': 'project',
+    'transcript': 'transcript',
+    'verification': 'verification',
+    'id': 'id card',
+    'masters': 'pg masters',
+    'phd': 'pg phd',
+}
+
+# Calendar events: canonical token -> event_type substring
+CALENDAR_EVENTS = {
+    'registration': 'Registration',
+    'late': 'Late Registration',
+    'exam': 'Exam',
+    'semester': 'Semester',
+    'add': 'Add/Drop',
+    'drop': 'Add/Drop',
+    'withdrawal': 'Withdrawal',
+    'withdraw': 'Withdrawal',
+    'clearance': 'Clearance',
+    'break': 'Break',
+    'holiday': 'Break',
+    'application': 'Hostel Application',
+}
+
+# Words each intent accounts for in a canonical question (besides slots)
+_VOCABULARY = {
+    FEES: {'fee', 'amount', 'naira', 'tuition', 'acceptance', 'student', 'students', 'card', 'pg',
+           'postgraduate', 'science', 'engineering', 'ug'},
+    CALENDAR: {'date', 'start', 'end', 'period', 'mid', 'final', 'first', 'second', 'regular', 'classes',
+               'next', 'upcoming', 'open', 'fee'},
+    HOSTELS: {'hostel', 'room', 'rooms', 'bed', 'beds', 'space', 'spaces', 'capacity', 'least', 'more',
+              'than', 'male', 'female', 'mixed', 'list', 'all', 'names', 'student', 'students'},
+    COURSE: {'course', 'credit', 'credits', 'unit', 'units', 'lecturer', 'semester', 'first', 'second',
+             'title', 'name', 'details'},
+}
+# semantic_cache.question_slots() slots each intent's lookup can honour
+_SUPPORTED_SLOTS = {
+    FEES: {'level'},
+    CALENDAR: {'event', 'bound', 'qualifier'},  # Qualifiers (late, mid, ...) are matched as event words
+    HOSTELS: {'gender'},
+    COURSE: {'course'},
+}
+_FACILITY_WORDS = {'facilities', 'facility', 'wifi', 'wi', 'fi', 'internet', 'kitchen', 'water', 'security',
+                   'electricity', 'power', 'generator', 'backup', 'ac', 'air', 'conditioning', 'study',
+                   'reading', 'common', 'lounge', 'private', 'single', 'individual', 'notice', 'board', '24', '7'}
+_CAPACITY = re.compile(r"\b(?:at least|more than|over|minimum(?: of)?|min)\s+(\d+)\s*(?:beds?|spaces?|capacity|students?)?\b")
+
+
+class Route:
+    """Outcome of classifying a question: an intent with its slots, or the reason it falls through"""
+
+    __slots__ = ('intent', 'slots', 'confidence', 'reason')
+
+    def __init__(self, intent: Optional[str] = None, slots: Optional[Dict] = None, confidence: float = 0.0,
+                 reason: Optional[str] = None):
+        self.intent = intent
+        self.slots = slots or {}
+        self.confidence = confidence
+        self.reason = reason
+
+    def __repr__(self):
+        return f"Route({self.intent}, {self.slots}, {self.confidence:.2f}, {self.reason})"
+
+
+def _coverage(tokens: List[str], known: set) -> float:
+    return sum(token in known for token in tokens) / len(tokens) if tokens else 0.0
+
+
+def classify(question: str) -> Route:
+    """Classify a question with keyword rules and extract its slots"""
+    raw = ' '.join(question.lower().split())
+    if _COMPLEX.search(raw):
+        return Route(reason='complex')
+    canonical = canonical_question(question)
+    tokens = canonical.split()
+    if not tokens:
+        return Route(reason='empty')
+    slot_pairs = dict(question_slots(canonical))  # One value per slot; multiple values fall through below
+    if len(slot_pairs) != len(question_slots(canonical)):
+        return Route(reason='multiple values')
+    slot_tokens = set(slot_pairs.values()) | {'level', 'semester'}
+
+    words = set(tokens)
+    intents = set()
+    if 'course' in slot_pairs:
+        intents.add(COURSE)
+    if words & {'hostel', 'bed', 'beds', 'room', 'rooms'} or 'gender' in slot_pairs:
+        intents.add(HOSTELS)
+    if 'fee' in words:
+        intents.add(FEES)
+    if words & set(CALENDAR_EVENTS) or (words & {'date', 'start', 'end'} and not intents):
+        intents.add(CALENDAR)
+
+    # "hostel fee" is a fee, "hostel application deadline" and "fee payment deadline" are dates
+    if intents == {FEES, HOSTELS} and 'gender' not in slot_pairs:
+        intents = {FEES}
+    if intents == {HOSTELS, CALENDAR} and 'application' in words:
+        intents = {CALENDAR}
+    if (intents == {FEES} and words & {'date', 'start', 'end'}
+            and not slot_pairs.keys() - {'bound'} and not words & set(FEE_ITEMS)):
+        intents = {CALENDAR}
+        slot_pairs['event'] = 'Payment'
+    if len(intents) != 1:
+        return Route(reason='ambiguous' if intents else 'no intent')
+    intent = intents.pop()
+    if slot_pairs.keys() - _SUPPORTED_SLOTS[intent]:
+        return Route(intent, reason='unsupported slot')  # e.g. "first semester exams": the calendar has no semesters
+
+    slots = {}
+    known = set(_VOCABULARY[intent]) | slot_tokens
+    if intent == FEES:
+        if 'level' in slot_pairs:
+            slots['level'] = slot_pairs['level']
+        items = [token for token in tokens if token in FEE_ITEMS]
+        if items:
+            slots['item'] = FEE_ITEMS[items[0]]
+            known |= set(items)
+        if len(slots) != 1:
+            return Route(FEES, slots, reason='missing slot' if not slots else 'ambiguous')
+    elif intent == CALENDAR:
+        events = [token for token in tokens if token in CALENDAR_EVENTS]
+        if events:
+            slots['event'] = CALENDAR_EVENTS['late' if 'late' in events else events[0]]
+            known |= set(events) | {'hostel'}
+        elif 'event' in slot_pairs:
+            slots['event'] = slot_pairs['event']
+        else:
+            return Route(CALENDAR, reason='missing slot')
+        if 'bound' in slot_pairs:
+            slots['bound'] = slot_pairs['bound']
+    elif intent == HOSTELS:
+        if 'gender' in slot_pairs:
+            slots['gender'] = slot_pairs['gender']
+        facilities = normalize_facility(raw)
+        if facilities != [raw]:
+            slots['facilities'] = facilities
+            known |= _FACILITY_WORDS
+        capacity = _CAPACITY.search(raw)
+        if capacity:
+            slots['min_capacity'] = int(capacity.group(1))
+            known |= {capacity.group(1), 'minimum', 'min', 'over'}
+    elif intent == COURSE:
+        slots['code'] = slot_pairs['course'].upper()
+        known.add(slot_pairs['course'])
+
+    return Route(intent, slots, _coverage(tokens, known))
+
+
+def _naira(amount) -> str:
+    return f"₦{amount:,}" if isinstance(amount, int) else f"₦{amount}"
+
+
+def _long_date(iso_date: str) -> str:
+    try:
+        return date.fromisoformat(iso_date).strftime('%A, %d %B %Y')
+    except (TypeError, ValueError):
+        return str(iso_date)
+
+
+def answer_fees(slots: Dict) -> Optional[str]:
+    label = f"{slots['level']} level" if 'level' in slots else slots['item']
+    rows = db_utils.get_fees(limit=10, level=slots.get('level') or slots['item'])
+    if not rows:
+        return None
+    if len(rows) == 1:
+        row = rows[0]
+        return f"The {row['level']} fee ({row['fee_type']}) is {_naira(row['amount'])}."
+    lines = [f"- {row['level']} ({row['fee_type']}): {_naira(row['amount'])}" for row in rows]
+    return f"Fees matching {label}:\n" + '\n'.join(lines)
+
+
+def answer_calendar(slots: Dict) -> Optional[str]:
+    event = slots['event']
+    rows = [row for row in db_utils.get_next_deadlines(limit=100)
+            if event.lower() in row['event_type'].lower()
+            and (event != 'Registration' or 'late' not in row['event_type'].lower())]
+    bound = slots.get('bound')
+    if bound:
+        words = ('start', 'begin', 'open') if bound == 'start' else ('end', 'deadline', 'close')
+        bounded = [row for row in rows if any(word in row['event_type'].lower() for word in words)]
+        rows = bounded or rows
+    if not rows:
+        return f"There are no upcoming {event.lower()} dates on the academic calendar."
+    lines = [f"- {row['event_type']}: {_long_date(row['event_date'])} ({row['description']})" for row in rows]
+    return "Upcoming dates on the academic calendar:\n" + '\n'.join(lines)
+
+
+def _hostel_gender(gender: Optional[str]) -> str:
+    return 'Mixed, male and female students' if (gender or '').lower() == 'mixed' else gender or 'Unknown'
+
+
+def answer_hostels(slots: Dict) -> Optional[str]:
+    rows = db_utils.get_hostels(limit=50, gender=slots.get('gender'), facilities=slots.get('facilities'),
+                                min_capacity=slots.get('min_capacity'))
+    gender = slots.get('gender', '')
+    # A male or female search also returns mixed hostels; say so rather than list them as single-sex
+    mixed = gender != 'mixed' and any((row['gender'] or '').lower() == 'mixed' for row in rows)
+    wanted = ' '.join(filter(None, [gender.capitalize(), 'and mixed' if gender and mixed else '', 'hostels']))
+    conditions = []
+    if slots.get('facilities'):
+        conditions.append('with ' + ', '.join(slots['facilities']))
+    if slots.get('min_capacity'):
+        conditions.append(f"with at least {slots['min_capacity']} bed spaces")
+    wanted = ' '.join([wanted] + conditions)
+    wanted = wanted[0].upper() + wanted[1:]
+    if not rows:
+        return f"No {wanted[0].lower() + wanted[1:]} were found."
+    lines = [f"- {row['name']} ({_hostel_gender(row['gender'])}, {row['capacity']} bed spaces, {row['status']})"
+             for row in rows]
+    return f"{wanted} ({len(rows)}):\n" + '\n'.join(lines)
+
+
+def answer_course(slots: Dict) -> Optional[str]:
+    row = db_utils.get_course_by_code(slots['code'])
+    if not row:
+        return None
+    details = [f"{row['credits']} credits", row.get('semester'), f"{row['department']} department"]
+    text = f"{row['code']} - {row['name']}: " + ', '.join(filter(None, details)) + '.'
+    for label, column in (('Lecturer: ', 'lecturer'), ('Prerequisites: ', 'prerequisites'), ('', 'description')):
+        if row.get(column):
+            text += f" {label}{row[column].rstrip('.')}."
+    return text
+
+
+ANSWERS: Dict[str, Callable[[Dict], Optional[str]]] = {
+    FEES: answer_fees,
+    CALENDAR: answer_calendar,
+    HOSTELS: answer_hostels,
+    COURSE: answer_course,
+}
+
+
+class FastPathRouter:
+    """
+    Answers confidently classified lookups from the database, counting hits and fall-throughs
+
+    Args:
+        min_confidence: Minimum share of a question's words the rules must account for
+        model: Optional classifier with predict_proba() and classes_ (e.g. a scikit-learn
+            pipeline); its probability for the rule intent is averaged into the confidence
+        enabled: If False, every question falls through
+    """
+
+    def __init__(self, min_confidence: float = FAST_PATH_MIN_CONFIDENCE, model=None,
+                 enabled: bool = FAST_PATH_ENABLED):
+        self.min_confidence = min_confidence
+        self.model = model
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self.questions = 0
+        self.answered: Dict[str, int] = {}
+        self.fallthroughs: Dict[str, int] = {}
+        self.answer_ms = 0.0
+
+    def route(self, question: str) -> Route:
+        """Classify a question, applying the optional model and the confidence threshold"""
+        route = classify(question)
+        if route.intent and route.reason is None and self.model is not None:
+            try:
+                probabilities = self.model.predict_proba([canonical_question(question)])[0]
+                p_intent = dict(zip(self.model.classes_, probabilities)).get(route.intent, 0.0)
+                route.confidence = (route.confidence + float(p_intent)) / 2
+            except Exception as e:
+                logger.warning(f"Fast path model failed, using rules only: {e}")
+        if route.reason is None and route.confidence < self.min_confidence:
+            route.reason = 'low confidence'
+        return route
+
+    def _count(self, bucket: Dict[str, int], key: str, elapsed_ms: float = 0.0):
+        with self._lock:
+            self.questions += 1
+            bucket[key] = bucket.get(key, 0) + 1
+            self.answer_ms += elapsed_ms
+
+    def answer(self, question: str) -> Tuple[Optional[str], Route]:
+        """
+        Answer a question without the model, if it is a confident data lookup
+
+        Returns:
+            (answer, route); answer is None when the question should go to the agent
+        """
+        if not self.enabled or not question:
+            return None, Route(reason='disabled')
+        start = time.perf_counter()
+        route = self.route(question)
+        if route.reason is not None:
+            self._count(self.fallthroughs, route.reason)
+            return None, route
+        try:
+            text = ANSWERS[route.intent](route.slots)
+        except Exception as e:
+            logger.warning(f"Fast path {route.intent} lookup failed, falling through to the agent: {e}")
+            text = None
+        if text is None:
+            route.reason = 'no answer'
+            self._count(self.fallthroughs, route.reason)
+            return None, route
+        self._count(self.answered, route.intent, (time.perf_counter() - start) * 1000)
+        return text, route
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = sum(self.answered.values())
+            return {
+                'enabled': self.enabled,
+                'questions': self.questions,
+                'hits': hits,
+                'hit_rate': round(hits / self.questions, 3) if self.questions else 0.0,
+                'hits_by_intent': dict(self.answered),
+                'fallthroughs': dict(self.fallthroughs),
+                'avg_answer_ms': round(self.answer_ms / hits, 2) if hits else 0.0,
+            }
+
+
+def _load_model():
+    if not FAST_PATH_MODEL:
+        return None
+    if not HAS_JOBLIB:
+        logger.warning("⚠️  FAST_PATH_MODEL is set but joblib isn't installed; routing with rules only")
+        return None
+    try:
+        model = joblib.load(FAST_PATH_MODEL)
+        logger.info(f"🧭 Fast path classifier loaded from {FAST_PATH_MODEL}")
+        return model
+    except Exception as e:
+        logger.warning(f"⚠️  Could not load fast path classifier {FAST_PATH_MODEL}: {e}")
+        return None
+
+
+fast_path = FastPathRouter(model=_load_model())
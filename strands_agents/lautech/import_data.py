@@ -17,65 +17,25 @@ import sqlite3
 import argparse
 from pathlib import Path
 
+from db_schema import (
+    migrate,
+    bump_data_version,
+    refresh_calendar_views,
+    refresh_hostel_facilities,
+    LATEST_SCHEMA_VERSION,
+)
+
 DB_PATH = Path("lautech_data.db")
 DATA_DIR = Path("data")
 
 
 def create_tables(conn):
-    """Create all tables if they don't exist"""
-    cursor = conn.cursor()
-
-    # Courses table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS courses (
-            code TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            credits INTEGER,
-            prerequisites TEXT,
-            description TEXT,
-            semester TEXT,
-            lecturer TEXT,
-            department TEXT
-        )
-    """)
-
-    # Fees table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS fees (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            level TEXT NOT NULL,
-            amount INTEGER NOT NULL,
-            fee_type TEXT,
-            session TEXT
-        )
-    """)
-
-    # Calendar table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS academic_calendar (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            event_type TEXT NOT NULL,
-            event_date TEXT NOT NULL,
-            semester TEXT,
-            session TEXT,
-            description TEXT
-        )
-    """)
-
-    # Hostels table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS hostels (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            gender TEXT,
-            capacity INTEGER,
-            status TEXT,
-            facilities TEXT
-        )
-    """)
-
-    conn.commit()
-    print("✅ Tables created/verified")
+    """Create the tables and indexes, applying any pending schema migrations"""
+    applied = migrate(conn, 'sqlite')
+    if applied:
+        print(f"✅ Schema migrated to version {applied[-1]} (applied {', '.join(map(str, applied))})")
+    else:
+        print(f"✅ Tables verified (schema version {LATEST_SCHEMA_VERSION})")
 
 
 def clear_table(conn, table_name):
@@ -103,10 +63,20 @@ def import_courses(conn, clear=False):
         reader = csv.DictReader(f)
         for row in reader:
             try:
+                # Upsert rather than INSERT OR REPLACE: REPLACE deletes the old row
+                # without firing delete triggers, which would desync the search index
                 cursor.execute("""
-                    INSERT OR REPLACE INTO courses
+                    INSERT INTO courses
                     (code, name, credits, prerequisites, description, semester, lecturer, department)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (code) DO UPDATE SET
+                        name = excluded.name,
+                        credits = excluded.credits,
+                        prerequisites = excluded.prerequisites,
+                        description = excluded.description,
+                        semester = excluded.semester,
+                        lecturer = excluded.lecturer,
+                        department = excluded.department
                 """, (
                     row['code'],
                     row['name'],
@@ -321,6 +291,15 @@ def main():
     if args.all or args.hostels:
         import_hostels(conn, clear=args.clear)
 
+    # Rebuild the derived tables (open windows, next deadlines as of today, hostel facilities)
+    refresh_calendar_views(conn.cursor(), 'sqlite')
+    refresh_hostel_facilities(conn.cursor(), 'sqlite')
+
+    # Tell running agents their cached query results are stale
+    version = bump_data_version(conn.cursor())
+    conn.commit()
+    print(f"🔖 Data version is now {version}")
+
     # Show statistics
     show_statistics(conn)
 
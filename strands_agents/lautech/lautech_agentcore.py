@@ -11,35 +11,68 @@ Features:
 - Production-ready with proper error handling
 """
 
+# First, so STARTUP_PROFILE=true times every import below
+from startup_profile import startup_profile, LazyResource, prewarm, PREWARM
+
+import asyncio
+import hashlib
+import inspect
 import logging
-import json
+import math
 import os
 import shutil
+import sys
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
-from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig
-from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
 from strands import Agent, tool
-from strands.models import BedrockModel
 
 # Import database utilities (supports both SQLite and PostgreSQL)
 from db_utils import (
     init_database,
+    from_snapshot,
+    current_data_version,
+    USE_POSTGRES,
+    SQLITE_PATH,
+    SQLITE_READ_ONLY,
+    PACKAGED_SQLITE_PATH,
+)
+
+# Tools use the async twins so DB waits don't block the agent's event loop
+from db_async import (
     get_courses,
     get_fees,
-    get_calendar,
     get_hostels,
-    USE_POSTGRES
+    get_next_deadlines,
+    get_open_windows,
+    get_snapshot,
+    get_page,
 )
+from db_results import format_rows
+from response_cache import cache_key, response_cache, COMPUTED, GLOBAL
+from semantic_cache import semantic_cache
+from agent_pool import AgentPool
+from fast_path import fast_path
+from tool_cache import cached_tool
+from db_schema import calendar_today
+from tracing import setup_tracing, request_span, span
+from admission import admission, AdmissionRejected
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Export spans (TRACING_EXPORTER / OTEL_EXPORTER_OTLP_ENDPOINT) before Strands creates its tracer
+with startup_profile.stage("tracing_setup"):
+    setup_tracing()
+
 # Initialize the AgentCore App
-app = BedrockAgentCoreApp()
+with startup_profile.stage("app_init"):
+    app = BedrockAgentCoreApp()
 
 # Memory ID (from agentcore memory list)
 MEMORY_ID = os.getenv('AGENTCORE_MEMORY_ID', 'lautech_agentcore_mem-yeGCqwG7EM')
@@ -49,6 +82,17 @@ MEMORY_ID = os.getenv('AGENTCORE_MEMORY_ID', 'lautech_agentcore_mem-yeGCqwG7EM')
 # For PostgreSQL (production): Set USE_POSTGRES=true and DB_SECRET_NAME
 logger.info(f"Database mode: {'PostgreSQL (RDS)' if USE_POSTGRES else 'SQLite (local)'}")
 
+# Serve tools from the cached all-tables snapshot (one DB round trip per data version)
+TOOLS_USE_SNAPSHOT = os.getenv('TOOLS_USE_SNAPSHOT', 'true').lower() == 'true'
+
+# Stream answers as incremental events unless the payload says otherwise ("stream": true/false)
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', 'false').lower() == 'true'
+
+# Serve requests concurrently from an async entrypoint with admission control (see admission.py)
+ASYNC_ENTRYPOINT = os.getenv('ASYNC_ENTRYPOINT', 'false').lower() == 'true'
+BUSY_MESSAGE = ("Lots of students are asking questions right now, so I can't answer yours yet. "
+                "Please try again in a few seconds.")
+
 
 # ============================================================================
 # BEDROCK MODEL WITH GUARDRAILS
@@ -74,46 +118,88 @@ if GUARDRAIL_ID:
 else:
     logger.warning("⚠️  No guardrails configured. Set BEDROCK_GUARDRAIL_ID for production.")
 
-bedrock_model = BedrockModel(**model_config)
+
+def _create_bedrock_model():
+    from strands.models import BedrockModel
+    return BedrockModel(**model_config)
+
+
+# Built on first use or by prewarm (creating its boto3 client takes a noticeable part of a cold start)
+bedrock_model = LazyResource("bedrock_model", _create_bedrock_model)
 
 # ============================================================================
 # SPECIALIST AGENTS
 # ============================================================================
 
+async def _lookup(table: str, fetch, limit: int, **filters):
+    """Answer a tool query from the snapshot, falling back to a direct query"""
+    if TOOLS_USE_SNAPSHOT:
+        try:
+            rows = from_snapshot(await get_snapshot(), table, limit=limit, **filters)
+            if rows is not None:
+                return rows
+        except Exception as e:
+            logger.warning(f"Snapshot unavailable, querying {table} directly: {e}")
+    return await fetch(limit=limit, as_table=True, **filters)
+
+
 @tool
-def get_course_info(search: str = None) -> str:
-    """Search for courses. Pass a course code or name to search, or leave empty for top results."""
-    courses = get_courses(limit=10, search=search)
+@cached_tool()
+async def get_course_info(search: str = None, page_token: str = None) -> str:
+    """Search for courses by code or name, or leave empty to list them 10 at a time (pass next_page_token to continue)."""
+    if search:
+        courses = await _lookup('courses', get_courses, 10, search=search)
+        next_page_token = None
+    else:
+        try:
+            page = await get_page('courses', 10, page_token)
+        except ValueError:
+            return "That page token is no longer valid. Call again without it to start from the first page."
+        courses, next_page_token = page['rows'], page['next_cursor']
     if not courses:
         return "No courses found."
-    return json.dumps(courses, separators=(',', ':'))  # Compact JSON
+    if next_page_token:
+        return f"{format_rows(courses)}\nnext_page_token: {next_page_token}"
+    return format_rows(courses)  # Header + rows, no repeated keys
 
 
 @tool
-def get_financial_info(level: str = None) -> str:
+@cached_tool()
+async def get_financial_info(level: str = None) -> str:
     """Get tuition fees. Pass level (e.g. '100', '200') to filter, or leave empty for all."""
-    fees = get_fees(limit=10, level=level)
+    fees = await _lookup('fees', get_fees, 10, level=level)
     if not fees:
         return "No fees found."
-    return json.dumps(fees, separators=(',', ':'))  # Compact JSON
+    return format_rows(fees)
 
 
 @tool
-def get_schedule_info() -> str:
-    """Get upcoming academic calendar events and deadlines."""
-    events = get_calendar(limit=10)
-    if not events:
-        return "No calendar events found."
-    return json.dumps(events, separators=(',', ':'))  # Compact JSON
+@cached_tool(key=lambda on_date=None: [on_date or calendar_today()])  # "Next" deadlines change at midnight
+async def get_schedule_info(on_date: str = None) -> str:
+    """Get the next date of each academic calendar event and deadline. Pass on_date (YYYY-MM-DD) to see which periods (registration, exams, ...) are open on that date."""
+    if on_date:
+        try:
+            windows = await get_open_windows(on_date, as_table=True)
+        except ValueError:
+            return "Pass on_date as YYYY-MM-DD."
+        if not windows:
+            return f"No registration, exam or other periods are open on {on_date}."
+        return format_rows(windows)
+    deadlines = await get_next_deadlines(limit=25, as_table=True)
+    if not deadlines:
+        return "No upcoming calendar events."
+    return format_rows(deadlines)
 
 
 @tool
-def get_hostel_info(gender: str = None) -> str:
-    """Get hostel information. Pass 'male', 'female', or 'mixed' to filter by gender."""
-    hostels = get_hostels(limit=50, gender=gender)
+@cached_tool()
+async def get_hostel_info(gender: str = None, facilities: List[str] = None, min_capacity: int = None) -> str:
+    """Get hostel information. Pass 'male', 'female', or 'mixed' to filter by gender, facilities (e.g. ['wifi', 'kitchen']) to require all of them, and min_capacity for a minimum number of bed spaces."""
+    hostels = await _lookup('hostels', get_hostels, 50, gender=gender, facilities=facilities,
+                            min_capacity=min_capacity)
     if not hostels:
-        return "No hostels found."
-    return json.dumps(hostels, separators=(',', ':'))  # Compact JSON
+        return "No hostels match." if facilities or min_capacity else "No hostels found."
+    return format_rows(hostels)
 
 
 # ============================================================================
@@ -131,7 +217,7 @@ MEMORY INSTRUCTIONS:
 
 Your specialist agents for university data:
 1. get_course_info - Course details, prerequisites, recommendations
-2. get_schedule_info - Registration dates, deadlines, calendar
+2. get_schedule_info - Upcoming registration dates and deadlines, periods open on a date
 3. get_financial_info - Tuition fees, payment methods
 4. get_hostel_info - Accommodation and facilities
 
@@ -141,27 +227,44 @@ accurate information based on the LIVE database results.
 """
 
 # ============================================================================
-# GLOBAL INITIALIZATION (Run once at module load)
+# GLOBAL INITIALIZATION (Run once per container, on first use or by prewarm)
 # ============================================================================
 
-# Initialize database once at startup
-logger.info("🚀 Initializing database at module load...")
-if not USE_POSTGRES:
-    # SQLite mode: handle database file setup
-    from pathlib import Path
-    DB_PATH = Path(os.getenv('SQLITE_PATH', '/tmp/lautech_data.db'))
-    PACKAGED_DB_PATH = Path("lautech_data.db")
-
-    if not DB_PATH.exists():
-        if PACKAGED_DB_PATH.exists():
-            logger.info(f"📦 Copying packaged database to {DB_PATH}")
-            shutil.copy(PACKAGED_DB_PATH, DB_PATH)
-        else:
-            logger.info("🆕 Creating fresh SQLite database")
-
-# Initialize schema once (works for both SQLite and PostgreSQL)
-init_database()
-logger.info("✅ Database initialized")
+def _init_database():
+    """Open (and in writable mode copy and migrate) the database once per container"""
+    logger.info("🚀 Initializing database...")
+    _db_start = time.perf_counter()
+    if USE_POSTGRES:
+        init_database()
+        logger.info(f"✅ Database initialized in {(time.perf_counter() - _db_start) * 1000:.0f} ms")
+    elif SQLITE_READ_ONLY:
+        # Serving mode: open the packaged file in place, no copy and no schema DDL
+        init_database()
+        skipped_mb = os.path.getsize(SQLITE_PATH) / (1024 * 1024)
+        logger.info(f"✅ Database ready in {(time.perf_counter() - _db_start) * 1000:.0f} ms "
+                    f"(read-only; skipped copying {skipped_mb:.1f} MB to /tmp and schema setup)")
+    else:
+        # Writable mode (local development): work on a copy of the packaged database
+        DB_PATH = Path(SQLITE_PATH)
+        PACKAGED_DB_PATH = Path(PACKAGED_SQLITE_PATH)
+
+        if not DB_PATH.exists():
+            if PACKAGED_DB_PATH.exists():
+                logger.info(f"📦 Copying packaged database to {DB_PATH}")
+                shutil.copy(PACKAGED_DB_PATH, DB_PATH)
+            else:
+                logger.info("🆕 Creating fresh SQLite database")
+        _copy_ms = (time.perf_counter() - _db_start) * 1000
+
+        # Initialize schema once
+        init_database()
+        _total_ms = (time.perf_counter() - _db_start) * 1000
+        logger.info(f"✅ Database initialized in {_total_ms:.0f} ms (copy {_copy_ms:.0f} ms, "
+                    f"schema {_total_ms - _copy_ms:.0f} ms; SQLITE_READ_ONLY=true skips both)")
+
+
+# Initialized before the first request (or by prewarm), not at module load
+database = LazyResource("database", _init_database)
 
 # Create tools list once
 ALL_TOOLS = [
@@ -173,114 +276,348 @@ ALL_TOOLS = [
 
 
 # ============================================================================
-# RESPONSE CACHE (reduces latency for common queries)
+# AGENTCORE ENTRYPOINT
 # ============================================================================
 
-import hashlib
-from functools import lru_cache
+def _import_memory_integration():
+    from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig
+    from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
+    return AgentCoreMemoryConfig, AgentCoreMemorySessionManager
 
-# Simple TTL cache for agent responses
-_response_cache = {}
-_cache_ttl = 300  # 5 minutes
 
-def get_cached_response(query_hash):
-    """Get cached response if available and not expired"""
-    import time
-    if query_hash in _response_cache:
-        cached_at, response = _response_cache[query_hash]
-        if time.time() - cached_at < _cache_ttl:
-            return response
-    return None
+# Only needed once the first agent is built
+memory_integration = LazyResource("memory_integration", _import_memory_integration)
 
-def cache_response(query_hash, response):
-    """Cache a response"""
-    import time
-    _response_cache[query_hash] = (time.time(), response)
 
+def _build_agent(session_id: str, actor_id: str) -> Agent:
+    """Create a memory-backed orchestrator agent for one session"""
+    AgentCoreMemoryConfig, AgentCoreMemorySessionManager = memory_integration.get()
 
-# ============================================================================
-# AGENTCORE ENTRYPOINT
-# ============================================================================
-
-@app.entrypoint
-def lautech_assistant(payload):
-    """
-    AgentCore entrypoint for LAUTECH Assistant
-    
-    Args:
-        payload (dict): Contains the prompt from the user
-        
-    Returns:
-        str: The agent's response text
-    """
-    try:
-        import time
-        start_time = time.time()
-        
-        user_input = payload.get("prompt")
-        logger.info(f"User input: {user_input}")
-        
-        # Check cache first for common queries
-        query_hash = hashlib.md5(user_input.lower().strip().encode()).hexdigest()
-        cached = get_cached_response(query_hash)
-        if cached:
-            logger.info(f"⚡ CACHE HIT - returning in {time.time() - start_time:.2f}s")
-            return cached
-
-        # Get session info from payload context - CRITICAL: each user needs unique session for privacy
-        # Generate unique ID if not provided to prevent shared conversation history
-        session_id = payload.get("session_id") or f"anon_{hashlib.md5(str(time.time()).encode()).hexdigest()[:12]}"
-        actor_id = payload.get("actor_id", "anonymous")
-        logger.info(f"Session ID: {session_id}, Actor ID: {actor_id}")
-
-        # Configure AgentCore Memory
-        t1 = time.time()
+    # Configure AgentCore Memory
+    t1 = time.time()
+    with span("memory_config"):
         memory_config = AgentCoreMemoryConfig(
             memory_id=MEMORY_ID,
             session_id=session_id,
             actor_id=actor_id
         )
-        logger.info(f"⏱️  Memory config creation: {time.time() - t1:.2f}s")
+    logger.info(f"⏱️  Memory config creation: {time.time() - t1:.2f}s")
 
-        # Create session manager with memory
-        t2 = time.time()
+    # Create session manager with memory
+    t2 = time.time()
+    with span("session_manager_init"):
         session_manager = AgentCoreMemorySessionManager(
             agentcore_memory_config=memory_config,
             region_name="us-east-1"
         )
-        logger.info(f"⏱️  Session manager init: {time.time() - t2:.2f}s")
+    logger.info(f"⏱️  Session manager init: {time.time() - t2:.2f}s")
 
-        # Create orchestrator agent with tools and memory
-        t3 = time.time()
+    # Create orchestrator agent with tools and memory
+    t3 = time.time()
+    with span("agent_create"):
         agent = Agent(
             tools=ALL_TOOLS,
-            model=bedrock_model,
+            model=bedrock_model.get(),
             system_prompt=SYSTEM_PROMPT,
             session_manager=session_manager
         )
-        logger.info(f"⏱️  Agent creation: {time.time() - t3:.2f}s")
+    logger.info(f"⏱️  Agent creation: {time.time() - t3:.2f}s")
+    return agent
+
 
-        # Get response from agent
+# Follow-up messages of a session reuse its live agent (no re-initialization or memory rehydration)
+agent_pool = AgentPool(_build_agent)
+
+
+@contextmanager
+def _session_agent(session_id: Optional[str], actor_id: str):
+    """The session's pooled agent, or a one-off agent when the caller sent no session_id"""
+    if not session_id:
+        # Generate unique ID if not provided to prevent shared conversation history
+        yield _build_agent(f"anon_{hashlib.md5(str(time.time()).encode()).hexdigest()[:12]}", actor_id)
+        return
+    with agent_pool.lease(session_id, actor_id) as agent:
+        yield agent
+
+
+def _run_agent(user_input: str, payload: dict, start_time: float) -> str:
+    """Answer one question with the session's memory-backed orchestrator agent"""
+    # Get session info from payload context - CRITICAL: each user needs unique session for privacy
+    session_id = payload.get("session_id")
+    actor_id = payload.get("actor_id", "anonymous")
+    logger.info(f"Session ID: {session_id or 'anonymous (new)'}, Actor ID: {actor_id}")
+
+    # Concurrent messages of one session wait here for its agent in turn
+    t0 = time.time()
+    with span("agent_lease") as lease_span, _session_agent(session_id, actor_id) as agent:
+        lease_span.set_attribute("agent_pool.wait_s", round(time.time() - t0, 3))
+        logger.info(f"⏱️  Agent ready: {time.time() - t0:.2f}s")
+
+        # Get response from agent (Strands adds model and tool call spans under this one)
         t4 = time.time()
-        response = agent(user_input)
+        with span("agent_invoke"):
+            response = agent(user_input)
         logger.info(f"⏱️  Agent execution: {time.time() - t4:.2f}s")
-        
-        logger.info(f"⏱️  TOTAL REQUEST TIME: {time.time() - start_time:.2f}s")
 
-        # Extract and return the text content
-        result = response.message["content"][0]["text"]
+    logger.info(f"⏱️  TOTAL REQUEST TIME: {time.time() - start_time:.2f}s")
+    return _response_text(response)
+
+
+def _response_text(result) -> str:
+    """Extract the text content of an AgentResult"""
+    return result.message["content"][0]["text"]
+
+
+def _answer_paraphrase(user_input: str, payload: dict, start_time: float) -> str:
+    """Reuse the answer to a close paraphrase of a global question, or run the agent"""
+    with span("semantic_cache") as cache_span:
+        result, match = semantic_cache.get_or_compute(user_input, lambda: _run_agent(user_input, payload, start_time))
+        cache_span.set_attribute("cache.hit", match is not None)
+    if match:
+        logger.info(f"⚡ SEMANTIC CACHE HIT ({match[1]:.3f} similar to \"{match[0]}\") - "
+                    f"returning in {time.time() - start_time:.2f}s")
+    return result
+
+
+@asynccontextmanager
+async def _session_agent_async(session_id: Optional[str], actor_id: str):
+    """_session_agent() for async callers: waiting for and building the agent happen off the event loop"""
+    lease = _session_agent(session_id, actor_id)
+    agent = await asyncio.to_thread(lease.__enter__)
+    try:
+        yield agent
+    except BaseException:
+        if not lease.__exit__(*sys.exc_info()):
+            raise
+    else:
+        lease.__exit__(None, None, None)
+
+
+def _tool_events(event: dict, started: set) -> List[dict]:
+    """Tool-call progress events for one Strands stream event"""
+    tool_use = event.get("current_tool_use")
+    if tool_use and tool_use.get("toolUseId") and tool_use["toolUseId"] not in started:
+        started.add(tool_use["toolUseId"])
+        return [{"type": "tool_start", "tool": tool_use.get("name"), "tool_use_id": tool_use["toolUseId"]}]
+    message = event.get("message")
+    if message and message.get("role") == "user":
+        return [{"type": "tool_end", "tool_use_id": block["toolResult"].get("toolUseId"),
+                 "status": block["toolResult"].get("status")}
+                for block in message.get("content", []) if "toolResult" in block]
+    return []
+
+
+async def _stream_text(text: str, cached: bool):
+    """A ready answer as a one-chunk event stream"""
+    yield {"type": "text", "data": text}
+    yield {"type": "done", "cached": cached}
+
+
+async def _stream_answer(user_input: str, payload: dict, response_key, start_time: float):
+    """
+    Stream an answer as incremental events (BedrockAgentCoreApp sends each one as an SSE message)
+
+    Yields {"type": "text", "data": chunk}, {"type": "tool_start"/"tool_end", ...} and finally
+    {"type": "done", "cached": bool}. Cached answers arrive as a single text event; computed
+    ones are written to the caches once the stream completes.
+    """
+    # The entrypoint's span has ended by the time this runs, so the stream gets its own
+    with request_span("lautech_assistant.stream", payload, payload.get("session_id"),
+                      payload.get("actor_id", "anonymous")) as stream_span:
+        cached = None
+        if response_key is not None:
+            cached = await asyncio.to_thread(response_cache.get, response_key)
+            if cached is None and response_key[0] == GLOBAL:
+                match = await asyncio.to_thread(semantic_cache.lookup, user_input)
+                cached = match[0] if match else None
+        if cached is not None:
+            logger.info(f"⚡ CACHE HIT (streaming) - returning in {time.time() - start_time:.2f}s")
+            async for event in _stream_text(cached, cached=True):
+                yield event
+            return
+
+        session_id = payload.get("session_id")
+        actor_id = payload.get("actor_id", "anonymous")
+        logger.info(f"Session ID: {session_id or 'anonymous (new)'}, Actor ID: {actor_id}")
+        data_version = semantic_cache.version
+        first_token_at = None
+        result = None
+        tools_started = set()
+
+        async with _session_agent_async(session_id, actor_id) as agent:
+            logger.info(f"⏱️  Agent ready: {time.time() - start_time:.2f}s")
+            async for event in agent.stream_async(user_input):
+                if "data" in event:
+                    if first_token_at is None:
+                        first_token_at = time.time()
+                        logger.info(f"⏱️  Time to first token: {first_token_at - start_time:.2f}s")
+                        stream_span.set_attribute("stream.ttft_s", round(first_token_at - start_time, 3))
+                    yield {"type": "text", "data": event["data"]}
+                elif "result" in event:
+                    result = event["result"]
+                else:
+                    for progress in _tool_events(event, tools_started):
+                        yield progress
+
+        logger.info(f"⏱️  TOTAL REQUEST TIME: {time.time() - start_time:.2f}s "
+                    f"(first token after {(first_token_at or time.time()) - start_time:.2f}s)")
+
+        # Cache before the last event: a client that disconnects on "done" closes this generator
+        if result is not None and response_key is not None:
+            text = _response_text(result)
+            await asyncio.to_thread(response_cache.put, response_key, text)
+            if response_key[0] == GLOBAL:
+                await asyncio.to_thread(semantic_cache.add, user_input, text, data_version)
+        yield {"type": "done", "cached": False}
+
+
+def _answer(user_input: str, payload: dict, start_time: float):
+    """Answer a question from the fast path, a cache or the agent (see lautech_assistant)"""
+    # Data questions are cached for everyone, personal ones only within their session
+    stream = payload.get("stream", STREAM_RESPONSES)
+    response_key = cache_key(user_input, payload.get("session_id"), payload.get("actor_id", "anonymous"))
+    if response_key is not None and response_key[0] == GLOBAL:
+        # Answers about university data go stale when it's re-imported
+        if semantic_cache.observe_version(current_data_version()):
+            response_cache.invalidate_global()
+
+        # Plain data lookups ("300 level fee", "male hostels") are answered without the model
+        with span("fast_path") as fast_span:
+            answer, route = fast_path.answer(user_input)
+            fast_span.set_attributes({"fast_path.intent": route.intent or "", "fast_path.reason": route.reason or "answered"})
+        if answer is not None:
+            logger.info(f"🏎️  FAST PATH ({route.intent}) - returning in {time.time() - start_time:.2f}s")
+            return _stream_text(answer, cached=False) if stream else answer
+
+    if stream:
+        # Streamed answers skip request coalescing: every caller gets its own token stream
+        return _stream_answer(user_input, payload, response_key, start_time)
+
+    if response_key is None:
+        return _run_agent(user_input, payload, start_time)
+
+    compute = lambda: _run_agent(user_input, payload, start_time)
+    if response_key[0] == GLOBAL:
+        compute = lambda: _answer_paraphrase(user_input, payload, start_time)
+
+    # Concurrent identical questions (on any replica, with a shared cache) wait for one agent run
+    with span("response_cache") as cache_span:
+        result, source = response_cache.get_or_compute(response_key, compute)
+        cache_span.set_attribute("cache.source", source)
+    if source != COMPUTED:
+        logger.info(f"⚡ CACHE HIT ({response_key[0]}, {source}) - returning in {time.time() - start_time:.2f}s")
+    return result
+
+
+def lautech_assistant(payload):
+    """
+    AgentCore entrypoint for LAUTECH Assistant
+    
+    Args:
+        payload (dict): Contains the prompt from the user; "stream": true (default
+            STREAM_RESPONSES) streams the answer as events instead
         
-        # Cache the response for similar future queries
-        cache_response(query_hash, result)
+    Returns:
+        str: The agent's response text, or an async generator of events when streaming
+    """
+    try:
+        start_time = time.time()
         
-        return result
+        user_input = payload.get("prompt")
+        logger.info(f"User input: {user_input}")
+
+        # Waits only if this request arrived before prewarm finished
+        database.get()
+        
+        with request_span("lautech_assistant", payload, payload.get("session_id"),
+                          payload.get("actor_id", "anonymous")):
+            return _answer(user_input, payload, start_time)
 
     except Exception as e:
         logger.error(f"Error processing request: {e}", exc_info=True)
         raise
 
 
+async def _stream_busy(retry_after: float):
+    yield {"type": "busy", "data": BUSY_MESSAGE, "retry_after": retry_after}
+    yield {"type": "done", "cached": False}
+
+
+def _hold_slot(events):
+    """Keep the admission slot until a streamed answer ends (or is dropped unread)"""
+    released = []
+
+    def release():
+        if not released:
+            released.append(True)
+            admission.release()
+
+    async def stream():
+        try:
+            async for event in events:
+                yield event
+        finally:
+            release()
+
+    held = stream()
+    weakref.finalize(held, release)  # A client that disconnects before the first event never starts it
+    return held
+
+
+def _deadline(payload: dict) -> Optional[float]:
+    """The payload's deadline_s, or None (the default deadline) if it is missing or invalid"""
+    value = payload.get("deadline_s")
+    if value is None:
+        return None
+    try:
+        deadline = float(value)
+    except (TypeError, ValueError):
+        deadline = -1.0
+    if not math.isfinite(deadline) or deadline < 0:
+        logger.warning(f"Ignoring invalid deadline_s {value!r}, using the default")
+        return None
+    return deadline
+
+
+async def lautech_assistant_async(payload):
+    """
+    Async AgentCore entrypoint (ASYNC_ENTRYPOINT=true) with admission control
+
+    Requests beyond ADMISSION_MAX_CONCURRENT wait in a bounded queue; a full queue or a
+    passed deadline gets an immediate "busy, retry" answer instead of a slow one.
+
+    Args:
+        payload (dict): As for lautech_assistant, plus optional "deadline_s", the most
+            seconds this request may wait for a slot (default ADMISSION_DEADLINE)
+
+    Returns:
+        str: The response text or BUSY_MESSAGE, or an async generator of events when
+            streaming (a single "busy" event with retry_after when not admitted)
+    """
+    stream = payload.get("stream", STREAM_RESPONSES)
+    try:
+        # Agent runs, caches and DB helpers block, so they run on an admission worker thread;
+        # a streamed answer keeps its slot until the stream ends
+        result, waited = await admission.call(lautech_assistant, payload, deadline=_deadline(payload),
+                                              keep_slot=inspect.isasyncgen)
+    except AdmissionRejected as rejected:
+        return _stream_busy(rejected.retry_after) if stream else BUSY_MESSAGE
+    if waited >= 0.1:
+        logger.info(f"⏳ Waited {waited:.2f}s for a slot ({admission.queued} still queued)")
+    if inspect.isasyncgen(result):
+        return _hold_slot(result)
+    return result
+
+
+app.entrypoint(lautech_assistant_async if ASYNC_ENTRYPOINT else lautech_assistant)
+
 # Make WSGI app available for AgentCore
 application = app
+
+# Everything above is time-to-ready; the rest is built in the background while health checks pass
+startup_profile.mark_ready()
+if PREWARM:
+    prewarm(database, memory_integration, bedrock_model)
+
 if __name__ == "__main__":
     app.run()
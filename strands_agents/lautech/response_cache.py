@@ -0,0 +1,345 @@
+"""
+Response cache for the lautech_assistant entrypoint
+
+Answers are cached under one of two scopes, decided from the question:
+
+- global: questions about university data ("200 level school fees?"); the
+  cached answer is served to anyone asking the same question
+- session: questions about the user or the conversation ("what is my name?",
+  "what did I ask earlier?") and follow-ups that only make sense after an
+  earlier turn ("how much is it", "and for 300 level?", "yes"); served back
+  only to the same actor and session, and not cached at all without a
+  caller-supplied session_id
+
+Storage is tiered: a per-process LRU (cache_backends.MemoryBackend, bounded
+by entries and bytes) in front of an optional shared Redis-protocol backend
+(``RESPONSE_CACHE_REDIS_URL``) that all AgentCore replicas read, so a cold
+container starts warm. get_or_compute() coalesces concurrent identical
+questions: within a process they wait for one model call, and across
+replicas a short-lived lock in the shared backend makes the others wait for
+the first replica's answer.
+"""
+
+import os
+import re
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from cache_backends import CacheBackend, MemoryBackend, RedisBackend, HAS_REDIS, REDIS_URL
+from semantic_cache import canonical_question, question_slots
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '300'))  # Seconds, global answers
+RESPONSE_CACHE_SESSION_TTL = float(os.getenv('RESPONSE_CACHE_SESSION_TTL', '120'))  # Seconds, session answers
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '2048'))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+RESPONSE_CACHE_SWEEP_INTERVAL = float(os.getenv('RESPONSE_CACHE_SWEEP_INTERVAL', '60'))
+# With a shared backend, local copies live at most this long so replicas converge quickly
+RESPONSE_CACHE_L1_TTL = float(os.getenv('RESPONSE_CACHE_L1_TTL', '30'))
+# Request coalescing: how long the first caller holds the lock, and how long others wait for it
+RESPONSE_CACHE_LOCK_TTL = float(os.getenv('RESPONSE_CACHE_LOCK_TTL', '60'))
+RESPONSE_CACHE_WAIT_TIMEOUT = float(os.getenv('RESPONSE_CACHE_WAIT_TIMEOUT', '30'))
+RESPONSE_CACHE_POLL_INTERVAL = float(os.getenv('RESPONSE_CACHE_POLL_INTERVAL', '0.1'))
+
+GLOBAL = 'global'
+SESSION = 'session'
+
+# Where get_or_compute() got a response from
+L1 = 'l1'
+SHARED = 'shared'
+COALESCED = 'coalesced'
+COMPUTED = 'computed'
+
+# Questions about the user or the conversation so far; answers depend on memory
+_PERSONAL = re.compile(
+    r"\b(i|i'm|im|i've|i'd|me|my|mine|myself|we|our|us|remember|earlier|before|previous(ly)?|"
+    r"last time|again|you said|you told)\b"
+)
+
+# Follow-ups whose meaning comes from an earlier turn: "and for 300 level?", "what about the female ones"
+_CONTINUATION = re.compile(r"^(and|or|so|but|then|also|what about|how about|same for|what of)\b")
+_REPLY = re.compile(r"^(yes|yeah|yep|yup|no|nope|ok|okay|sure|thanks|thank you|please|go on|go ahead|continue|"
+                    r"more|why|really|correct|right)$")
+# Pronouns standing in for something named earlier; only decisive in short questions naming no data slot
+_ANAPHORA = re.compile(r"\b(it|its|it's|that|that's|those|these|they|them|their|ones|he|she|him|her|his)\b")
+FOLLOW_UP_MAX_WORDS = 6
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a question"""
+    return ' '.join(prompt.lower().split()).rstrip(' ?!.')
+
+
+def _is_follow_up(normalized: str) -> bool:
+    if _CONTINUATION.match(normalized) or _REPLY.match(normalized):
+        return True
+    return (len(normalized.split()) <= FOLLOW_UP_MAX_WORDS and bool(_ANAPHORA.search(normalized))
+            and not question_slots(canonical_question(normalized)))
+
+
+def classify(prompt: str) -> str:
+    """GLOBAL for self-contained questions about university data, SESSION for questions about the
+    user or conversation and for follow-ups that depend on an earlier turn"""
+    normalized = normalize_prompt(prompt)
+    return SESSION if _PERSONAL.search(normalized) or _is_follow_up(normalized) else GLOBAL
+
+
+def cache_key(prompt: str, session_id: Optional[str] = None, actor_id: Optional[str] = None) -> Optional[Tuple]:
+    """
+    Cache key for a question
+
+    Args:
+        prompt: The user's question
+        session_id: Caller-supplied session ID (None if the caller sent none)
+        actor_id: Caller-supplied actor ID
+
+    Returns:
+        (GLOBAL, digest) or (SESSION, actor_id, session_id, digest), or None if
+        the answer is session-bound and there is no session to bind it to
+    """
+    digest = hashlib.sha256(normalize_prompt(prompt).encode()).hexdigest()
+    if classify(prompt) == GLOBAL:
+        return GLOBAL, digest
+    if not session_id:
+        return None
+    return SESSION, actor_id or 'anonymous', session_id, digest
+
+
+def _session_prefix(actor_id: str, session_id: str) -> str:
+    # Hashed so IDs containing ':' can't collide, and so Redis keys don't expose them
+    owner = hashlib.sha256(f"{actor_id}\0{session_id}".encode()).hexdigest()[:24]
+    return f"response:s:{owner}:"
+
+
+def storage_key(key: Tuple) -> str:
+    """Backend key for a cache_key() tuple"""
+    if key[0] == GLOBAL:
+        return f"response:g:{key[1]}"
+    _, actor_id, session_id, digest = key
+    return _session_prefix(actor_id, session_id) + digest
+
+
+class _Flight:
+    """One in-progress computation that concurrent identical requests wait on"""
+
+    __slots__ = ('done', 'response')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Optional[str] = None
+
+
+class ResponseCache:
+    """
+    Two-tier response cache with request coalescing
+
+    Args:
+        l1: Per-process backend (default: a MemoryBackend with the RESPONSE_CACHE_* bounds)
+        shared: Optional backend shared by all replicas (e.g. RedisBackend)
+        ttl: Seconds a global answer stays valid
+        session_ttl: Seconds a session-bound answer stays valid
+        l1_ttl: Cap on local TTLs when there is a shared backend
+        lock_ttl: Seconds a replica may hold a question's compute lock
+        wait_timeout: Seconds a coalesced request waits before computing itself
+        poll_interval: Seconds between shared-backend checks while waiting
+        enabled: If False, nothing is cached or coalesced
+    """
+
+    def __init__(self, l1: Optional[CacheBackend] = None, shared: Optional[CacheBackend] = None,
+                 ttl: float = RESPONSE_CACHE_TTL, session_ttl: float = RESPONSE_CACHE_SESSION_TTL,
+                 l1_ttl: float = RESPONSE_CACHE_L1_TTL, lock_ttl: float = RESPONSE_CACHE_LOCK_TTL,
+                 wait_timeout: float = RESPONSE_CACHE_WAIT_TIMEOUT,
+                 poll_interval: float = RESPONSE_CACHE_POLL_INTERVAL, enabled: bool = RESPONSE_CACHE_ENABLED):
+        self.l1 = l1 or MemoryBackend(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES,
+                                      RESPONSE_CACHE_SWEEP_INTERVAL)
+        self.shared = shared
+        self.ttl = ttl
+        self.session_ttl = session_ttl
+        self.l1_ttl = l1_ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+
+        self.hits = {GLOBAL: 0, SESSION: 0}
+        self.misses = {GLOBAL: 0, SESSION: 0}
+        self.shared_hits = 0
+        self.coalesced = 0
+
+    def _ttls(self, key: Tuple, ttl: Optional[float]) -> Tuple[float, float]:
+        """(local TTL, shared TTL) for a key"""
+        if ttl is None:
+            ttl = self.session_ttl if key[0] == SESSION else self.ttl
+        return (min(ttl, self.l1_ttl) if self.shared is not None else ttl), ttl
+
+    def _count(self, scope: str, hit: bool, shared: bool = False):
+        with self._lock:
+            (self.hits if hit else self.misses)[scope] += 1
+            self.shared_hits += shared
+
+    def _lookup(self, key: Tuple) -> Tuple[Optional[str], Optional[str]]:
+        skey = storage_key(key)
+        response = self.l1.get(skey)
+        if response is not None:
+            self._count(key[0], hit=True)
+            return response, L1
+        if self.shared is not None:
+            response = self.shared.get(skey)
+            if response is not None:
+                self.l1.set(skey, response, self._ttls(key, None)[0])
+                self._count(key[0], hit=True, shared=True)
+                return response, SHARED
+        self._count(key[0], hit=False)
+        return None, None
+
+    def get(self, key: Tuple) -> Optional[str]:
+        """Cached response for key (local tier first), or None"""
+        if not self.enabled:
+            return None
+        return self._lookup(key)[0]
+
+    def put(self, key: Tuple, response: str, ttl: Optional[float] = None):
+        """Store a response in both tiers"""
+        if not self.enabled or not response:
+            return
+        skey = storage_key(key)
+        local_ttl, shared_ttl = self._ttls(key, ttl)
+        self.l1.set(skey, response, local_ttl)
+        if self.shared is not None:
+            self.shared.set(skey, response, shared_ttl)
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], str]) -> Tuple[str, str]:
+        """
+        Cached response for key, or compute() it once for all concurrent askers
+
+        Args:
+            key: A cache_key() tuple
+            compute: Produces the response on a miss (e.g. runs the agent)
+
+        Returns:
+            (response, source) where source is L1, SHARED, COALESCED or COMPUTED
+        """
+        if not self.enabled:
+            return compute(), COMPUTED
+        response, source = self._lookup(key)
+        if response is not None:
+            return response, source
+
+        skey = storage_key(key)
+        with self._lock:
+            flight = self._flights.get(skey)
+            leader = flight is None
+            if leader:
+                flight = self._flights[skey] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            if flight.done.wait(self.wait_timeout) and flight.response is not None:
+                return flight.response, COALESCED
+            return compute(), COMPUTED  # The first caller failed or is too slow
+
+        try:
+            response, source = self._compute_once(key, skey, compute)
+            flight.response = response
+            return response, source
+        finally:
+            with self._lock:
+                self._flights.pop(skey, None)
+            flight.done.set()
+
+    def _compute_once(self, key: Tuple, skey: str, compute: Callable[[], str]) -> Tuple[str, str]:
+        """Compute under the shared lock, or wait for the replica holding it"""
+        if self.shared is None:
+            response = compute()
+            self.put(key, response)
+            return response, COMPUTED
+
+        lock_key = skey + ':lock'
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+        while not self.shared.add(lock_key, token, self.lock_ttl):
+            # Another replica is answering the same question: use its answer when it lands
+            time.sleep(self.poll_interval)
+            response = self.shared.get(skey)
+            if response is not None:
+                self.l1.set(skey, response, self._ttls(key, None)[0])
+                with self._lock:
+                    self.coalesced += 1
+                return response, COALESCED
+            if time.monotonic() >= deadline:
+                token = None
+                break
+        try:
+            response = compute()
+            self.put(key, response)
+            return response, COMPUTED
+        finally:
+            if token is not None:
+                self.shared.delete_if(lock_key, token)
+
+    def invalidate_session(self, actor_id: str, session_id: str) -> int:
+        """Drop the session-bound answers of one session (e.g. when it ends)"""
+        prefix = _session_prefix(actor_id, session_id)
+        dropped = self.l1.delete_prefix(prefix)
+        if self.shared is not None:
+            dropped += self.shared.delete_prefix(prefix)
+        return dropped
+
+    def invalidate_global(self) -> int:
+        """Drop every global answer (e.g. when the university data changes)"""
+        dropped = self.l1.delete_prefix('response:g:')
+        if self.shared is not None:
+            dropped += self.shared.delete_prefix('response:g:')
+        return dropped
+
+    def sweep(self) -> int:
+        """Drop expired local entries now; returns how many were dropped"""
+        return self.l1.sweep()
+
+    def clear(self):
+        self.l1.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = sum(self.hits.values())
+            lookups = hits + sum(self.misses.values())
+            stats = {
+                'enabled': self.enabled,
+                'hits': hits,
+                'misses': lookups - hits,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+                'hits_by_scope': dict(self.hits),
+                'misses_by_scope': dict(self.misses),
+                'shared_hits': self.shared_hits,
+                'coalesced': self.coalesced,
+            }
+        stats['l1'] = self.l1.stats()
+        if self.shared is not None:
+            stats['shared'] = self.shared.stats()
+        return stats
+
+
+def _shared_backend() -> Optional[CacheBackend]:
+    if not REDIS_URL:
+        return None
+    if not HAS_REDIS:
+        logger.warning("⚠️  RESPONSE_CACHE_REDIS_URL is set but the redis package isn't installed; "
+                       "using the local response cache only")
+        return None
+    logger.info("🔗 Response cache shared through Redis")
+    return RedisBackend()
+
+
+response_cache = ResponseCache(shared=_shared_backend())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: request latency with and without the fast-path intent router
+
+Runs a registration-week question mix against the packaged SQLite database.
+Without the router every question goes to the agent; with it, confident data
+lookups are answered by fast_path and the rest go to the agent. The agent is
+simulated as two sequential Bedrock calls (tool choice, then the answer) with
+log-normal latency around --model-ms, so the numbers show the effect of
+skipping those calls; the fast-path time is measured for real.
+
+Usage:
+    python3 scripts/benchmark_fast_path.py
+    python3 scripts/benchmark_fast_path.py --requests 2000 --model-ms 700
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(HERE))
+
+# Work on a copy so the benchmark never writes to the packaged database
+_workdir = tempfile.mkdtemp(prefix='lautech_fastpath_')
+shutil.copy(HERE / 'lautech_data.db', Path(_workdir) / 'lautech_data.db')
+os.environ['SQLITE_PATH'] = str(Path(_workdir) / 'lautech_data.db')
+logging.disable(logging.INFO)
+
+from fast_path import FastPathRouter  # noqa: E402
+
+# (question, relative frequency)
+QUESTIONS = [
+    ("how much is 100 level school fee", 8),
+    ("200L tuition cost?", 6),
+    ("how much is 300 level fee", 6),
+    ("what is the fee for 400 level", 4),
+    ("500 level fees", 3),
+    ("how much is the hostel fee", 4),
+    ("what is the medical fee", 2),
+    ("when does registration end", 6),
+    ("when does registration start", 4),
+    ("when is the payment deadline", 5),
+    ("when do exams start", 3),
+    ("when does late registration end", 2),
+    ("male hostels", 3),
+    ("female hostels", 3),
+    ("which hostels have a kitchen", 1),
+    ("what is CSC 201", 2),
+    ("how do I apply for a hostel", 3),
+    ("what courses should I take in 200 level", 2),
+    ("list courses in computer science", 2),
+    ("what is the 200 level fee for direct entry students", 1),
+    ("can I pay my school fees in installments", 2),
+    ("explain the add/drop process", 1),
+    ("compare male and female hostels", 1),
+]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(math.ceil(fraction * len(ordered))) - 1)]
+
+
+def simulated_agent(model_ms, rng):
+    """Two sequential model calls (tool choice + answer) with log-normal jitter"""
+    for _ in range(2):
+        time.sleep(rng.lognormvariate(math.log(model_ms / 1000), 0.35))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the fast-path intent router')
+    parser.add_argument('--requests', type=int, default=300, help='Questions to run per mode')
+    parser.add_argument('--model-ms', type=float, default=40,
+                        help='Median simulated Bedrock call latency in ms (real calls are ~500-1500)')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    questions = rng.choices([q for q, _ in QUESTIONS], weights=[w for _, w in QUESTIONS], k=args.requests)
+    router = FastPathRouter(enabled=True)
+
+    results = {}
+    for mode in ('agent only', 'fast path + agent'):
+        latencies = []
+        for question in questions:
+            start = time.perf_counter()
+            answer = router.answer(question)[0] if mode != 'agent only' else None
+            if answer is None:
+                simulated_agent(args.model_ms, rng)
+            latencies.append((time.perf_counter() - start) * 1000)
+        results[mode] = latencies
+
+    stats = router.stats()
+    print(f"{args.requests} questions, simulated model call median {args.model_ms:.0f} ms\n")
+    print(f"{'mode':<20} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    for mode, latencies in results.items():
+        print(f"{mode:<20} {percentile(latencies, 0.5):>9.1f} {percentile(latencies, 0.95):>9.1f} "
+              f"{sum(latencies) / len(latencies):>9.1f}")
+    print(f"\nFast-path hit rate: {stats['hit_rate']:.1%} ({stats['hits']}/{stats['questions']}), "
+          f"avg fast-path answer {stats['avg_answer_ms']} ms")
+    print(f"Hits by intent: {stats['hits_by_intent']}")
+    print(f"Fall-throughs: {stats['fallthroughs']}")
+    shutil.rmtree(_workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
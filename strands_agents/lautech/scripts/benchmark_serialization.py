@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: tool output serialization, dict rows vs column-oriented Table
+
+Compares the old tool path (one dict per row, then json.dumps) with the
+db_results path (header + row tuples, then CSV or JSON/orjson) on the rows of
+the packaged SQLite database. Reports time per call, peak Python allocation
+and output size with an estimated token count (~4 characters per token).
+
+Usage:
+    python3 scripts/benchmark_serialization.py
+    python3 scripts/benchmark_serialization.py --scale 50 --repeat 2000
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db_results import HAS_ORJSON, Table, format_rows  # noqa: E402
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / 'lautech_data.db'
+
+# Same columns the get_* helpers return
+QUERIES = {
+    'courses': "SELECT code, name, credits, department FROM courses ORDER BY code",
+    'fees': "SELECT level, amount, fee_type FROM fees ORDER BY id",
+    'calendar': "SELECT event_type, event_date, description FROM academic_calendar ORDER BY event_date",
+    'hostels': "SELECT name, gender, capacity, status, facilities FROM hostels ORDER BY name",
+}
+
+
+def old_path(conn, sql):
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    rows = [dict(row) for row in cursor.execute(sql).fetchall()]
+    return json.dumps(rows, separators=(',', ':'))
+
+
+def new_path(conn, sql, output_format):
+    cursor = conn.cursor()
+    cursor.execute(sql)
+    return format_rows(Table.from_cursor(cursor, cursor.fetchall()), output_format)
+
+
+def measure(fn, repeat):
+    fn()  # Warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        output = fn()
+    elapsed_us = (time.perf_counter() - start) / repeat * 1e6
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_us, peak, output
+
+
+def scaled_database(path, scale):
+    """In-memory copy of the database with every table repeated `scale` times"""
+    conn = sqlite3.connect(':memory:')
+    sqlite3.connect(path).backup(conn)
+    for table in ('courses', 'fees', 'academic_calendar', 'hostels'):
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[1] != 'id']
+        column_list = ', '.join(columns)
+        rows = conn.execute(f"SELECT {column_list} FROM {table}").fetchall()
+        for i in range(1, scale):
+            if table == 'courses':  # code is unique
+                rows_i = [(f"{row[0]}-{i}",) + tuple(row[1:]) for row in rows]
+            else:
+                rows_i = rows
+            placeholders = ', '.join('?' * len(columns))
+            conn.executemany(f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})", rows_i)
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark tool output serialization')
+    parser.add_argument('--db', default=str(DEFAULT_DB), help='SQLite database (default: packaged lautech_data.db)')
+    parser.add_argument('--scale', type=int, default=1, help='Repeat each table this many times')
+    parser.add_argument('--repeat', type=int, default=1000, help='Calls per measurement')
+    args = parser.parse_args()
+
+    conn = scaled_database(args.db, max(1, args.scale))
+    paths = [
+        ('dict + json.dumps', lambda sql: old_path(conn, sql)),
+        ('table + csv', lambda sql: new_path(conn, sql, 'csv')),
+        (f"table + json ({'orjson' if HAS_ORJSON else 'json'})", lambda sql: new_path(conn, sql, 'json')),
+    ]
+
+    print(f"Scale x{args.scale}, {args.repeat} calls per measurement, orjson {'installed' if HAS_ORJSON else 'not installed'}\n")
+    print(f"{'table':<10} {'rows':>6}  {'path':<22} {'us/call':>9} {'peak KiB':>9} {'chars':>8} {'~tokens':>8}")
+    for table, sql in QUERIES.items():
+        rows = conn.execute(f"SELECT COUNT(*) FROM ({sql})").fetchone()[0]
+        baseline = None
+        for label, run in paths:
+            elapsed_us, peak, output = measure(lambda: run(sql), args.repeat)
+            tokens = len(output) // 4
+            baseline = baseline or (elapsed_us, tokens)
+            print(f"{table:<10} {rows:>6}  {label:<22} {elapsed_us:>9.1f} {peak / 1024:>9.1f} {len(output):>8} {tokens:>8}"
+                  f"  ({elapsed_us / baseline[0]:.2f}x time, {tokens / max(baseline[1], 1):.2f}x tokens)")
+        print()
+
+
+if __name__ == '__main__':
+    main()
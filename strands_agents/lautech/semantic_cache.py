@@ -0,0 +1,525 @@
+"""
+Semantic (paraphrase-tolerant) answer cache for the lautech_assistant entrypoint
+
+The exact response cache (response_cache.py) only matches questions that
+normalize to the same text, so "how much is 200 level school fee" and
+"200L tuition cost?" are two misses. This cache embeds a canonical form of
+each global question and serves the answer of the closest cached question
+when their cosine similarity reaches a threshold.
+
+- Embedders are pluggable: TitanEmbedder (Bedrock, production), MiniLMEmbedder
+  (sentence-transformers, optional) and HashingEmbedder (no dependencies, for
+  offline tests and deployments without Bedrock). If the embedder fails, the
+  cache is bypassed for a while rather than switching embedders
+- Questions are only compared with questions that name the same slots: level,
+  course code, gender, semester, year, start/end and event qualifiers such as
+  late/regular. "200 level fees" never answers "300 level fees", and
+  "registration deadline" never answers "late registration deadline", however
+  close their vectors are
+- The index is in memory, bounded by entries and TTL, and is cleared whenever
+  the database data version changes (observe_version())
+"""
+
+import os
+import re
+import json
+import math
+import time
+import zlib
+import operator
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Cache configuration
+SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'true').lower() == 'true'
+SEMANTIC_CACHE_EMBEDDER = os.getenv('SEMANTIC_CACHE_EMBEDDER', 'titan')  # titan, minilm or hashing
+SEMANTIC_CACHE_THRESHOLD = os.getenv('SEMANTIC_CACHE_THRESHOLD', '')  # Cosine similarity; default depends on embedder
+SEMANTIC_CACHE_TTL = float(os.getenv('SEMANTIC_CACHE_TTL', '900'))  # Seconds
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', '4096'))
+TITAN_EMBED_MODEL = os.getenv('SEMANTIC_CACHE_TITAN_MODEL', 'amazon.titan-embed-text-v2:0')
+TITAN_EMBED_DIMENSIONS = int(os.getenv('SEMANTIC_CACHE_TITAN_DIMENSIONS', '512'))  # 256, 512 or 1024
+EMBED_RETRY_AFTER = float(os.getenv('SEMANTIC_CACHE_EMBED_RETRY_AFTER', '60'))  # Seconds to skip a failing embedder
+MINILM_MODEL = os.getenv('SEMANTIC_CACHE_MINILM_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+
+
+# ============================================================================
+# QUESTION NORMALIZATION
+# ============================================================================
+
+# Domain synonyms, applied in order to the lower-cased question
+_SYNONYMS = [
+    (re.compile(r"\b([1-5]00)\s*(?:l|lv|lvl|level)\b"), r"\1 level"),
+    (re.compile(r"\blevel\s*([1-5]00)\b"), r"\1 level"),
+    (re.compile(r"\b(year|yr)\s*([1-5])\b"), lambda m: f"{m.group(2)}00 level"),
+    (re.compile(r"\b(?:(?:first|1st|fresh(?:er|man)?)\s+(?:year|yr)|fresh(?:ers|men|man)|jamb)\b"), "100 level"),
+    (re.compile(r"\b([a-z]{3})\s+(\d{3})\b(?! level)"), r"\1\2"),  # Course codes: "CSC 201" -> "csc201"
+    (re.compile(r"\b(school fees?|tuition(?: fees?)?|fees?|charges?|cost|costs|price|pay|payment)\b"), "fee"),
+    (re.compile(r"\bhow much\b"), "fee"),
+    (re.compile(r"\b(accommodation|lodging|halls? of residence|halls?|hostels)\b"), "hostel"),
+    (re.compile(r"\b(exams?|examinations?)\b"), "exam"),
+    (re.compile(r"\b(lecturers?|staff)\b"), "lecturer"),
+    (re.compile(r"\b(subjects?|modules?|courses)\b"), "course"),
+    (re.compile(r"\b(dates?|when|deadlines?|schedule|timetable)\b"), "date"),
+    (re.compile(r"\b(begins?|starts?|starting|commences?|resum(?:e|es|ption))\b"), "start"),
+    (re.compile(r"\b(ends?|ending|closes?|closing|finish(?:es)?|over)\b"), "end"),
+    (re.compile(r"\b(1st|first)\s+semester\b"), "first semester"),
+    (re.compile(r"\b(2nd|second)\s+semester\b"), "second semester"),
+    (re.compile(r"\bharmattan(?: semester)?\b"), "first semester"),
+    (re.compile(r"\brain(?: semester)?\b"), "second semester"),
+    (re.compile(r"\b(boys?|men|males?)\b"), "male"),
+    (re.compile(r"\b(girls?|women|ladies|females?)\b"), "female"),
+    (re.compile(r"\b(co-?ed|coeducational|unisex)\b"), "mixed"),
+]
+
+_STOPWORDS = frozenset(
+    "a an the is are was were be do does did what whats what's which who please pls kindly tell "
+    "can could would will you your u us about for of to in on at and or it its this that these those "
+    "there any some much many give show list get find know need want i'd like info information "
+    "available offered have has with "
+    "lautech university".split()
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Slots: facts a question must share with a cached one for its answer to apply
+_SLOT_PATTERNS = [
+    ('level', re.compile(r"\b([1-5]00) level\b")),
+    ('course', re.compile(r"\b([a-z]{3}\d{3})\b")),
+    ('semester', re.compile(r"\b(first|second) semester\b")),
+    ('gender', re.compile(r"\b(male|female|mixed)\b")),
+    ('year', re.compile(r"\b((?:19|20)\d\d)\b")),
+    ('bound', re.compile(r"\b(start|end)\b")),
+    ('qualifier', re.compile(r"\b(late|regular|mid|final)\b")),  # "late registration" is another event
+]
+
+
+def canonical_question(question: str) -> str:
+    """Lower-cased question with domain synonyms unified and filler words removed"""
+    text = ' '.join(question.lower().split())
+    for pattern, replacement in _SYNONYMS:
+        text = pattern.sub(replacement, text)
+    tokens = [token for token in _TOKEN.findall(text) if token not in _STOPWORDS]
+    return ' '.join(dict.fromkeys(tokens))  # "how much is the school fee" names the fee once
+
+
+def question_slots(canonical: str) -> FrozenSet[Tuple[str, str]]:
+    """The (slot, value) pairs named in a canonical question"""
+    slots = set()
+    for slot, pattern in _SLOT_PATTERNS:
+        for match in pattern.finditer(canonical):
+            slots.add((slot, ''.join(match.groups())))
+    return frozenset(slots)
+
+
+# ============================================================================
+# EMBEDDERS
+# ============================================================================
+
+# Dot product of two vectors: math.sumprod runs in C on Python 3.12+ (the AgentCore runtime)
+_dot = getattr(math, 'sumprod', None) or (lambda a, b: sum(map(operator.mul, a, b)))
+
+
+def _normalized(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else vector
+
+
+class Embedder(ABC):
+    """Turns a canonical question into an L2-normalized vector"""
+
+    name = 'embedder'
+    dimensions = 0
+    default_threshold = 0.9
+
+    @abstractmethod
+    def embed(self, text: str) -> List[float]:
+        ...
+
+
+class HashingEmbedder(Embedder):
+    """
+    Signed feature hashing of words, adjacent word pairs and character trigrams
+
+    Needs no model or network, so offline tests and deployments without
+    Bedrock still get a (less paraphrase-tolerant) semantic cache.
+    """
+
+    name = 'hashing'
+    default_threshold = 0.8
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        words = text.split()
+        features = [(f"w:{word}", 1.0) for word in words]
+        features += [(f"b:{min(a, b)} {max(a, b)}", 1.0) for a, b in zip(words, words[1:])]  # Order-insensitive pairs
+        for word in words:
+            padded = f" {word} "
+            features += [(f"c:{padded[i:i + 3]}", 0.25) for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode())
+            vector[h % self.dimensions] += weight if h & 0x80000000 else -weight
+        return _normalized(vector)
+
+
+class TitanEmbedder(Embedder):
+    """
+    Amazon Titan Text Embeddings through Bedrock
+
+    Args:
+        model_id: Bedrock model ID
+        dimensions: Output size (Titan v2 supports 256, 512 and 1024)
+        client: A bedrock-runtime client (default: one created on first use)
+    """
+
+    name = 'titan'
+    default_threshold = 0.86
+
+    def __init__(self, model_id: str = TITAN_EMBED_MODEL, dimensions: int = TITAN_EMBED_DIMENSIONS, client=None):
+        self.model_id = model_id
+        self.dimensions = dimensions
+        self._client = client
+        self._client_lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import boto3
+                    self._client = boto3.session.Session().client(
+                        service_name='bedrock-runtime',
+                        region_name=os.getenv('AWS_REGION', 'us-east-1')
+                    )
+        return self._client
+
+    def embed(self, text: str) -> List[float]:
+        response = self._get_client().invoke_model(
+            modelId=self.model_id,
+            contentType='application/json',
+            accept='application/json',
+            body=json.dumps({'inputText': text, 'dimensions': self.dimensions, 'normalize': True}),
+        )
+        return json.loads(response['body'].read())['embedding']
+
+
+class MiniLMEmbedder(Embedder):
+    """Local sentence-transformers model (pip install sentence-transformers); loaded on first use"""
+
+    name = 'minilm'
+    dimensions = 384
+    default_threshold = 0.85
+
+    def __init__(self, model_name: str = MINILM_MODEL):
+        self.model_name = model_name
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def embed(self, text: str) -> List[float]:
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+        return [float(x) for x in self._model.encode(text, normalize_embeddings=True)]
+
+
+EMBEDDERS = {
+    'titan': TitanEmbedder,
+    'minilm': MiniLMEmbedder,
+    'hashing': HashingEmbedder,
+}
+
+
+# ============================================================================
+# VECTOR INDEX
+# ============================================================================
+
+class _Entry:
+    __slots__ = ('question', 'answer', 'vector', 'slots', 'expires_at')
+
+    def __init__(self, question: str, answer: str, vector: List[float], slots: FrozenSet, expires_at: float):
+        self.question = question
+        self.answer = answer
+        self.vector = vector
+        self.slots = slots
+        self.expires_at = expires_at
+
+
+class VectorIndex:
+    """
+    Thread-safe in-memory nearest-neighbour index of cached answers
+
+    Entries are grouped by slot set, so a search only scans questions naming
+    the same slots. Scans are exact (brute-force cosine over normalized
+    vectors), vectorized with numpy when it is installed.
+
+    Args:
+        max_entries: Maximum number of entries (least recently used are evicted)
+        ttl: Seconds an entry stays valid
+    """
+
+    def __init__(self, max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES, ttl: float = SEMANTIC_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._groups: Dict[FrozenSet, Dict[int, _Entry]] = {}
+        self._matrices: Dict[FrozenSet, Tuple[List[int], object]] = {}  # numpy matrix per group, built on demand
+        self._next_id = 0
+
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, entry_id: int):
+        # Caller holds self._lock
+        entry = self._entries.pop(entry_id)
+        group = self._groups[entry.slots]
+        del group[entry_id]
+        if not group:
+            del self._groups[entry.slots]
+        self._matrices.pop(entry.slots, None)
+
+    def add(self, question: str, answer: str, vector: List[float], slots: FrozenSet):
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            entry = _Entry(question, answer, vector, slots, time.monotonic() + self.ttl)
+            self._entries[entry_id] = entry
+            self._groups.setdefault(slots, {})[entry_id] = entry
+            self._matrices.pop(slots, None)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _scores(self, slots: FrozenSet, group: Dict[int, _Entry], vector: List[float]) -> List[Tuple[float, int]]:
+        # Caller holds self._lock
+        if HAS_NUMPY and len(group) > 1:
+            cached = self._matrices.get(slots)
+            if cached is None:
+                ids = list(group)
+                cached = self._matrices[slots] = (ids, np.array([group[i].vector for i in ids], dtype=np.float32))
+            ids, matrix = cached
+            scores = matrix @ np.asarray(vector, dtype=np.float32)
+            best = int(scores.argmax())
+            return [(float(scores[best]), ids[best])]
+        return [(_dot(entry.vector, vector), entry_id) for entry_id, entry in group.items()]
+
+    def search(self, vector: List[float], slots: FrozenSet, threshold: float) -> Optional[Tuple[_Entry, float]]:
+        """Closest live entry with the same slots and similarity >= threshold, or None"""
+        now = time.monotonic()
+        with self._lock:
+            group = self._groups.get(slots)
+            if not group:
+                return None
+            expired = [entry_id for entry_id, entry in group.items() if entry.expires_at <= now]
+            for entry_id in expired:
+                self._remove(entry_id)
+            self.expirations += len(expired)
+            group = self._groups.get(slots)
+            if not group:
+                return None
+            similarity, entry_id = max(self._scores(slots, group, vector))
+            if similarity < threshold:
+                return None
+            self._entries.move_to_end(entry_id)
+            return self._entries[entry_id], similarity
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self._matrices.clear()
+
+
+# ============================================================================
+# SEMANTIC CACHE
+# ============================================================================
+
+class SemanticCache:
+    """
+    Answers close paraphrases of already-answered questions from memory
+
+    Args:
+        embedder: Embedder for canonical questions (default: SEMANTIC_CACHE_EMBEDDER)
+        threshold: Minimum cosine similarity for a hit (default: the embedder's)
+        index: Vector index (default: a VectorIndex with the SEMANTIC_CACHE_* bounds)
+        retry_after: Seconds to bypass the cache after the embedder fails
+        enabled: If False, get_or_compute() always computes
+    """
+
+    def __init__(self, embedder: Optional[Embedder] = None, threshold: Optional[float] = None,
+                 index: Optional[VectorIndex] = None, retry_after: float = EMBED_RETRY_AFTER,
+                 enabled: bool = SEMANTIC_CACHE_ENABLED):
+        self.embedder = embedder or _default_embedder()
+        self.threshold = threshold if threshold is not None else self.embedder.default_threshold
+        self.index = index or VectorIndex()
+        self.retry_after = retry_after
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._version = None
+        self._embedder_down_until = float('-inf')
+
+        self.hits = 0
+        self.misses = 0
+        self.embed_errors = 0
+        self.invalidations = 0
+        self.embed_ms = 0.0
+        self.embeds = 0
+
+    @property
+    def version(self):
+        return self._version
+
+    def observe_version(self, version) -> bool:
+        """Record the current data version; drops every cached answer and returns True if it changed"""
+        with self._lock:
+            if version == self._version:
+                return False
+            changed = self._version is not None
+            self._version = version
+        if changed:
+            self.index.clear()
+            with self._lock:
+                self.invalidations += 1
+            logger.info(f"🔄 Data version changed ({version}), clearing semantic answer cache")
+        return changed
+
+    def _embed(self, canonical: str) -> Optional[List[float]]:
+        if time.monotonic() < self._embedder_down_until:
+            return None
+        start = time.perf_counter()
+        try:
+            vector = self.embedder.embed(canonical)
+        except Exception as e:
+            with self._lock:
+                self.embed_errors += 1
+                self._embedder_down_until = time.monotonic() + self.retry_after
+            logger.warning(f"⚠️  {self.embedder.name} embedding failed, skipping the semantic cache "
+                           f"for {self.retry_after:.0f}s: {e}")
+            return None
+        with self._lock:
+            self.embeds += 1
+            self.embed_ms += (time.perf_counter() - start) * 1000
+        return vector
+
+    def _search(self, question: str):
+        """(vector, slots, match) for a question; vector is None if it couldn't be embedded"""
+        canonical = canonical_question(question)
+        vector = self._embed(canonical) if canonical else None
+        if vector is None:
+            return None, None, None
+        slots = question_slots(canonical)
+        match = self.index.search(vector, slots, self.threshold)
+        with self._lock:
+            if match:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return vector, slots, match
+
+    def lookup(self, question: str) -> Optional[Tuple[str, str, float]]:
+        """(answer, cached question, similarity) for the closest cached paraphrase, or None"""
+        if not self.enabled:
+            return None
+        match = self._search(question)[2]
+        if match is None:
+            return None
+        entry, similarity = match
+        return entry.answer, entry.question, similarity
+
+    def get_or_compute(self, question: str, compute: Callable[[], str]) -> Tuple[str, Optional[Tuple[str, float]]]:
+        """
+        Cached answer to a paraphrase of question, or compute() and cache it
+
+        Args:
+            question: The user's question (global scope only; see response_cache.classify)
+            compute: Produces the answer on a miss (e.g. runs the agent)
+
+        Returns:
+            (answer, match) where match is (cached question, similarity) on a hit and None otherwise
+        """
+        if not self.enabled:
+            return compute(), None
+        vector, slots, match = self._search(question)
+        if match is not None:
+            entry, similarity = match
+            return entry.answer, (entry.question, similarity)
+
+        version = self._version
+        answer = compute()
+        # Don't file an answer computed against data that changed while it ran
+        if vector is not None and answer and version == self._version:
+            self.index.add(question, answer, vector, slots)
+        return answer, None
+
+    def add(self, question: str, answer: str, version) -> bool:
+        """
+        Cache an answer computed outside get_or_compute() (e.g. a streamed one)
+
+        Args:
+            question: The user's question
+            answer: Its answer
+            version: The data version (self.version) when the answer was started; a stale answer is not cached
+        """
+        if not self.enabled or not answer or version != self._version:
+            return False
+        canonical = canonical_question(question)
+        vector = self._embed(canonical) if canonical else None
+        if vector is None:
+            return False
+        self.index.add(question, answer, vector, question_slots(canonical))
+        return True
+
+    def clear(self):
+        self.index.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'embedder': self.embedder.name,
+                'threshold': self.threshold,
+                'entries': len(self.index),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'embed_errors': self.embed_errors,
+                'avg_embed_ms': round(self.embed_ms / self.embeds, 2) if self.embeds else 0.0,
+                'invalidations': self.invalidations,
+                'evictions': self.index.evictions,
+                'expirations': self.index.expirations,
+                'data_version': self._version,
+            }
+
+
+def _default_embedder() -> Embedder:
+    factory = EMBEDDERS.get(SEMANTIC_CACHE_EMBEDDER)
+    if factory is None:
+        logger.warning(f"⚠️  Unknown SEMANTIC_CACHE_EMBEDDER '{SEMANTIC_CACHE_EMBEDDER}', using hashing")
+        factory = HashingEmbedder
+    return factory()
+
+
+semantic_cache = SemanticCache(threshold=float(SEMANTIC_CACHE_THRESHOLD) if SEMANTIC_CACHE_THRESHOLD else None)
@@ -3,6 +3,7 @@ Migrate data from SQLite to RDS PostgreSQL
 Transfers all data from the local SQLite database to the production RDS instance
 """
 
+import sys
 import sqlite3
 import boto3
 import json
@@ -10,6 +11,17 @@ import psycopg2
 import psycopg2.extras
 from pathlib import Path
 
+# Shared schema helpers live in the lautech directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from db_schema import (  # noqa: E402
+    migrate,
+    bump_data_version,
+    refresh_calendar_views,
+    refresh_hostel_facilities,
+    MIGRATIONS,
+    LATEST_SCHEMA_VERSION,
+)
+
 # Configuration
 SQLITE_PATH = Path("lautech_data.db")
 SECRET_NAME = "lautech/rds/credentials"
@@ -61,66 +73,14 @@ def get_sqlite_data():
 
 
 def create_postgres_schema(pg_conn):
-    """Create PostgreSQL schema"""
+    """Create the PostgreSQL schema by applying pending migrations (see db_schema.MIGRATIONS)"""
     print("\n🏗️  Creating PostgreSQL schema...")
 
-    cursor = pg_conn.cursor()
-
-    # Create courses table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS courses (
-            code TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            credits INTEGER,
-            prerequisites TEXT,
-            description TEXT,
-            semester TEXT,
-            lecturer TEXT,
-            department TEXT
-        )
-    """)
-    print("   ✓ Created courses table")
-
-    # Create fees table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS fees (
-            id SERIAL PRIMARY KEY,
-            level TEXT NOT NULL,
-            amount INTEGER NOT NULL,
-            fee_type TEXT,
-            session TEXT
-        )
-    """)
-    print("   ✓ Created fees table")
-
-    # Create calendar table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS academic_calendar (
-            id SERIAL PRIMARY KEY,
-            event_type TEXT NOT NULL,
-            event_date TEXT NOT NULL,
-            semester TEXT,
-            session TEXT,
-            description TEXT
-        )
-    """)
-    print("   ✓ Created academic_calendar table")
-
-    # Create hostels table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS hostels (
-            id SERIAL PRIMARY KEY,
-            name TEXT NOT NULL,
-            gender TEXT,
-            capacity INTEGER,
-            status TEXT,
-            facilities TEXT
-        )
-    """)
-    print("   ✓ Created hostels table")
-
-    pg_conn.commit()
-    cursor.close()
+    applied = migrate(pg_conn, 'postgres')
+    for version, description, _ in MIGRATIONS:
+        if version in applied:
+            print(f"   ✓ {version}: {description}")
+    print(f"   ✓ Schema at version {LATEST_SCHEMA_VERSION}")
 
 
 def clear_postgres_data(pg_conn):
@@ -202,6 +162,15 @@ def migrate_data(data, pg_conn):
             hostel['status'], hostel['facilities']
         ))
     print(f"      ✓ Migrated {len(data['hostels'])} hostels")
+    refresh_hostel_facilities(cursor, 'postgres')
+    print("      ✓ Indexed hostel facilities")
+
+    refresh_calendar_views(cursor, 'postgres')
+    print("      ✓ Rebuilt calendar windows and next deadlines")
+
+    # Running agents drop their cached query results when they see the new version
+    version = bump_data_version(cursor)
+    print(f"\n   ✓ Data version is now {version}")
 
     pg_conn.commit()
     cursor.close()
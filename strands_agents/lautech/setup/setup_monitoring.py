@@ -10,6 +10,7 @@ REGION = 'us-east-1'
 AGENT_NAME = 'lautech_agentcore'
 DB_IDENTIFIER = 'lautech-agentcore-db'
 DASHBOARD_NAME = 'LAUTECH-Production-Dashboard'
+DB_METRICS_NAMESPACE = 'LAUTECH/Database'  # EMF metrics written by db_metrics.py (DB_METRICS_EMF=true)
 
 def create_dashboard():
     """Create a CloudWatch Dashboard for the IT team"""
@@ -69,6 +70,36 @@ def create_dashboard():
                     "region": REGION,
                     "title": "Active DB Connections"
                 }
+            },
+            {
+                "type": "metric",
+                "x": 0, "y": 12, "width": 12, "height": 6,
+                "properties": {
+                    "metrics": [
+                        [{"expression": f"SEARCH('{{{DB_METRICS_NAMESPACE},QueryName}} MetricName=\"QueryLatency\"', 'p95', 300)",
+                          "id": "latency", "label": ""}]
+                    ],
+                    "view": "timeSeries",
+                    "stacked": False,
+                    "region": REGION,
+                    "title": "DB Query Latency p95 by Query (ms)"
+                }
+            },
+            {
+                "type": "metric",
+                "x": 12, "y": 12, "width": 12, "height": 6,
+                "properties": {
+                    "metrics": [
+                        [{"expression": f"SEARCH('{{{DB_METRICS_NAMESPACE},QueryName}} MetricName=\"QueryCount\"', 'Sum', 300)",
+                          "id": "queries", "label": ""}],
+                        [{"expression": f"SEARCH('{{{DB_METRICS_NAMESPACE},QueryName}} MetricName=\"SlowQueries\"', 'Sum', 300)",
+                          "id": "slow", "label": "slow"}]
+                    ],
+                    "view": "timeSeries",
+                    "stacked": False,
+                    "region": REGION,
+                    "title": "DB Queries and Slow Queries by Query"
+                }
             }
         ]
     }
@@ -0,0 +1,225 @@
+"""
+Cold-start profiling and lazy initialization for lautech_agentcore
+
+A new AgentCore container accepts requests once lautech_agentcore has been
+imported, so everything done at import time is time-to-ready. This module
+keeps that short and shows where it goes:
+
+- LazyResource wraps expensive set-up (database init, the Bedrock model, the
+  AgentCore Memory integration) behind a thread-safe get(); prewarm() builds
+  them on a background thread once the module has loaded and the server is
+  answering health checks, and a request that arrives first simply waits for
+  the resource it needs.
+- With STARTUP_PROFILE=true, every module imported after this one is timed
+  (self and cumulative, like ``python -X importtime``) along with each named
+  init stage and resource, and a report is logged when the app is ready and
+  again when prewarming finishes.
+
+Import this module before any other so the import timings cover them. It only
+uses the standard library.
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Startup configuration
+STARTUP_PROFILE = os.getenv('STARTUP_PROFILE', 'false').lower() == 'true'
+STARTUP_PROFILE_TOP = int(os.getenv('STARTUP_PROFILE_TOP', '25'))  # Slowest imports in the report
+PREWARM = os.getenv('PREWARM', 'true').lower() == 'true'
+
+
+class _TimedLoader:
+    """Loader wrapper timing exec_module; everything else goes to the real loader"""
+
+    def __init__(self, loader, profile: 'StartupProfile'):
+        self._loader = loader
+        self._profile = profile
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self._profile._timing_import(module.__name__):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _ProfilingFinder:
+    """Meta path finder that finds specs with the other finders and times their loaders"""
+
+    def __init__(self, profile: 'StartupProfile'):
+        self._profile = profile
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, self._profile)
+            return spec
+        return None
+
+
+class StartupProfile:
+    """
+    Import and init-stage timings of one process start
+
+    Args:
+        enabled: If False, install() is a no-op and stages are only logged at debug level
+    """
+
+    def __init__(self, enabled: bool = STARTUP_PROFILE):
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.ready_ms: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._finder: Optional[_ProfilingFinder] = None
+        self._imports: Dict[str, List[float]] = {}  # name -> [self_ms, cumulative_ms]
+        self._stages: List[Dict[str, Any]] = []
+
+    def install(self):
+        """Start timing imports (modules already imported are not counted)"""
+        if self.enabled and self._finder is None:
+            self._finder = _ProfilingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    @contextmanager
+    def _timing_import(self, name: str) -> Iterator[None]:
+        stack = self._local.__dict__.setdefault('stack', [])
+        frame = [name, time.perf_counter(), 0.0]  # name, start, time spent in nested imports
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            cumulative = (time.perf_counter() - frame[1]) * 1000
+            if stack:
+                stack[-1][2] += cumulative
+            with self._lock:
+                self._imports[name] = [cumulative - frame[2], cumulative]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time one init step (e.g. 'database', 'bedrock_model')"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._stages.append({
+                    'stage': name,
+                    'ms': round(duration_ms, 1),
+                    'thread': threading.current_thread().name,
+                })
+            logger.debug(f"⏱️  Startup stage {name}: {duration_ms:.0f} ms")
+
+    def mark_ready(self):
+        """Record time-to-ready (module loaded, requests accepted) and log the report if profiling"""
+        self.ready_ms = (time.perf_counter() - self.started_at) * 1000
+        logger.info(f"🚀 Ready to accept requests {self.ready_ms:.0f} ms after startup began")
+        if self.enabled:
+            self.log_report()
+
+    def report(self, top: int = STARTUP_PROFILE_TOP) -> Dict:
+        with self._lock:
+            imports = sorted(self._imports.items(), key=lambda item: item[1][1], reverse=True)
+            stages = list(self._stages)
+        # Self times add up to the total without counting nested imports twice
+        import_ms = sum(self_ms for _, (self_ms, _) in imports)
+        return {
+            'ready_ms': round(self.ready_ms, 1) if self.ready_ms is not None else None,
+            'import_ms': round(import_ms, 1),
+            'modules_imported': len(imports),
+            'slowest_imports': [
+                {'module': name, 'self_ms': round(self_ms, 1), 'cumulative_ms': round(cumulative_ms, 1)}
+                for name, (self_ms, cumulative_ms) in imports[:top]
+            ],
+            'stages': stages,
+        }
+
+    def log_report(self, top: int = STARTUP_PROFILE_TOP):
+        data = self.report(top)
+        lines = [f"📊 Startup profile: ready {data['ready_ms']} ms, "
+                 f"{data['modules_imported']} modules imported in {data['import_ms']} ms"]
+        lines.append(f"   {'self ms':>9} | {'cumulative':>10} | module")
+        for item in data['slowest_imports']:
+            lines.append(f"   {item['self_ms']:>9.1f} | {item['cumulative_ms']:>10.1f} | {item['module']}")
+        for item in data['stages']:
+            lines.append(f"   stage {item['stage']}: {item['ms']} ms ({item['thread']})")
+        logger.info('\n'.join(lines))
+
+
+startup_profile = StartupProfile()
+startup_profile.install()
+
+
+class LazyResource:
+    """
+    Value built on first use, once, even when several threads ask at the same time
+
+    A factory that raises leaves the resource unbuilt, so the next get() retries.
+
+    Args:
+        name: Stage name in the startup profile
+        factory: Builds the value
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value = None
+        self._ready = False
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self) -> Any:
+        if self._ready:
+            return self._value
+        with self._lock:
+            if not self._ready:
+                with startup_profile.stage(self.name):
+                    self._value = self._factory()
+                self._ready = True
+        return self._value
+
+
+def prewarm(*resources: LazyResource) -> threading.Thread:
+    """Build resources in order on a daemon thread; failures are logged and retried on first use"""
+    def run():
+        start = time.perf_counter()
+        for resource in resources:
+            try:
+                resource.get()
+            except Exception as e:
+                logger.warning(f"⚠️  Prewarming {resource.name} failed, it will be retried on first use: {e}")
+        logger.info(f"🔥 Prewarmed {', '.join(r.name for r in resources)} in "
+                    f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        if startup_profile.enabled:
+            startup_profile.log_report()
+
+    thread = threading.Thread(target=run, name='prewarm', daemon=True)
+    thread.start()
+    return thread
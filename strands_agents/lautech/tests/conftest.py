@@ -0,0 +1,24 @@
+"""
+Shared test setup: import the lautech modules from the parent directory and
+point them at a throwaway copy of the packaged database.
+
+Run from strands_agents/lautech:
+    pip install -r requirements-dev.txt
+    python -m pytest tests
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+
+LAUTECH_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(LAUTECH_DIR))
+
+# Before any lautech module reads its configuration
+_workdir = tempfile.mkdtemp(prefix='lautech_tests_')
+shutil.copy(LAUTECH_DIR / 'lautech_data.db', Path(_workdir) / 'lautech_data.db')
+os.environ['SQLITE_PATH'] = str(Path(_workdir) / 'lautech_data.db')
+os.environ['SQLITE_READ_ONLY'] = 'false'
+os.environ['USE_POSTGRES'] = 'false'
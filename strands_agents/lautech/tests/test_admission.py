@@ -0,0 +1,100 @@
+"""Admission control: bounded concurrency, queue limits, deadlines and slots held by running threads"""
+
+import asyncio
+import threading
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected, DEADLINE, QUEUE_FULL
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_queue_full_and_deadline_rejections():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, deadline=0.05)
+    gate = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(controller.call(gate.wait, 5))
+        await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(controller.call(lambda: 'late'))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.call(lambda: 'rejected')
+        assert full.value.reason == QUEUE_FULL
+        with pytest.raises(AdmissionRejected) as expired:
+            await queued
+        assert expired.value.reason == DEADLINE
+        gate.set()
+        assert (await running)[0] is True
+
+    run(scenario())
+    stats = controller.stats()
+    assert stats['rejected_queue_full'] == 1
+    assert stats['rejected_deadline'] == 1
+    assert stats['active'] == 0
+
+
+def test_cancelled_caller_keeps_slot_until_thread_finishes():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, deadline=0.05)
+    gate = threading.Event()
+
+    async def scenario():
+        task = asyncio.ensure_future(controller.call(gate.wait, 5))
+        await asyncio.sleep(0.01)
+        task.cancel()  # Client disconnected; the worker thread is still running
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert controller.active == 1
+        with pytest.raises(AdmissionRejected):
+            await controller.call(lambda: 'second')
+        gate.set()
+        await asyncio.sleep(0.05)
+        assert controller.active == 0
+        assert (await controller.call(lambda: 'third'))[0] == 'third'
+
+    run(scenario())
+
+
+def test_runs_on_dedicated_executor_sized_to_slots():
+    controller = AdmissionController(max_concurrent=3, max_queue=10, deadline=5)
+    names = []
+
+    def work():
+        names.append(threading.current_thread().name)
+        return len(names)
+
+    async def scenario():
+        await asyncio.gather(*[controller.call(work) for _ in range(9)])
+
+    run(scenario())
+    assert all(name.startswith('admitted') for name in names)
+    assert controller._executor._max_workers == 3
+
+
+def test_failure_releases_slot():
+    controller = AdmissionController(max_concurrent=1, max_queue=0, deadline=0.05)
+
+    def fail():
+        raise ValueError("boom")
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await controller.call(fail)
+        assert (await controller.call(lambda: 'ok'))[0] == 'ok'
+
+    run(scenario())
+
+
+def test_keep_slot_leaves_release_to_caller():
+    controller = AdmissionController(max_concurrent=1, max_queue=0, deadline=0.05)
+
+    async def scenario():
+        result, _ = await controller.call(lambda: 'stream', keep_slot=lambda result: result == 'stream')
+        assert controller.active == 1
+        controller.release()
+        assert controller.active == 0
+
+    run(scenario())
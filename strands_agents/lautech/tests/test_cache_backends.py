@@ -0,0 +1,150 @@
+"""Cache backends: the MemoryBackend LRU and the RedisBackend against fakeredis"""
+
+import threading
+import time
+
+import pytest
+
+from cache_backends import CacheBackend, MemoryBackend, RedisBackend
+from response_cache import ResponseCache, cache_key, COALESCED, COMPUTED
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_client(server):
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+
+@pytest.fixture
+def backend(server):
+    return RedisBackend(client=make_client(server), prefix='test:')
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class GetOnly(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+
+
+def test_memory_backend_evicts_least_recently_used():
+    memory = MemoryBackend(max_entries=2)
+    memory.set('a', '1', 60)
+    memory.set('b', '2', 60)
+    memory.get('a')
+    memory.set('c', '3', 60)
+    assert memory.get('b') is None
+    assert memory.get('a') == '1' and memory.get('c') == '3'
+    assert memory.stats()['evictions'] == 1
+
+
+def test_redis_set_get_and_ttl(backend, server):
+    backend.set('k', 'v', 60)
+    assert backend.get('k') == 'v'
+    assert 0 < make_client(server).pttl('test:k') <= 60000
+    backend.set('short', 'v', 0.05)
+    time.sleep(0.1)
+    assert backend.get('short') is None
+
+
+def test_redis_add_only_sets_missing_keys(backend):
+    assert backend.add('lock', 'a', 60)
+    assert not backend.add('lock', 'b', 60)
+    assert backend.get('lock') == 'a'
+
+
+def test_redis_delete_if_matches_value(backend):
+    backend.set('lock', 'mine', 60)
+    assert not backend.delete_if('lock', 'theirs')
+    assert backend.get('lock') == 'mine'
+    assert backend.delete_if('lock', 'mine')
+    assert backend.get('lock') is None
+    assert not backend.delete_if('lock', 'mine')
+
+
+class _RacingPipeline:
+    """Pipeline proxy where another replica rewrites the key right after our GET"""
+
+    def __init__(self, pipe, other, key, value):
+        self._pipe, self._other, self._key, self._value = pipe, other, key, value
+
+    def get(self, key):
+        result = self._pipe.get(key)
+        self._other.set(self._key, self._value)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._pipe, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return self._pipe.__exit__(*exc)
+
+
+def test_redis_delete_if_loses_race_to_concurrent_writer(backend, server):
+    other = make_client(server)
+    backend.set('lock', 'mine', 60)
+    pipeline = backend.client.pipeline
+    backend.client.pipeline = lambda: _RacingPipeline(pipeline(), other, 'test:lock', 'theirs')
+
+    assert not backend.delete_if('lock', 'mine')  # WATCH sees the change and aborts the DEL
+    assert other.get('test:lock') == 'theirs'
+    assert backend.errors == 0
+
+
+def test_redis_delete_prefix_and_clear(backend, server):
+    for key in ('response:g:1', 'response:g:2', 'response:s:1'):
+        backend.set(key, 'v', 60)
+    make_client(server).set('other:key', 'v')
+    assert backend.delete_prefix('response:g:') == 2
+    backend.clear()
+    assert backend.get('response:s:1') is None
+    assert make_client(server).get('other:key') == 'v'  # Outside the backend's prefix
+
+
+def test_redis_errors_are_misses():
+    class BrokenClient:
+        def __getattr__(self, name):
+            def fail(*args, **kwargs):
+                raise ConnectionError("down")
+            return fail
+
+    broken = RedisBackend(client=BrokenClient())
+    assert broken.get('k') is None
+    broken.set('k', 'v', 60)
+    assert broken.add('k', 'v', 60)  # Can't coordinate: caller goes ahead
+    assert broken.errors == 3
+
+
+def test_replicas_coalesce_through_shared_backend(server):
+    replicas = [ResponseCache(shared=RedisBackend(client=make_client(server), prefix='test:'),
+                              poll_interval=0.01, wait_timeout=5) for _ in range(3)]
+    key = cache_key('how much is the 200 level fee', None, 'anonymous')
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'answer'
+
+    results = []
+    threads = [threading.Thread(target=lambda c=cache: results.append(c.get_or_compute(key, compute)))
+               for cache in replicas]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(source for _, source in results) == sorted([COMPUTED, COALESCED, COALESCED])
+    assert {response for response, _ in results} == {'answer'}
+    assert not make_client(server).keys('test:*:lock')  # Lock released by its holder
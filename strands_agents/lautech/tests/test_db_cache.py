@@ -0,0 +1,36 @@
+"""Result cache keys: case-insensitive filters, case-sensitive page cursors"""
+
+import pytest
+
+import db_utils
+from db_cache import ResultCache, normalize_args
+
+
+def test_filters_are_normalized_but_cursors_kept_verbatim():
+    assert normalize_args({'level': ' 200L ', 'cursor': 'AbC'}) == ('200l', 'AbC')
+    assert normalize_args({'page_token': 'AbC'}) != normalize_args({'page_token': 'abc'})
+
+
+def test_memoized_helper_separates_cursors_differing_by_case():
+    cache = ResultCache(enabled=True)
+    calls = []
+
+    @cache.memoize('page')
+    def page(table, cursor=None):
+        calls.append(cursor)
+        return [cursor]
+
+    assert page('courses', cursor='AbC') == ['AbC']
+    assert page('COURSES', cursor='AbC') == ['AbC']  # Same key: table name is case-folded
+    assert page('courses', cursor='abc') == ['abc']
+    assert calls == ['AbC', 'abc']
+
+
+def test_get_page_does_not_serve_a_cached_page_for_a_case_swapped_cursor():
+    first = db_utils.get_page('courses', 5)
+    cursor = first['next_cursor']
+    assert cursor and cursor != cursor.swapcase()
+    second = db_utils.get_page('courses', 5, cursor)
+    assert second['rows'] != first['rows']
+    with pytest.raises(ValueError):
+        db_utils.get_page('courses', 5, cursor.swapcase())
@@ -0,0 +1,57 @@
+"""Query metrics: cheap byte estimates and EMF output through its own logger"""
+
+import json
+import logging
+
+import db_metrics
+from db_metrics import QueryMetrics, result_size
+from db_results import Table
+
+ROWS = [{'code': f'CSC{i}', 'name': f'Course {i}', 'credits': 3} for i in range(200)]
+
+
+def test_estimated_bytes_are_close_to_exact():
+    for result in (ROWS, Table.from_dicts(ROWS)):
+        rows, exact = result_size(result, exact=True)
+        estimated_rows, estimated = result_size(result, exact=False)
+        assert rows == estimated_rows == 200
+        assert abs(estimated - exact) / exact < 0.15
+    assert result_size(None) == (0, 0)
+    assert result_size([], exact=False)[0] == 0
+
+
+def test_record_does_not_serialize_whole_result(monkeypatch):
+    sizes = []
+    real = db_metrics._json_size
+    monkeypatch.setattr(db_metrics, '_json_size', lambda value: sizes.append(value) or real(value))
+    monkeypatch.setattr(db_metrics, 'EXACT_BYTES', False)
+    QueryMetrics(enabled=True).record('courses.list', 1.0, ROWS)
+    assert sizes == [ROWS[0]]
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(record.getMessage())
+
+
+def test_emf_lines_go_to_dedicated_logger_only():
+    emf, root = _Collect(), _Collect()
+    logging.getLogger('lautech.emf').addHandler(emf)
+    logging.getLogger().addHandler(root)
+    try:
+        metrics = QueryMetrics(emf=True, emf_interval=3600, enabled=True)
+        metrics.record('fees.by_level', 3.0, ROWS[:2])
+        metrics.emit_emf()
+    finally:
+        logging.getLogger('lautech.emf').removeHandler(emf)
+        logging.getLogger().removeHandler(root)
+
+    (line,) = emf.lines
+    document = json.loads(line)
+    assert document['QueryName'] == 'fees.by_level'
+    assert document['QueryCount'] == 1
+    assert not any('QueryName' in message for message in root.lines)
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(max_size=2):
+    return ConnectionPool(FakeConnection, min_size=0, max_size=max_size, timeout=0.1,
+                          reset=lambda conn: conn.rollback(), is_closed=lambda conn: conn.closed)
+
+
+def test_connection_returned_after_exception():
+    pool = make_pool(max_size=1)
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("boom")
+    with pool.connection() as conn:
+        assert conn.rollbacks == 1
+
+
+def test_generator_closed_mid_with_releases_connection():
+    pool = make_pool(max_size=2)
+
+    def rows():
+        with pool.connection():
+            yield 1
+            yield 2
+
+    readers = [rows() for _ in range(pool.max_size)]
+    for reader in readers:
+        next(reader)
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+    for reader in readers:
+        reader.close()  # GeneratorExit inside the with block
+    assert pool.stats()['in_use'] == 0
+    conn = pool.acquire()
+    pool.release(conn)
+
+
+def test_closed_connection_is_discarded():
+    pool = make_pool(max_size=1)
+
+    def rows():
+        with pool.connection() as conn:
+            conn.closed = True
+            yield 1
+
+    reader = rows()
+    next(reader)
+    reader.close()
+    assert pool.stats()['size'] == 0
+    assert pool.stats()['connections_closed'] == 1
+    assert not pool.acquire().closed
+
+
+def test_reaper_closes_idle_connections_without_checkouts():
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=2, timeout=0.1, idle_timeout=0.05)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    pool.release(second)
+    assert pool.stats()['idle'] == 2
+
+    pool.start_reaper(interval=0.02)
+    deadline = time.monotonic() + 2
+    while pool.stats()['size'] and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert pool.stats()['size'] == 0
+    assert first.closed and second.closed
+
+    pool.close()
+    pool._reaper.join(1)
+    assert not pool._reaper.is_alive()
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from db_replicas import ReplicaRouter, parse_endpoints
+
+
+def make_router(lags, **kwargs):
+    """Router over pools named after their replica; lags maps name -> seconds (or an exception)"""
+    def measure_lag(pool):
+        lag = lags[pool]
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+    kwargs.setdefault('max_lag', 5)
+    kwargs.setdefault('check_interval', 0)
+    kwargs.setdefault('retry_after', 60)
+    return ReplicaRouter('primary', {name: name for name in lags}, measure_lag, **kwargs)
+
+
+def test_parse_endpoints():
+    assert parse_endpoints('a:6432, b ,') == [('a', 6432), ('b', 5432)]
+
+
+def test_round_robin_across_healthy_replicas():
+    router = make_router({'r1': 0.0, 'r2': 1.0})
+    used = [router.execute(lambda pool: pool) for _ in range(4)]
+    assert used == ['r1', 'r2', 'r1', 'r2']
+    assert router.stats()['primary_reads'] == 0
+
+
+def test_lagging_replica_is_skipped():
+    lags = {'r1': 0.0, 'r2': 30.0}
+    router = make_router(lags)
+    assert {router.execute(lambda pool: pool) for _ in range(4)} == {'r1'}
+    assert router.stats()['replicas']['r2']['available'] is False
+
+    lags['r2'] = 0.5  # Caught up: back in rotation on the next check
+    assert {router.execute(lambda pool: pool) for _ in range(4)} == {'r1', 'r2'}
+
+
+def test_all_replicas_lagging_uses_primary():
+    router = make_router({'r1': 30.0, 'r2': 10.0})
+    assert router.execute(lambda pool: pool) == 'primary'
+    assert router.stats()['primary_reads'] == 1
+
+
+def test_lag_check_failure_takes_replica_out():
+    router = make_router({'r1': ConnectionError('refused')})
+    assert router.execute(lambda pool: pool) == 'primary'
+    stats = router.stats()['replicas']['r1']
+    assert stats['available'] is False
+    assert stats['failures'] == 1
+
+
+def test_failed_replica_query_retries_on_primary():
+    router = make_router({'r1': 0.0})
+    calls = []
+
+    def query(pool):
+        calls.append(pool)
+        if pool == 'r1':
+            raise ConnectionError('reset')
+        return 'rows'
+
+    assert router.execute(query) == 'rows'
+    assert calls == ['r1', 'primary']
+    assert router.stats()['fallbacks'] == 1
+
+    # Skipped for retry_after seconds
+    assert router.execute(query) == 'rows'
+    assert calls[-1] == 'primary' and calls.count('r1') == 1
+
+
+def test_non_failover_error_is_raised():
+    router = make_router({'r1': 0.0}, is_failover_error=lambda e: isinstance(e, ConnectionError))
+
+    def query(pool):
+        raise ValueError('bad SQL')
+
+    with pytest.raises(ValueError):
+        router.execute(query)
+    assert router.stats()['fallbacks'] == 0
+
+
+def test_execute_async_falls_back_on_lag():
+    lags = {'r1': 30.0}
+
+    async def measure_lag(pool):
+        return lags[pool]
+
+    async def query(pool):
+        return pool
+
+    router = ReplicaRouter('primary', {'r1': 'r1'}, measure_lag, max_lag=5, check_interval=0)
+    assert asyncio.run(router.execute_async(query)) == 'primary'
+    lags['r1'] = 0.0
+    assert asyncio.run(router.execute_async(query)) == 'r1'
@@ -0,0 +1,16 @@
+import logging
+from datetime import date
+
+import db_schema
+
+
+def test_calendar_today_missing_zone_warns_once(monkeypatch, caplog):
+    monkeypatch.setattr(db_schema, 'CALENDAR_TIMEZONE', 'Nowhere/Missing')
+    monkeypatch.setattr(db_schema, '_timezone_missing_logged', False)
+
+    with caplog.at_level(logging.WARNING, logger='db_schema'):
+        assert db_schema.calendar_today() == date.today().isoformat()
+        db_schema.calendar_today()
+
+    warnings = [record for record in caplog.records if 'Nowhere/Missing' in record.getMessage()]
+    assert len(warnings) == 1
@@ -0,0 +1,38 @@
+import db_utils
+import fast_path
+from fast_path import FastPathRouter, classify
+
+
+def make_router():
+    return FastPathRouter(min_confidence=0.8, model=None, enabled=True)
+
+
+def test_mixed_is_a_gender_slot():
+    route = classify('mixed hostels')
+    assert route.intent == fast_path.HOSTELS and route.slots == {'gender': 'mixed'}
+    assert classify('co-ed hostels').slots == {'gender': 'mixed'}
+
+
+def test_mixed_hostels_not_answered_with_single_sex_ones():
+    text, route = make_router().answer('mixed hostels')
+    assert route.reason is None
+    assert text == "No mixed hostels were found."
+
+
+def test_male_hostels_exclude_female():
+    text, _ = make_router().answer('male hostels')
+    assert text.startswith("Male hostels (")
+    assert 'Female' not in text and 'Adeoye Hall' not in text
+
+
+def test_mixed_rows_labelled_in_gender_answer(monkeypatch):
+    rows = [{'name': 'Adeoye Hall', 'gender': 'Female', 'capacity': 300, 'status': 'Available'},
+            {'name': 'Unity Hall', 'gender': 'Mixed', 'capacity': 200, 'status': 'Available'}]
+    monkeypatch.setattr(db_utils, 'get_hostels', lambda **kwargs: rows)
+
+    text, _ = make_router().answer('female hostels')
+    assert text.splitlines() == [
+        "Female and mixed hostels (2):",
+        "- Adeoye Hall (Female, 300 bed spaces, Available)",
+        "- Unity Hall (Mixed, male and female students, 200 bed spaces, Available)",
+    ]
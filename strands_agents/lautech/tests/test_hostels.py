@@ -0,0 +1,33 @@
+import pytest
+
+import db_utils
+
+MALE_ONLY = {'male', 'mixed'}
+
+
+def genders(rows):
+    return {row['gender'].lower() for row in rows}
+
+
+@pytest.mark.parametrize('gender', ['male', ' Male '])
+def test_male_excludes_female_hostels(gender):
+    rows = db_utils.get_hostels(gender=gender)
+    assert rows and genders(rows) <= MALE_ONLY
+
+
+def test_female_still_matches_female_hostels():
+    rows = db_utils.get_hostels(gender='female')
+    assert rows and genders(rows) <= {'female', 'mixed'}
+
+
+def test_male_search_excludes_female_hostels():
+    rows = db_utils.get_hostels(gender='male', facilities=['kitchen'], min_capacity=0)
+    assert rows and genders(rows) <= MALE_ONLY
+
+
+def test_male_page_and_snapshot_exclude_female_hostels():
+    page = db_utils.get_page('hostels', gender='male')
+    assert page['rows'] and genders(page['rows']) <= MALE_ONLY
+
+    rows = db_utils.from_snapshot(db_utils.get_snapshot(), 'hostels', gender='male')
+    assert rows and genders(rows) <= MALE_ONLY
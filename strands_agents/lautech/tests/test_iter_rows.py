@@ -0,0 +1,94 @@
+"""iter_rows streaming: early stops must close the server-side cursor and free the pooled connection"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import db_utils
+from db_pool import ConnectionPool
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.closed = False
+        self.itersize = None
+
+    def execute(self, sql, params):
+        pass
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def close(self):
+        self.closed = True
+
+
+class FakePgConnection:
+    def __init__(self):
+        self.autocommit = True
+        self.closed = False
+        self.cursors = []
+
+    def cursor(self, name=None, cursor_factory=None):
+        cursor = FakeCursor([{'code': f'CSC{100 + i}', 'name': f'Course {i}'} for i in range(5)])
+        self.cursors.append(cursor)
+        return cursor
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def postgres_pool(monkeypatch):
+    pool = ConnectionPool(FakePgConnection, min_size=0, max_size=1, timeout=0.1,
+                          is_closed=lambda conn: conn.closed)
+    monkeypatch.setattr(db_utils, 'USE_POSTGRES', True)
+    monkeypatch.setattr(db_utils, 'HAS_POSTGRES', True)
+    monkeypatch.setattr(db_utils, 'psycopg2', SimpleNamespace(extras=SimpleNamespace(RealDictCursor=None)),
+                        raising=False)
+    monkeypatch.setattr(db_utils, '_pool', pool)
+    return pool
+
+
+def _assert_released(pool):
+    assert pool.stats()['in_use'] == 0
+    conn = pool.acquire()
+    assert conn.cursors and all(cursor.closed for cursor in conn.cursors)
+    assert conn.autocommit
+    pool.release(conn)
+
+
+def test_close_releases_cursor_and_connection(postgres_pool):
+    rows = db_utils.iter_rows('courses', batch_size=2)
+    assert next(rows)['code'] == 'CSC100'
+    assert postgres_pool.stats()['in_use'] == 1
+    rows.close()
+    _assert_released(postgres_pool)
+
+
+def test_break_releases_cursor_and_connection(postgres_pool):
+    for i, row in enumerate(db_utils.iter_rows('courses', batch_size=2)):
+        if i == 1:
+            break
+    _assert_released(postgres_pool)
+
+
+def test_exhausted_stream_releases_cursor_and_connection(postgres_pool):
+    assert len(list(db_utils.iter_rows('courses', batch_size=2))) == 5
+    _assert_released(postgres_pool)
+
+
+def test_repeated_early_stops_do_not_exhaust_pool(postgres_pool):
+    for _ in range(postgres_pool.max_size + 3):
+        for row in db_utils.iter_rows('courses', batch_size=2):
+            break
+    assert postgres_pool.stats()['in_use'] == 0
+
+
+def test_sqlite_stream_reads_every_row():
+    rows = list(db_utils.iter_rows('courses', batch_size=3))
+    assert len(rows) == len(db_utils.get_courses(limit=10000))
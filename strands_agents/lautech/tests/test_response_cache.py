@@ -0,0 +1,46 @@
+import pytest
+
+from response_cache import GLOBAL, SESSION, cache_key, classify, storage_key
+
+
+@pytest.mark.parametrize('prompt', [
+    "How much is the 300 level school fee?",
+    "male hostels",
+    "When does registration end",
+    "What is CSC 201 about?",
+    "Is it open for 100 level students?",  # Names its own data
+])
+def test_self_contained_questions_are_global(prompt):
+    assert classify(prompt) == GLOBAL
+
+
+@pytest.mark.parametrize('prompt', [
+    "what is my name?",
+    "what did I ask earlier",
+    "how much is it",
+    "when is that due",
+    "and for 300 level?",
+    "what about the female ones",
+    "who teaches it?",
+    "yes",
+    "OK.",
+])
+def test_personal_and_follow_up_questions_are_session(prompt):
+    assert classify(prompt) == SESSION
+
+
+def test_global_key_ignores_session_and_formatting():
+    key = cache_key("Male hostels?", session_id='s1', actor_id='a1')
+    assert key[0] == GLOBAL
+    assert key == cache_key("  male   HOSTELS ", session_id='s2', actor_id='a2')
+
+
+def test_session_key_is_bound_to_actor_and_session():
+    key = cache_key("how much is it", session_id='s1', actor_id='a1')
+    assert key[0] == SESSION
+    assert key != cache_key("how much is it", session_id='s2', actor_id='a1')
+    assert storage_key(key) != storage_key(cache_key("how much is it", session_id='s1', actor_id='a2'))
+
+
+def test_follow_up_without_session_is_not_cached():
+    assert cache_key("and for 300 level?") is None
@@ -0,0 +1,95 @@
+import pytest
+
+from semantic_cache import (Embedder, HashingEmbedder, SemanticCache, VectorIndex, canonical_question,
+                            question_slots)
+
+FEE_100 = "What is the school fee for 100 level?"
+FEE_ANSWER = "₦250,000 per session"
+
+
+def make_cache(threshold=0.8):
+    return SemanticCache(embedder=HashingEmbedder(), threshold=threshold, index=VectorIndex(), enabled=True)
+
+
+def compute(answer=FEE_ANSWER):
+    calls = []
+
+    def run():
+        calls.append(1)
+        return answer
+    return run, calls
+
+
+def test_paraphrase_hit():
+    cache = make_cache()
+    cache.get_or_compute(FEE_100, compute()[0])
+
+    run, calls = compute()
+    answer, match = cache.get_or_compute("How much are fees for 100L?", run)
+    assert answer == FEE_ANSWER and not calls
+    assert match[0] == FEE_100 and match[1] >= cache.threshold
+
+
+def test_similarity_threshold():
+    # "100 level tuition fee" scores about 0.82 against FEE_100 with the hashing embedder
+    loose, strict = make_cache(threshold=0.8), make_cache(threshold=0.9)
+    for cache in (loose, strict):
+        cache.get_or_compute(FEE_100, compute()[0])
+
+    assert loose.lookup("100 level tuition fee")[0] == FEE_ANSWER
+    assert strict.lookup("100 level tuition fee") is None
+    assert strict.stats()['misses'] == 2  # The initial compute and this lookup
+
+
+def test_different_slot_is_never_a_hit():
+    cache = make_cache(threshold=0.0)
+    cache.get_or_compute(FEE_100, compute()[0])
+    assert cache.lookup("What is the school fee for 200 level?") is None
+
+
+def test_event_qualifier_is_never_a_hit():
+    cache = make_cache(threshold=0.0)
+    cache.get_or_compute("When is the registration deadline?", compute("Friday, 10 January 2025")[0])
+    assert cache.lookup("When is the late registration deadline?") is None
+    assert cache.lookup("registration deadline") is not None
+
+
+def test_mixed_is_a_gender_slot():
+    assert question_slots(canonical_question("co-ed hostels")) == {('gender', 'mixed')}
+    cache = make_cache(threshold=0.0)
+    cache.get_or_compute("female hostels", compute("Adeoye Hall, Mercy Hall")[0])
+    assert cache.lookup("mixed hostels") is None
+
+
+def test_version_change_invalidates():
+    cache = make_cache()
+    assert cache.observe_version(1) is False  # First version seen: nothing to drop
+    cache.get_or_compute(FEE_100, compute()[0])
+    assert cache.observe_version(1) is False
+    assert cache.lookup(FEE_100) is not None
+
+    assert cache.observe_version(2) is True
+    assert cache.lookup(FEE_100) is None
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_answer_from_older_version_not_cached():
+    cache = make_cache()
+    cache.observe_version(1)
+
+    def run():
+        cache.observe_version(2)  # Data changed while the answer was computed
+        return FEE_ANSWER
+
+    cache.get_or_compute(FEE_100, run)
+    assert len(cache.index) == 0
+    assert cache.add(FEE_100, FEE_ANSWER, version=1) is False
+    assert cache.add(FEE_100, FEE_ANSWER, version=2) is True
+
+
+def test_embedder_requires_embed():
+    class Incomplete(Embedder):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
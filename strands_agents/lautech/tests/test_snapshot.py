@@ -0,0 +1,27 @@
+"""get_snapshot: read-only, shared between cache hits, same answers as the direct queries"""
+
+import pytest
+
+import db_utils
+
+
+def test_snapshot_is_shared_and_read_only():
+    first = db_utils.get_snapshot()
+    second = db_utils.get_snapshot()
+    assert first is second  # Cache hit returns the same object, no deep copy
+    with pytest.raises(TypeError):
+        first['fees'] = ()
+    with pytest.raises(TypeError):
+        first['fees'][0]['amount'] = 0
+    assert isinstance(first['hostels'], tuple)
+
+
+def test_from_snapshot_returns_mutable_copies_matching_direct_queries():
+    snapshot = db_utils.get_snapshot()
+    fees = db_utils.from_snapshot(snapshot, 'fees', limit=10, level='200')
+    assert fees == db_utils.get_fees(limit=10, level='200')
+    fees[0]['amount'] = 0
+    assert db_utils.from_snapshot(snapshot, 'fees', limit=10, level='200')[0]['amount'] != 0
+
+    hostels = db_utils.from_snapshot(snapshot, 'hostels', limit=50, gender='male')
+    assert hostels == db_utils.get_hostels(limit=50, gender='male')
@@ -0,0 +1,54 @@
+"""@cached_tool: argument normalization and data-version invalidation"""
+
+import asyncio
+
+from cache_backends import MemoryBackend
+from tool_cache import ToolCache
+
+
+def make_cache(version):
+    async def version_fn():
+        return version[0]
+    return ToolCache(version_fn=version_fn, backend=MemoryBackend(), ttl=60, enabled=True)
+
+
+def test_search_arguments_are_case_insensitive_but_page_tokens_are_not():
+    cache = make_cache([1])
+    calls = []
+
+    @cache.cached_tool()
+    async def get_course_info(search: str = None, page_token: str = None) -> str:
+        calls.append((search, page_token))
+        return f"{search}|{page_token}"
+
+    async def scenario():
+        assert await get_course_info(search='CSC') == 'CSC|None'
+        assert await get_course_info(search=' csc ') == 'CSC|None'
+        assert await get_course_info(page_token='AbC') == 'None|AbC'
+        assert await get_course_info(page_token='abc') == 'None|abc'
+
+    asyncio.run(scenario())
+    assert calls == [('CSC', None), (None, 'AbC'), (None, 'abc')]
+    stats = cache.stats()['tools']['get_course_info']
+    assert (stats['hits'], stats['misses']) == (1, 3)
+
+
+def test_outputs_dropped_when_data_version_changes():
+    version = [1]
+    cache = make_cache(version)
+    calls = []
+
+    @cache.cached_tool()
+    async def get_fees(level: str = None) -> str:
+        calls.append(level)
+        return f"fees {level} v{version[0]}"
+
+    async def scenario():
+        assert await get_fees('200') == 'fees 200 v1'
+        assert await get_fees('200') == 'fees 200 v1'
+        version[0] = 2
+        assert await get_fees('200') == 'fees 200 v2'
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert cache.stats()['invalidations'] == 1
@@ -0,0 +1,48 @@
+"""Request spans: hashed IDs and trace context continued from the payload"""
+
+import pytest
+
+pytest.importorskip('opentelemetry.sdk')
+
+from opentelemetry import propagate, trace  # noqa: E402
+from opentelemetry.sdk.trace import TracerProvider  # noqa: E402
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: E402
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter  # noqa: E402
+
+import tracing  # noqa: E402
+
+PHONE_SESSION = 'whatsapp-whatsapp-+2348012345678'
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, '_tracer', lambda: provider.get_tracer(tracing.TRACER_NAME))
+    monkeypatch.setattr(tracing, '_enabled', True)
+    return exporter
+
+
+def test_request_span_hashes_ids(exporter):
+    with tracing.request_span('lautech_assistant', {}, PHONE_SESSION, '+2348012345678'):
+        with tracing.span('fast_path'):
+            pass
+    spans = exporter.get_finished_spans()
+    assert [s.name for s in spans] == ['fast_path', 'lautech_assistant']
+    for finished in spans:
+        values = [str(v) for v in finished.attributes.values()]
+        assert not any('2348012345678' in value for value in values)
+        assert finished.attributes['session.id'] == tracing._pseudonym(PHONE_SESSION)
+
+
+def test_request_span_continues_caller_trace(exporter):
+    caller = TracerProvider().get_tracer('whatsapp')
+    with caller.start_as_current_span('whatsapp.message') as parent:
+        carrier = {}
+        propagate.inject(carrier)
+    with tracing.request_span('lautech_assistant', {'trace_context': carrier}, None, None):
+        pass
+    (finished,) = exporter.get_finished_spans()
+    assert finished.context.trace_id == parent.get_span_context().trace_id
+    assert finished.parent.span_id == parent.get_span_context().span_id
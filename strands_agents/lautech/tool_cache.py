@@ -0,0 +1,190 @@
+"""
+Memoization of Strands tool outputs
+
+@cached_tool sits between Strands and a tool body: a call whose normalized
+arguments were seen before returns the stored output string instead of
+querying and formatting again. That covers the model repeating a call within
+one turn as well as different users asking for the same data.
+
+    @tool
+    @cached_tool(ttl=600)
+    async def get_financial_info(level: str = None) -> str:
+        ...
+
+Outputs live in a cache_backends.MemoryBackend (LRU bounded by entries and
+bytes, per-entry TTL) and are all dropped when the database data version
+changes. Per-tool hit rates and hit/miss latencies are in tool_cache.stats().
+"""
+
+import os
+import json
+import time
+import inspect
+import logging
+import functools
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from cache_backends import MemoryBackend
+from db_cache import normalize_args
+from db_metrics import QueryStats
+from db_async import current_data_version
+from tracing import set_attributes
+
+logger = logging.getLogger(__name__)
+
+# Tool cache configuration
+TOOL_CACHE_ENABLED = os.getenv('TOOL_CACHE_ENABLED', 'true').lower() == 'true'
+TOOL_CACHE_TTL = float(os.getenv('TOOL_CACHE_TTL', '300'))  # Default seconds per output
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv('TOOL_CACHE_MAX_ENTRIES', '1024'))
+TOOL_CACHE_MAX_BYTES = int(os.getenv('TOOL_CACHE_MAX_BYTES', str(4 * 1024 * 1024)))
+
+
+class _ToolStats:
+    """Hit/miss counts and latency histograms for one tool"""
+
+    __slots__ = ('hits', 'misses', 'errors')
+
+    def __init__(self):
+        self.hits = QueryStats()
+        self.misses = QueryStats()
+        self.errors = 0
+
+    @staticmethod
+    def _latency(stats: QueryStats) -> Dict:
+        data = stats.as_dict()
+        return {key: data[key] for key in ('avg_ms', 'p50_ms', 'p95_ms', 'max_ms')}
+
+    def as_dict(self) -> Dict:
+        calls = self.hits.count + self.misses.count
+        return {
+            'calls': calls,
+            'hits': self.hits.count,
+            'misses': self.misses.count,
+            'hit_rate': round(self.hits.count / calls, 3) if calls else 0.0,
+            'errors': self.errors,
+            'bytes_served': self.hits.bytes + self.misses.bytes,
+            'hit_latency': self._latency(self.hits),
+            'miss_latency': self._latency(self.misses),
+        }
+
+
+class ToolCache:
+    """
+    Output cache for async tool functions
+
+    Args:
+        version_fn: Coroutine function returning the current data version; all
+            outputs are dropped when it changes
+        backend: Storage (default: a MemoryBackend with the TOOL_CACHE_* bounds)
+        ttl: Default seconds an output stays valid
+        enabled: If False, decorated tools always run
+    """
+
+    def __init__(self, version_fn: Optional[Callable[[], Awaitable[Any]]] = None,
+                 backend: Optional[MemoryBackend] = None, ttl: float = TOOL_CACHE_TTL,
+                 enabled: bool = TOOL_CACHE_ENABLED):
+        self._version_fn = version_fn
+        self.backend = backend or MemoryBackend(TOOL_CACHE_MAX_ENTRIES, TOOL_CACHE_MAX_BYTES)
+        self.ttl = ttl
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._version = None
+        self._stats: Dict[str, _ToolStats] = {}
+        self.invalidations = 0
+
+    async def _check_version(self):
+        if self._version_fn is None:
+            return
+        try:
+            version = await self._version_fn()
+        except Exception as e:
+            logger.warning(f"Data version check failed, keeping cached tool outputs: {e}")
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            changed = self._version is not None
+            self._version = version
+        if changed:
+            self.backend.clear()
+            with self._lock:
+                self.invalidations += 1
+            logger.info(f"🔄 Data version changed ({version}), clearing tool output cache")
+
+    def _record(self, name: str, hit: bool, duration_ms: float, output: Optional[str], error: bool = False):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = _ToolStats()
+            if error:
+                stats.errors += 1
+            (stats.hits if hit else stats.misses).add(duration_ms, 0, len(output or ''), error, False)
+
+    def cached_tool(self, ttl: Optional[float] = None, key: Optional[Callable[..., Any]] = None) -> Callable:
+        """
+        Decorator caching an async tool's string output by its normalized arguments
+
+        Apply it under @tool so Strands still sees the tool's signature and docstring.
+
+        Args:
+            ttl: Seconds an output stays valid (default: the cache's ttl)
+            key: Called with the tool's bound arguments (defaults applied) to build
+                the cache key instead of the normalized arguments (page cursors and
+                tokens are kept verbatim, see db_cache.VERBATIM_ARGS), e.g. to add
+                today's date for date-relative output
+        """
+        def decorator(func: Callable) -> Callable:
+            name = func.__name__
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                parts = key(**bound.arguments) if key else normalize_args(bound.arguments)
+                skey = f"{name}:{json.dumps(parts, default=str, separators=(',', ':'))}"
+
+                await self._check_version()
+                version = self._version
+                output = self.backend.get(skey)
+                set_attributes({'tool_cache.hit': output is not None})  # On the Strands tool span
+                if output is not None:
+                    self._record(name, True, (time.perf_counter() - start) * 1000, output)
+                    return output
+                try:
+                    output = await func(*args, **kwargs)
+                except Exception:
+                    self._record(name, False, (time.perf_counter() - start) * 1000, None, error=True)
+                    raise
+                # Only text outputs, and not ones computed against data that changed meanwhile
+                if isinstance(output, str) and version == self._version:
+                    self.backend.set(skey, output, self.ttl if ttl is None else ttl)
+                self._record(name, False, (time.perf_counter() - start) * 1000, output)
+                return output
+
+            wrapper.cache = self
+            return wrapper
+        return decorator
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            tools = {name: stats.as_dict() for name, stats in sorted(self._stats.items())}
+            invalidations = self.invalidations
+        return {
+            'enabled': self.enabled,
+            'tools': tools,
+            'invalidations': invalidations,
+            'storage': self.backend.stats(),
+        }
+
+
+tool_cache = ToolCache(version_fn=current_data_version)
+cached_tool = tool_cache.cached_tool
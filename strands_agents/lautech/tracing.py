@@ -0,0 +1,211 @@
+"""
+OpenTelemetry tracing for the lautech_assistant request lifecycle
+
+setup_tracing() installs a tracer provider with the exporters named in
+TRACING_EXPORTER (comma-separated):
+
+- otlp: OTLP over HTTP to OTEL_EXPORTER_OTLP_ENDPOINT (needs
+  opentelemetry-exporter-otlp-proto-http); the default when that variable is set
+- console: span JSON on stdout
+- file: one span JSON per line in TRACING_FILE, for offline analysis
+
+If the runtime already configured a provider (e.g. AgentCore's ADOT
+auto-instrumentation), it is reused and only the exporters are added. Strands
+emits its own spans for the agent loop, each model call and each tool call;
+this module adds spans for the entrypoint stages, tags them with hashes of
+the session and actor IDs, and turns every recorded DB query (db_metrics
+listener) into a span. The caller's trace context arrives in the payload's
+"trace_context" (W3C traceparent), so a WhatsApp message and its agent run
+share one trace.
+
+Without the opentelemetry packages every helper here is a no-op.
+"""
+
+import os
+import time
+import hashlib
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from db_metrics import query_metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import context as otel_context, propagate, trace
+    from opentelemetry.trace import Status, StatusCode
+    HAS_OTEL = True
+except ImportError:
+    HAS_OTEL = False
+
+# Tracing configuration
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'otlp' if os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT') else 'none')
+TRACING_FILE = os.getenv('TRACING_FILE', '/tmp/lautech_traces.jsonl')
+TRACING_SERVICE_NAME = os.getenv('OTEL_SERVICE_NAME', 'lautech-agentcore')
+
+TRACER_NAME = 'lautech'
+
+# Attributes added to every span of the current request (session.id, actor.id)
+_request_attributes: ContextVar[Dict[str, Any]] = ContextVar('lautech_request_attributes', default={})
+
+_enabled = False
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        pass
+
+    def record_exception(self, exception: BaseException):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def tracing_enabled() -> bool:
+    return _enabled
+
+
+def _tracer():
+    return trace.get_tracer(TRACER_NAME)
+
+
+def _span_processors(exporters):
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    processors = []
+    for exporter in exporters:
+        if exporter == 'otlp':
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            except ImportError:
+                logger.warning("⚠️  TRACING_EXPORTER=otlp needs opentelemetry-exporter-otlp-proto-http; skipping it")
+                continue
+            processors.append(BatchSpanProcessor(OTLPSpanExporter()))
+        elif exporter == 'console':
+            processors.append(BatchSpanProcessor(ConsoleSpanExporter()))
+        elif exporter == 'file':
+            out = open(TRACING_FILE, 'a', buffering=1)
+            processors.append(BatchSpanProcessor(ConsoleSpanExporter(
+                out=out, formatter=lambda span: span.to_json(indent=None) + '\n')))
+        else:
+            logger.warning(f"⚠️  Unknown tracing exporter '{exporter}'")
+    return processors
+
+
+def setup_tracing(exporter: str = TRACING_EXPORTER) -> bool:
+    """
+    Install exporters and the DB query listener; returns True if tracing is on
+
+    Args:
+        exporter: Comma-separated exporters ('otlp', 'console', 'file'), or 'none'
+    """
+    global _enabled
+    exporters = [name.strip() for name in exporter.lower().split(',') if name.strip() and name.strip() != 'none']
+    if _enabled or not exporters:
+        return _enabled
+    if not HAS_OTEL:
+        logger.warning("⚠️  TRACING_EXPORTER is set but opentelemetry isn't installed; tracing disabled")
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+    except ImportError:
+        logger.warning("⚠️  Tracing needs opentelemetry-sdk; tracing disabled")
+        return False
+
+    processors = _span_processors(exporters)
+    if not processors:
+        return False
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider(resource=Resource.create({'service.name': TRACING_SERVICE_NAME}))
+        trace.set_tracer_provider(provider)
+    for processor in processors:
+        provider.add_span_processor(processor)
+
+    query_metrics.add_listener(_query_span)
+    _enabled = True
+    logger.info(f"🔭 Tracing enabled ({', '.join(exporters)})")
+    return True
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """Child span of the current context, tagged with the request's session/actor IDs"""
+    if not _enabled:
+        yield _NOOP_SPAN
+        return
+    with _tracer().start_as_current_span(name, attributes={**_request_attributes.get(), **attributes}) as current:
+        yield current
+
+
+def set_attributes(attributes: Dict[str, Any]):
+    """Add attributes to the current span (e.g. a Strands tool span)"""
+    if _enabled:
+        trace.get_current_span().set_attributes(attributes)
+
+
+def _pseudonym(value: str) -> str:
+    """Stable hash of an ID, so spans never carry phone numbers or other raw identifiers"""
+    return hashlib.sha256(str(value).encode('utf-8')).hexdigest()[:16]
+
+
+@contextmanager
+def request_span(name: str, payload: dict, session_id: Optional[str], actor_id: Optional[str]) -> Iterator[Any]:
+    """
+    Root span of one request, continuing the caller's trace from payload["trace_context"]
+
+    Args:
+        name: Span name
+        payload: The entrypoint payload
+        session_id: Caller-supplied session ID (tagged, hashed, as session.id)
+        actor_id: Caller-supplied actor ID (tagged, hashed, as actor.id)
+    """
+    attributes = {key: _pseudonym(value) for key, value in (('session.id', session_id), ('actor.id', actor_id))
+                  if value}
+    token = _request_attributes.set(attributes)
+    parent_token = None
+    try:
+        if _enabled and isinstance(payload.get('trace_context'), dict):
+            parent_token = otel_context.attach(propagate.extract(payload['trace_context']))
+        with span(name) as current:
+            yield current
+    finally:
+        if parent_token is not None:
+            otel_context.detach(parent_token)
+        _request_attributes.reset(token)
+
+
+def _query_span(event: Dict):
+    """db_metrics listener: record a finished query as a span ending now"""
+    end_ns = time.time_ns()
+    attributes = {
+        **_request_attributes.get(),
+        'db.system': 'postgresql' if event['dialect'] == 'postgres' else (event['dialect'] or 'unknown'),
+        'db.operation.name': event['name'],
+        'db.response.returned_rows': event['rows'],
+        'db.response.bytes': event['bytes'],
+        'db.slow': event['slow'],
+    }
+    query_span = _tracer().start_span(f"db {event['name']}", kind=trace.SpanKind.CLIENT, attributes=attributes,
+                                      start_time=end_ns - int(event['duration_ms'] * 1_000_000))
+    if event['error'] is not None:
+        query_span.record_exception(event['error'])
+        query_span.set_status(Status(StatusCode.ERROR, str(event['error'])))
+    query_span.end(end_time=end_ns)
+
+
+def shutdown_tracing():
+    """Flush pending spans (call before the process exits)"""
+    if _enabled:
+        provider = trace.get_tracer_provider()
+        if hasattr(provider, 'force_flush'):
+            provider.force_flush()
@@ -7,8 +7,16 @@ import os
 import json
 import boto3
 import logging
+from contextlib import nullcontext
 from twilio.twiml.messaging_response import MessagingResponse
 
+# Optional: continue this trace inside the agent (see tracing.py)
+try:
+    from opentelemetry import trace, propagate
+    HAS_OTEL = True
+except ImportError:
+    HAS_OTEL = False
+
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -47,11 +55,18 @@ def lambda_handler(event, context):
         # Invoke AgentCore
         session_id = f"whatsapp-{from_number.replace(':', '-')}"
         
-        agent_response = bedrock_client.invoke_agent(
-            agentId=AGENT_ID,
-            payload={'prompt': user_msg},
-            sessionId=session_id
-        )
+        payload = {'prompt': user_msg}
+        message_span = trace.get_tracer(__name__).start_as_current_span('whatsapp.message') if HAS_OTEL else nullcontext()
+        with message_span:
+            if HAS_OTEL:
+                # W3C traceparent, picked up by tracing.request_span in the agent
+                payload['trace_context'] = {}
+                propagate.inject(payload['trace_context'])
+            agent_response = bedrock_client.invoke_agent(
+                agentId=AGENT_ID,
+                payload=payload,
+                sessionId=session_id
+            )
         
         # Extract response text
         response_text = agent_response.get('output', "I'm sorry, I couldn't process that.")